@@ -1,11 +1,9 @@
 import argparse
-import os
 import subprocess
 
-from crypt_utils import decrypt_save_file, encrypt_save_file
-from csv_utils import read_csv_mapping, read_transfers, write_to_csv
-from team_utils import read_team_data, read_team_id_and_name, write_team_data
-from transfer_utils import apply_transfers
+from apply_utils import SaveJob, apply_transfers_to_save, read_transfer_set
+from snapshot_utils import load_player_names
+from workspace_utils import Workspace
 
 
 def main():
@@ -27,54 +25,49 @@ def main():
         help="Path to the CSV file containing player names.",
     )
     parser.add_argument(
-        "transfers_csv", type=str, help="Path to the CSV file containing transfers."
+        "transfers_csv",
+        type=str,
+        help="Path to the CSV file containing transfers, or a directory of them.",
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        help="Path to a .jsonl or .csv file receiving the outcome of every transfer.",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print the outcome of every transfer."
+    )
+    parser.add_argument(
+        "--no-compile",
+        action="store_true",
+        help="Apply every transfer as listed instead of their net effect per player.",
     )
 
     args = parser.parse_args()
 
-    team_entries_start_offset = 10307144
-    team_entries_end_offset = 10520143
-
-    teams_start_offset = 0x8ED2FC
-    teams_end_offset = 0x958DA3
-
-    try:
-        temp_binary_folder_path, temp_binary_file_path = decrypt_save_file(
-            args.original_save_file_path
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        print(f"Error decrypting save file: {e}")
-        exit(1)
-
-    teams_data = read_team_data(
-        temp_binary_file_path, team_entries_start_offset, team_entries_end_offset
-    )
-
-    team_names = read_team_id_and_name(
-        temp_binary_file_path, teams_start_offset, teams_end_offset
+    player_names = load_player_names(args.player_names_csv)
+    transfers, removed_count = read_transfer_set(
+        args.transfers_csv, compile_net_effect=not args.no_compile
     )
-    player_names = read_csv_mapping(args.player_names_csv)
-    transfers = None
-    if os.path.isdir(args.transfers_csv):
-        # If it's a directory, read all CSV files in the directory
-        transfers = []
-        for file_name in os.listdir(args.transfers_csv):
-            if file_name.endswith(".csv"):
-                file_path = os.path.join(args.transfers_csv, file_name)
-                transfers.extend(read_transfers(file_path))
-    else:
-        # If it's a single CSV file, read transfers from that file
-        transfers = read_transfers(args.transfers_csv)
+    if not args.no_compile:
+        print(f"Compiled transfers to their net effect, {removed_count} removed.")
 
-    teams_data = apply_transfers(
-        temp_binary_file_path, teams_data, transfers, player_names
+    job = SaveJob(
+        args.original_save_file_path,
+        args.new_save_file_path,
+        args.csv_output_path,
+        args.report,
     )
+    try:
+        with Workspace() as workspace:
+            result = apply_transfers_to_save(
+                job, transfers, player_names, workspace, verbose=args.verbose
+            )
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Error processing save file: {e}")
+        exit(1)
 
-    write_to_csv(args.csv_output_path, teams_data, team_names, player_names)
-
-    write_team_data(temp_binary_file_path, teams_data, team_entries_start_offset)
-
-    encrypt_save_file(temp_binary_folder_path, args.new_save_file_path)
+    print(result.summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+import argparse
+import os
+
+from apply_utils import apply_batch, get_save_jobs, read_transfer_set
+from crypt_utils import CryptoWorkerPool
+from workspace_utils import Workspace
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply the same transfers to many save files in parallel."
+    )
+    parser.add_argument(
+        "output_dir",
+        type=str,
+        help="Directory receiving the new saves, each with its squads CSV.",
+    )
+    parser.add_argument(
+        "player_names_csv",
+        type=str,
+        help="Path to the CSV file containing player names.",
+    )
+    parser.add_argument(
+        "transfers_csv",
+        type=str,
+        help="Path to the CSV file containing transfers, or a directory of them.",
+    )
+    parser.add_argument(
+        "save_file_paths", nargs="+", help="Paths to the original save files."
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Saves processed at once (default: the number of CPUs)",
+    )
+    parser.add_argument(
+        "--report-format",
+        choices=["jsonl", "csv"],
+        help="Write the outcome of every transfer next to each new save.",
+    )
+    parser.add_argument(
+        "--no-compile",
+        action="store_true",
+        help="Apply every transfer as listed instead of their net effect per player.",
+    )
+
+    args = parser.parse_args()
+
+    transfers, removed_count = read_transfer_set(
+        args.transfers_csv, compile_net_effect=not args.no_compile
+    )
+    if not args.no_compile:
+        print(f"Compiled transfers to their net effect, {removed_count} removed.")
+
+    jobs = get_save_jobs(args.save_file_paths, args.output_dir, args.report_format)
+    results = {}
+
+    # The pool only prepares wine, every worker runs its own decrypter and encrypter
+    with Workspace() as workspace, CryptoWorkerPool(
+        max_workers=args.max_workers
+    ) as crypto_pool:
+        for result in apply_batch(
+            jobs,
+            args.player_names_csv,
+            transfers,
+            workspace,
+            max_workers=args.max_workers,
+            environment=crypto_pool.environment,
+        ):
+            results[result.job] = result
+            status = "failed" if result.error else "done"
+            print(
+                f"[{len(results)}/{len(jobs)}] {result.job.save_file_path} {status} in {result.seconds:.1f}s"
+            )
+
+    failed_count = 0
+    for job in jobs:
+        result = results[job]
+        if result.error:
+            failed_count += 1
+            print(f"{job.save_file_path}: failed: {result.error}")
+        else:
+            print(f"{job.save_file_path} -> {job.new_save_file_path}: {result.summary}")
+
+    print(f"{len(jobs) - failed_count} of {len(jobs)} saves updated.")
+    if failed_count:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from transfermarkt_utils import HTML_PARSER, get_next_page_url, parse_listing_page
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "tests",
+    "fixtures",
+    "transfermarkt",
+)
+
+
+def pad_page(html, pad_kb):
+    """
+    Surround a page's body with unrelated markup, as the navigation, ads and
+    footer of a live Transfermarkt page would.
+    """
+    block = (
+        '<div class="box"><ul class="navigation">'
+        + "".join(
+            f'<li class="item"><a href="/link/{i}" title="Link {i}">Link {i}</a></li>'
+            for i in range(10)
+        )
+        + "</ul><p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p></div>\n"
+    )
+    padding = block * max(1, pad_kb * 1024 // len(block))
+    half = len(padding) // 2
+    return html.replace("<body>", "<body>" + padding[:half], 1).replace(
+        "</body>", padding[half:] + "</body>", 1
+    )
+
+
+def parse_twice(html):
+    """The previous approach: one full html.parser tree for rows, one for paging."""
+    soup = BeautifulSoup(html, "html.parser")
+    soup.find("table", {"class": "items"}).find_all("tr", {"class": ["odd", "even"]})
+    get_next_page_url(BeautifulSoup(html, "html.parser"))
+
+
+def parse_once(parser):
+    def parse(html):
+        page = parse_listing_page(html, parser=parser)
+        page.tables[0].find_all("tr", {"class": ["odd", "even"]})
+
+    return parse
+
+
+def time_per_page(parse, pages, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parse(html)
+    return (time.perf_counter() - start_time) / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the parsing of saved Transfermarkt listing pages."
+    )
+    parser.add_argument(
+        "pages",
+        nargs="*",
+        help="Saved listing pages, defaults to the test fixtures",
+    )
+    parser.add_argument(
+        "--pad-kb",
+        type=int,
+        default=150,
+        help="Unrelated markup added around each page, 0 for none (default: 150)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Parses per page (default: 20)"
+    )
+    args = parser.parse_args()
+
+    page_paths = args.pages or sorted(
+        glob.glob(os.path.join(FIXTURES_DIR, "latest_transfers_page_*.html"))
+    )
+    pages = []
+    for page_path in page_paths:
+        with open(page_path, "r", encoding="utf-8") as f:
+            html = f.read()
+        pages.append(pad_page(html, args.pad_kb) if args.pad_kb else html)
+
+    average_kb = sum(len(html) for html in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {average_kb:.0f} KB on average, {args.repeat} runs")
+
+    variants = [
+        ("full tree twice, html.parser", parse_twice),
+        ("strained once, html.parser", parse_once("html.parser")),
+    ]
+    if HTML_PARSER != "html.parser":
+        variants.append((f"strained once, {HTML_PARSER}", parse_once(HTML_PARSER)))
+
+    baseline = None
+    for name, parse in variants:
+        seconds = time_per_page(parse, pages, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<32} {seconds * 1000:8.2f} ms/page {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
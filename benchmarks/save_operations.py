@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from save_utils import (
+    TEAM_ENTRIES_END_OFFSET,
+    TEAM_ENTRIES_START_OFFSET,
+    TEAMS_END_OFFSET,
+    TEAMS_START_OFFSET,
+)
+from synthetic_save import generate_teams_data, generate_transfer_window, write_save
+from tactics_utils import update_tactics_for_team
+from team_utils import read_team_data, read_team_id_and_name, write_team_data
+from transfer_utils import apply_transfers
+
+DEFAULT_WINDOW_SIZES = [10, 1000, 100000]
+
+# A result this much slower than the baseline fails the comparison
+DEFAULT_THRESHOLD = 0.25
+
+
+def copy_teams_data(teams_data):
+    return [
+        (team_id, list(player_ids), list(shirt_numbers))
+        for team_id, player_ids, shirt_numbers in teams_data
+    ]
+
+
+def time_call(function, repeat, setup=None):
+    """
+    Return the fastest of repeat runs of function, in seconds. setup runs
+    before each run, outside the timing, and its result is passed to function.
+    """
+    best_seconds = None
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start_time = time.perf_counter()
+        function(argument)
+        seconds = time.perf_counter() - start_time
+        best_seconds = seconds if best_seconds is None else min(best_seconds, seconds)
+    return best_seconds
+
+
+def run_benchmarks(work_dir, window_sizes, repeat, seed):
+    """Time the save operations on a synthetic save and return {name: seconds}."""
+    rng = random.Random(seed)
+    teams_data = generate_teams_data(rng)
+    player_names = {
+        player_id: f"Player {player_id}"
+        for _, player_ids, _ in teams_data
+        for player_id in player_ids
+        if player_id
+    }
+
+    original_path = os.path.join(work_dir, "original.dat")
+    save_path = os.path.join(work_dir, "data.dat")
+    write_save(original_path, teams_data)
+
+    def fresh_save():
+        shutil.copyfile(original_path, save_path)
+
+    fresh_save()
+    results = {}
+
+    results["read_team_data"] = time_call(
+        lambda _: read_team_data(
+            save_path, TEAM_ENTRIES_START_OFFSET, TEAM_ENTRIES_END_OFFSET
+        ),
+        repeat,
+    )
+    results["read_team_id_and_name"] = time_call(
+        lambda _: read_team_id_and_name(
+            save_path, TEAMS_START_OFFSET, TEAMS_END_OFFSET
+        ),
+        repeat,
+    )
+
+    for window_size in window_sizes:
+        transfers = generate_transfer_window(rng, teams_data, window_size)
+
+        def setup():
+            fresh_save()
+            return copy_teams_data(teams_data)
+
+        results[f"apply_transfers[{window_size}]"] = time_call(
+            lambda teams: apply_transfers(save_path, teams, transfers, player_names),
+            repeat,
+            setup,
+        )
+
+    last_team_id = teams_data[-1][0]
+    results["update_tactics_for_team"] = time_call(
+        lambda _: update_tactics_for_team(save_path, last_team_id, 0),
+        repeat,
+        fresh_save,
+    )
+
+    results["write_team_data"] = time_call(
+        lambda _: write_team_data(save_path, teams_data, TEAM_ENTRIES_START_OFFSET),
+        repeat,
+        fresh_save,
+    )
+    dirty_team_ids = {team_id for team_id, _, _ in rng.sample(teams_data, 5)}
+    results["write_team_data[5 dirty]"] = time_call(
+        lambda _: write_team_data(
+            save_path,
+            teams_data,
+            TEAM_ENTRIES_START_OFFSET,
+            dirty_team_ids=dirty_team_ids,
+        ),
+        repeat,
+        fresh_save,
+    )
+
+    return results
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Print each result against the baseline and return the names of those
+    slower than the baseline by more than threshold, e.g. 0.25 for 25%.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        baseline_seconds = baseline.get(name)
+        if not baseline_seconds:
+            print(f"{name:<32} {seconds * 1000:10.3f} ms   (no baseline)")
+            continue
+
+        ratio = seconds / baseline_seconds
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<32} {seconds * 1000:10.3f} ms {baseline_seconds * 1000:10.3f} ms "
+            f"{ratio:6.2f}x{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the save operations on a synthetic full-size data.dat."
+    )
+    parser.add_argument(
+        "--output", help="Path of a JSON file receiving the results and run details"
+    )
+    parser.add_argument(
+        "--compare",
+        help="Path of a results JSON to compare against, exits 1 on regressions",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed slowdown against the baseline (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--window-sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_WINDOW_SIZES,
+        help="Transfers per window to apply (default: 10 1000 100000)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per operation (default: 5)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=2021, help="Random seed (default: 2021)"
+    )
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="pes2021-benchmark-")
+    try:
+        results = run_benchmarks(work_dir, args.window_sizes, args.repeat, args.seed)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "repeat": args.repeat,
+                    "seed": args.seed,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if not args.compare:
+        for name, seconds in results.items():
+            print(f"{name:<32} {seconds * 1000:10.3f} ms")
+        return
+
+    with open(args.compare, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare_results(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} results regressed by more than {args.threshold:.0%}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import random
+import struct
+
+from save_utils import (
+    TACTICS_START_OFFSET,
+    TEAM_ENTRIES_END_OFFSET,
+    TEAM_ENTRIES_START_OFFSET,
+    TEAMS_END_OFFSET,
+    TEAMS_START_OFFSET,
+)
+from tactics_utils import PADDING_SIZE, PLAYER_INDICES_SIZE, TEAM_BLOCK_SIZE
+from team_utils import TEAM_RECORD, TEAM_RECORD_SIZE
+
+# Size of each entry of the team name table and where the name starts in it
+TEAM_NAME_ENTRY_SIZE = 588
+TEAM_NAME_OFFSET = 104
+TEAM_NAME_SIZE = 70
+
+# As many teams as the team-player table of a real save holds
+TEAM_COUNT = -(
+    -(TEAM_ENTRIES_END_OFFSET - TEAM_ENTRIES_START_OFFSET) // TEAM_RECORD_SIZE
+)
+
+FIRST_TEAM_ID = 100
+FIRST_PLAYER_ID = 100000
+
+# Team ID of players without a team, which is not in the save
+NO_TEAM_ID = 0
+
+
+def generate_teams_data(rng, team_count=TEAM_COUNT, full_team_share=0.2):
+    """
+    Return teams_data for a synthetic save: every team has 25 to 39 players,
+    and about full_team_share of them all 40, each player in one team.
+    """
+    teams_data = []
+    next_player_id = FIRST_PLAYER_ID
+    for index in range(team_count):
+        squad_size = 40 if rng.random() < full_team_share else rng.randint(25, 39)
+        player_ids = list(range(next_player_id, next_player_id + squad_size))
+        next_player_id += squad_size
+        shirt_numbers = list(range(1, squad_size + 1))
+        padding = [0] * (40 - squad_size)
+        teams_data.append(
+            (FIRST_TEAM_ID + index, player_ids + padding, shirt_numbers + padding)
+        )
+    return teams_data
+
+
+def build_save_image(teams_data):
+    """
+    Return the bytes of a data.dat holding the teams at the offsets of a real
+    save: team names, team-player records and a tactics block per team whose
+    player indices list the squad in order.
+    """
+    image = bytearray(TACTICS_START_OFFSET + len(teams_data) * TEAM_BLOCK_SIZE)
+
+    for index, (team_id, player_ids, shirt_numbers) in enumerate(teams_data):
+        name_offset = TEAMS_START_OFFSET + index * TEAM_NAME_ENTRY_SIZE
+        if name_offset + TEAM_NAME_ENTRY_SIZE <= TEAMS_END_OFFSET + 1:
+            struct.pack_into("<I", image, name_offset, team_id)
+            team_name = f"Team {team_id}".encode("utf-8")[:TEAM_NAME_SIZE]
+            start = name_offset + TEAM_NAME_OFFSET
+            image[start : start + len(team_name)] = team_name
+
+        TEAM_RECORD.pack_into(
+            image,
+            TEAM_ENTRIES_START_OFFSET + index * TEAM_RECORD_SIZE,
+            team_id,
+            *player_ids,
+            *shirt_numbers,
+        )
+
+        tactics_offset = TACTICS_START_OFFSET + index * TEAM_BLOCK_SIZE
+        struct.pack_into("<I", image, tactics_offset, team_id)
+        indices_offset = tactics_offset + 4 + PADDING_SIZE
+        image[indices_offset : indices_offset + PLAYER_INDICES_SIZE] = bytes(
+            range(PLAYER_INDICES_SIZE)
+        )
+
+    return bytes(image)
+
+
+def write_save(output_path, teams_data):
+    with open(output_path, "wb") as f:
+        f.write(build_save_image(teams_data))
+
+
+def generate_transfer_window(rng, teams_data, move_count, cycle_share=0.05):
+    """
+    Return move_count transfers over the squads of teams_data, each starting
+    from the team the player is in at that point.
+
+    Most moves take a random player to a random team, into full squads too,
+    or release them. About cycle_share of the moves come as three-team cycles
+    between full teams, which apply_transfers can only apply as a swap.
+    """
+    team_ids = [team_id for team_id, _, _ in teams_data]
+    squads = {
+        team_id: [player_id for player_id in player_ids if player_id]
+        for team_id, player_ids, _ in teams_data
+    }
+    full_team_ids = [team_id for team_id in team_ids if len(squads[team_id]) == 40]
+    player_teams = {
+        player_id: team_id
+        for team_id, player_ids in squads.items()
+        for player_id in player_ids
+    }
+    players = list(player_teams)
+
+    def make_transfer(player_id, to_team_id):
+        from_team_id = player_teams[player_id]
+        player_teams[player_id] = to_team_id
+        return (
+            player_id,
+            f"Player {player_id}",
+            from_team_id,
+            f"Team {from_team_id}",
+            to_team_id,
+            f"Team {to_team_id}",
+        )
+
+    transfers = []
+    while len(transfers) < move_count:
+        if (
+            len(full_team_ids) >= 3
+            and move_count - len(transfers) >= 3
+            and rng.random() < cycle_share / 3
+        ):
+            cycle_team_ids = rng.sample(full_team_ids, 3)
+            movers = [
+                rng.choice(
+                    [p for p in squads[team_id] if player_teams.get(p) == team_id]
+                    or squads[team_id]
+                )
+                for team_id in cycle_team_ids
+            ]
+            for index, player_id in enumerate(movers):
+                transfers.append(
+                    make_transfer(player_id, cycle_team_ids[(index + 1) % 3])
+                )
+            continue
+
+        player_id = rng.choice(players)
+        to_team_id = NO_TEAM_ID if rng.random() < 0.05 else rng.choice(team_ids)
+        transfers.append(make_transfer(player_id, to_team_id))
+
+    return transfers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic data.dat with every team, name and tactics block filled."
+    )
+    parser.add_argument("output_path", help="Path of the data.dat to write")
+    parser.add_argument(
+        "--seed", type=int, default=2021, help="Random seed (default: 2021)"
+    )
+    parser.add_argument(
+        "--full-team-share",
+        type=float,
+        default=0.2,
+        help="Share of teams with all 40 slots taken (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    teams_data = generate_teams_data(
+        random.Random(args.seed), full_team_share=args.full_team_share
+    )
+    write_save(args.output_path, teams_data)
+    print(f"Wrote {len(teams_data)} teams to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import subprocess
+
+from crypt_utils import decrypt_save_file
+from diff_utils import diff_team_data, write_diff_transfers, write_shirt_changes
+from save_utils import (
+    TEAM_ENTRIES_END_OFFSET,
+    TEAM_ENTRIES_START_OFFSET,
+    TEAMS_END_OFFSET,
+    TEAMS_START_OFFSET,
+    SaveImage,
+)
+from snapshot_utils import load_player_names
+from team_utils import read_team_data, read_team_id_and_name
+from workspace_utils import Workspace
+
+
+def read_save_squads(save_file_path, workspace):
+    """Return the team-player table and team names of a save."""
+    with workspace.job() as job_dir:
+        _, temp_binary_file_path = decrypt_save_file(save_file_path, output_dir=job_dir)
+        with SaveImage(temp_binary_file_path, writable=False) as save_image:
+            teams_data = read_team_data(
+                save_image, TEAM_ENTRIES_START_OFFSET, TEAM_ENTRIES_END_OFFSET
+            )
+            team_names = read_team_id_and_name(
+                save_image, TEAMS_START_OFFSET, TEAMS_END_OFFSET
+            )
+    return teams_data, team_names
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the transfers that turn one save's squads into another's."
+    )
+    parser.add_argument("save_a_path", type=str, help="Path to the save to start from.")
+    parser.add_argument("save_b_path", type=str, help="Path to the save to arrive at.")
+    parser.add_argument(
+        "transfers_output_path",
+        type=str,
+        help="Path to the transfers CSV to write, in the format apply_transfers.py reads.",
+    )
+    parser.add_argument(
+        "--shirts-output",
+        type=str,
+        help="Path to a CSV receiving the shirt numbers that changed.",
+    )
+    parser.add_argument(
+        "--player-names-csv",
+        type=str,
+        help="Path to the CSV file containing player names, to name the players.",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        with Workspace() as workspace:
+            teams_a, team_names_a = read_save_squads(args.save_a_path, workspace)
+            teams_b, team_names_b = read_save_squads(args.save_b_path, workspace)
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Error decrypting save file: {e}")
+        exit(1)
+
+    team_names = {**team_names_a, **team_names_b}
+    player_names = (
+        load_player_names(args.player_names_csv) if args.player_names_csv else {}
+    )
+
+    squad_diff = diff_team_data(teams_a, teams_b)
+    write_diff_transfers(
+        args.transfers_output_path, squad_diff.moves, team_names, player_names
+    )
+    if args.shirts_output:
+        write_shirt_changes(
+            args.shirts_output, squad_diff.shirt_changes, team_names, player_names
+        )
+
+    print(
+        f"{len(squad_diff.moves)} transfers and "
+        f"{len(squad_diff.shirt_changes)} shirt number changes."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+
+from crosswalk_utils import CLUB, PLAYER, Crosswalk, get_reference_version
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Correct the Transfermarkt to PES ID pairs the fetch scripts remember."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    confirm_parser = subparsers.add_parser(
+        "confirm", help="Pair a Transfermarkt ID with a PES ID for every later run."
+    )
+    forget_parser = subparsers.add_parser(
+        "forget", help="Remove a pair, so the name is fuzzy matched again."
+    )
+    for subparser in (confirm_parser, forget_parser):
+        subparser.add_argument("kind", choices=[PLAYER, CLUB])
+        subparser.add_argument(
+            "reference_csv",
+            type=str,
+            help="Path to the players or teams CSV the fetch scripts match against.",
+        )
+        subparser.add_argument(
+            "transfermarkt_id", type=str, help="Transfermarkt player or club ID."
+        )
+    confirm_parser.add_argument("pes_id", type=str, help="PES player or team ID.")
+
+    args = parser.parse_args()
+
+    reference_version = get_reference_version(args.reference_csv)
+    with Crosswalk() as crosswalk:
+        if args.command == "confirm":
+            crosswalk.confirm(
+                args.kind, reference_version, {args.transfermarkt_id: args.pes_id}
+            )
+            print(f"Confirmed {args.kind} {args.transfermarkt_id} -> {args.pes_id}.")
+        else:
+            crosswalk.forget(args.kind, reference_version, [args.transfermarkt_id])
+            print(f"Forgot {args.kind} {args.transfermarkt_id}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import argparse
 import subprocess
 from team_utils import read_team_data, read_team_id_and_name
-from csv_utils import read_csv_mapping, write_to_csv
+from export_utils import EXPORTERS, export_squads
 from crypt_utils import decrypt_save_file
+from save_utils import SaveImage
+from snapshot_utils import load_player_names
+from workspace_utils import Workspace
 
 
 def main():
@@ -11,7 +14,9 @@ def main():
     )
     parser.add_argument("save_file_path", type=str, help="Path to the save file.")
     parser.add_argument(
-        "csv_output_path", type=str, help="Path to the output CSV file."
+        "csv_output_path",
+        type=str,
+        help="Path to the output file, a CSV unless another format is chosen, or the directory to write npy files to.",
     )
     parser.add_argument(
         "player_names_csv",
@@ -19,6 +24,17 @@ def main():
         help="Path to the CSV file containing player names.",
     )
 
+    parser.add_argument(
+        "--format",
+        choices=sorted(EXPORTERS),
+        help="Output format (default: from the output file extension, else csv)",
+    )
+    parser.add_argument(
+        "--skip-empty",
+        action="store_true",
+        help="Leave out empty squad slots (the npy matrices keep them as 0).",
+    )
+
     args = parser.parse_args()
 
     team_entries_start_offset = 10307144
@@ -27,22 +43,34 @@ def main():
     teams_start_offset = 0x8ED2FC
     teams_end_offset = 0x958DA3
 
-    try:
-        _, temp_binary_file_path = decrypt_save_file(args.save_file_path)
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        print(f"Error decrypting save file: {e}")
-        exit(1)
+    with Workspace() as workspace, workspace.job() as job_dir:
+        try:
+            _, temp_binary_file_path = decrypt_save_file(
+                args.save_file_path, output_dir=job_dir
+            )
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"Error decrypting save file: {e}")
+            exit(1)
 
-    teams_data = read_team_data(
-        temp_binary_file_path, team_entries_start_offset, team_entries_end_offset
-    )
+        with SaveImage(temp_binary_file_path, writable=False) as save_image:
+            teams_data = read_team_data(
+                save_image, team_entries_start_offset, team_entries_end_offset
+            )
 
-    team_names = read_team_id_and_name(
-        temp_binary_file_path, teams_start_offset, teams_end_offset
-    )
-    player_names = read_csv_mapping(args.player_names_csv)
+            team_names = read_team_id_and_name(
+                save_image, teams_start_offset, teams_end_offset
+            )
 
-    write_to_csv(args.csv_output_path, teams_data, team_names, player_names)
+    player_names = load_player_names(args.player_names_csv)
+
+    export_squads(
+        args.csv_output_path,
+        teams_data,
+        team_names,
+        player_names,
+        export_format=args.format,
+        skip_empty=args.skip_empty,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+import argparse
+import os
+import sys
+
+from crosswalk_utils import Crosswalk, get_reference_version
+from csv_utils import read_csv_rows, write_matched_transfers
+from fetch_utils import fetch_batch
+from http_utils import (
+    DEFAULT_CACHE_TTL,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_REQUESTS_PER_SECOND,
+    HttpCache,
+    PageFetcher,
+    RateLimiter,
+)
+from match_utils import match_transfers
+from transfermarkt_utils import DEFAULT_SEASON, TRANSFERMARKT_URL
+
+
+def read_team_names(file_path):
+    """Reads team names from a file, one per line, ignoring blank lines and # comments."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch the transfers of many teams and leagues from Transfermarkt into one CSV."
+    )
+    parser.add_argument(
+        "players_csv",
+        help="Path to the CSV file containing player names",
+    )
+    parser.add_argument(
+        "teams_csv",
+        help="Path to the CSV file containing team names",
+    )
+    parser.add_argument(
+        "--team",
+        action="append",
+        default=[],
+        help="Team to fetch the transfers page of, can be given several times",
+    )
+    parser.add_argument(
+        "--teams-file",
+        help="File with one team name per line",
+    )
+    parser.add_argument(
+        "--league",
+        action="append",
+        default=[],
+        help="League code to fetch the latest transfers of (e.g. GB1), can be given several times",
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join("dist", "batch_transfers.csv"),
+        help="Path to the output CSV file (default: dist/batch_transfers.csv)",
+    )
+    parser.add_argument(
+        "--confidence-threshold",
+        type=int,
+        default=80,
+        help="Minimum confidence level for matching (default: 80)",
+    )
+    parser.add_argument(
+        "--season",
+        type=int,
+        default=DEFAULT_SEASON,
+        help=f"Season of the team transfer pages (default: {DEFAULT_SEASON})",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Number of pages fetched at once (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help=f"Maximum request rate over all pages, 0 for none (default: {DEFAULT_REQUESTS_PER_SECOND})",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use only pages from the HTTP cache, without network access",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the HTTP cache",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help=f"Seconds a cached page is used without revalidating it (default: {DEFAULT_CACHE_TTL})",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=TRANSFERMARKT_URL,
+        help="Transfermarkt URL, e.g. a local mirror for testing (default: %(default)s)",
+    )
+
+    args = parser.parse_args()
+
+    team_names = list(args.team)
+    if args.teams_file:
+        team_names += read_team_names(args.teams_file)
+    # Keep the first occurrence of teams and leagues given more than once
+    team_names = list(dict.fromkeys(team_names))
+    leagues = list(dict.fromkeys(args.league))
+    if not team_names and not leagues:
+        parser.error("give at least one --team, --teams-file or --league")
+
+    # Load the reference data once for the whole batch
+    players_data = read_csv_rows(args.players_csv)
+    teams_data = read_csv_rows(args.teams_csv)
+
+    print(f"Fetching transfers of {len(team_names)} teams and {len(leagues)} leagues")
+    use_cache = args.offline or not args.no_cache
+    with PageFetcher(
+        args.max_workers,
+        RateLimiter(args.requests_per_second),
+        cache=HttpCache(ttl=args.cache_ttl) if use_cache else None,
+        offline=args.offline,
+    ) as fetcher:
+        transfers, failures = fetch_batch(
+            fetcher, team_names, leagues, args.season, args.base_url
+        )
+
+    for name, error in failures:
+        print(f"Skipping {name}: {error}")
+
+    with Crosswalk() as crosswalk:
+        matched_transfers = match_transfers(
+            transfers,
+            players_data,
+            teams_data,
+            args.confidence_threshold,
+            crosswalk=crosswalk,
+            player_version=get_reference_version(args.players_csv),
+            team_version=get_reference_version(args.teams_csv),
+        )
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    write_matched_transfers(args.output, matched_transfers)
+    print(f"{len(matched_transfers)} transfers have been written to {args.output}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
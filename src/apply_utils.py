@@ -0,0 +1,258 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from compile_utils import compile_transfers
+from crypt_utils import decrypt_save_file, encrypt_save_file
+from csv_utils import write_to_csv
+from ingest_utils import iter_transfers
+from report_utils import TransferReportWriter
+from save_utils import (
+    TEAM_ENTRIES_END_OFFSET,
+    TEAM_ENTRIES_START_OFFSET,
+    TEAMS_END_OFFSET,
+    TEAMS_START_OFFSET,
+    SaveImage,
+)
+from snapshot_utils import load_player_names
+from team_utils import read_team_data, read_team_id_and_name, write_team_data
+from transfer_utils import apply_transfers
+from workspace_utils import Workspace
+
+SaveJob = namedtuple(
+    "SaveJob",
+    ["save_file_path", "new_save_file_path", "csv_output_path", "report_path"],
+)
+SaveResult = namedtuple("SaveResult", ["job", "summary", "counts", "error", "seconds"])
+
+# Player names, transfers and workspace of a pool worker, set once by init_worker
+_worker_context = None
+
+
+def read_transfer_set(transfers_csv, compile_net_effect=True):
+    """
+    Read the transfers of a CSV or a directory of CSVs in date order.
+
+    Returns:
+        tuple: The transfers, reduced to their net effect per player unless
+            compile_net_effect is False, and the number of transfers removed
+    """
+    transfers = iter_transfers(transfers_csv)
+    if not compile_net_effect:
+        return list(transfers), 0
+    return compile_transfers(transfers)
+
+
+def apply_transfers_to_save(
+    job, transfers, player_names, workspace, verbose=False, environment=None
+):
+    """
+    Decrypt a save into a workspace job directory, apply the transfers to it,
+    write its squads CSV and encrypt the result. The job directory is emptied
+    afterwards, whether this succeeds or not.
+
+    Args:
+        job (SaveJob): Save to read and the files to write
+        transfers (iterable): Transfer tuples as returned by read_transfers
+        player_names (dict): Player ID -> name mapping
+        workspace (Workspace): Workspace holding the decrypted files
+        verbose (bool): Print a line per transfer
+        environment (dict): Environment for the decrypter and encrypter
+
+    Returns:
+        TransferResult: As returned by apply_transfers
+
+    Raises:
+        subprocess.CalledProcessError: If decryption or encryption fails
+        WorkspaceQuotaError: If the workspace is full
+    """
+    with workspace.job() as job_dir:
+        temp_binary_folder_path, temp_binary_file_path = decrypt_save_file(
+            job.save_file_path, environment=environment, output_dir=job_dir
+        )
+        with SaveImage(temp_binary_file_path) as save_image:
+            teams_data = read_team_data(
+                save_image, TEAM_ENTRIES_START_OFFSET, TEAM_ENTRIES_END_OFFSET
+            )
+            team_names = read_team_id_and_name(
+                save_image, TEAMS_START_OFFSET, TEAMS_END_OFFSET
+            )
+
+            report_sink = (
+                TransferReportWriter(job.report_path) if job.report_path else None
+            )
+            try:
+                result = apply_transfers(
+                    save_image,
+                    teams_data,
+                    transfers,
+                    player_names,
+                    report_sink=report_sink,
+                    verbose=verbose,
+                )
+            finally:
+                if report_sink is not None:
+                    report_sink.close()
+
+            write_team_data(
+                save_image,
+                result.teams_data,
+                TEAM_ENTRIES_START_OFFSET,
+                dirty_team_ids=result.dirty_team_ids,
+            )
+
+        write_to_csv(job.csv_output_path, result.teams_data, team_names, player_names)
+        encrypt_save_file(temp_binary_folder_path, job.new_save_file_path, environment)
+
+    return result
+
+
+def get_save_jobs(save_file_paths, output_dir, report_format=None):
+    """
+    Return a SaveJob per save, writing below output_dir.
+
+    Saves keep their path relative to the directory all of them are in, so
+    saves with the same file name in different folders do not overwrite each
+    other. The squads CSV and report are written next to each new save.
+
+    Args:
+        report_format (str): "jsonl" or "csv" to write a report per save
+    """
+    save_file_paths = [os.path.abspath(path) for path in save_file_paths]
+    common_dir = os.path.commonpath([os.path.dirname(path) for path in save_file_paths])
+
+    jobs = []
+    for save_file_path in save_file_paths:
+        new_save_file_path = os.path.join(
+            output_dir, os.path.relpath(save_file_path, common_dir)
+        )
+        report_path = (
+            f"{new_save_file_path}.report.{report_format}" if report_format else None
+        )
+        jobs.append(
+            SaveJob(
+                save_file_path,
+                new_save_file_path,
+                f"{new_save_file_path}.csv",
+                report_path,
+            )
+        )
+    return jobs
+
+
+def get_error_message(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def run_save_job(job, player_names, transfers, workspace, environment=None):
+    """
+    Apply transfers to one save, returning a SaveResult instead of raising.
+
+    Any error fails only this save, e.g. a decrypter failure, or a truncated
+    data.dat that cannot be mapped or unpacked, so the rest of a batch still
+    runs.
+    """
+    start_time = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(job.new_save_file_path), exist_ok=True)
+        result = apply_transfers_to_save(
+            job, transfers, player_names, workspace, environment=environment
+        )
+    except Exception as e:
+        return SaveResult(
+            job, None, None, get_error_message(e), time.perf_counter() - start_time
+        )
+
+    return SaveResult(
+        job, result.summary(), result.counts, None, time.perf_counter() - start_time
+    )
+
+
+def init_worker(player_names_csv, transfers, environment, workspace_dir, quota):
+    """
+    Set up a pool worker. The player names snapshot was compiled by the parent
+    process, so the worker only maps it. The worker's workspace lives inside
+    the parent's, which removes it.
+    """
+    global _worker_context
+    workspace = Workspace(workspace_dir, quota)
+    workspace.open()
+    _worker_context = (
+        load_player_names(player_names_csv),
+        transfers,
+        workspace,
+        environment,
+    )
+
+
+def run_pooled_save_job(job):
+    player_names, transfers, workspace, environment = _worker_context
+    return run_save_job(job, player_names, transfers, workspace, environment)
+
+
+def apply_batch(
+    jobs,
+    player_names_csv,
+    transfers,
+    workspace,
+    max_workers=None,
+    environment=None,
+):
+    """
+    Apply the same transfers to many saves in a process pool.
+
+    The transfers are sent to each worker once. With one worker, or one save,
+    everything runs in this process. Each worker decrypts into a workspace of
+    its own inside the given one, with an equal share of its quota.
+
+    Args:
+        jobs (list): SaveJob per save
+        player_names_csv (str): CSV of the player names
+        transfers (list): Transfer tuples, already compiled if wanted
+        workspace (Workspace): Open workspace for the decrypted saves
+        max_workers (int): Saves processed at once, defaults to the CPU count
+        environment (dict): Environment for the decrypter and encrypter
+
+    Yields:
+        SaveResult: One per save, in the order they finish
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    # Compile the snapshot once here rather than in every worker
+    player_names = load_player_names(player_names_csv)
+
+    if max_workers <= 1:
+        try:
+            for job in jobs:
+                yield run_save_job(job, player_names, transfers, workspace, environment)
+        finally:
+            player_names.close()
+        return
+
+    player_names.close()
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_worker,
+        initargs=(
+            player_names_csv,
+            transfers,
+            environment,
+            workspace.path,
+            workspace.quota // max_workers,
+        ),
+    ) as executor:
+        futures = {executor.submit(run_pooled_save_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker died, e.g. BrokenProcessPool, which fails its save
+                result = SaveResult(
+                    futures[future],
+                    None,
+                    None,
+                    get_error_message(e),
+                    time.perf_counter() - start_time,
+                )
+            yield result
@@ -0,0 +1,42 @@
+import hashlib
+import os
+
+
+def get_cache_dir(*subdirs):
+    """
+    Return (and create) the tool's cache directory, or a subdirectory of it.
+
+    The location can be overridden with the PES_TRANSFER_TOOL_CACHE_DIR
+    environment variable and otherwise follows XDG_CACHE_HOME.
+    """
+    cache_root = os.environ.get("PES_TRANSFER_TOOL_CACHE_DIR")
+    if not cache_root:
+        xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_root = os.path.join(xdg_cache_home, "pes2021-transfer-tool")
+
+    cache_dir = os.path.join(cache_root, *subdirs)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_tree_size(path):
+    """Return the total size in bytes of the files below path."""
+    total_size = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                total_size += os.path.getsize(os.path.join(dir_path, file_name))
+            except OSError:
+                pass
+    return total_size
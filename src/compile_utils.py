@@ -0,0 +1,52 @@
+def compile_transfers(transfers):
+    """
+    Reduce transfers to their net effect per player before they are applied.
+
+    Consecutive transfers of a player that form a chain, where each one starts
+    at the team the previous one ended at, are folded into one: A -> B then
+    B -> C becomes A -> C. A chain that ends where it started, such as a loan
+    and its return, is dropped. A transfer starting somewhere else than the
+    previous one ended starts a new chain, so transfers that disagree with
+    each other are all kept, as they would be when applied one by one.
+    Transfers with player ID 0, which stands for players the fetchers could
+    not match, are never folded.
+
+    Each compiled transfer takes the place of the last transfer of its chain,
+    when the player reached their final team.
+
+    Args:
+        transfers (iterable): Transfer tuples in the order they happened
+
+    Returns:
+        tuple: The compiled transfers, and the number of transfers removed
+    """
+    # (index of the last transfer, folded transfer, number of transfers folded)
+    chains = []
+    open_chains = {}
+    transfer_count = 0
+
+    for index, transfer in enumerate(transfers):
+        transfer_count += 1
+        player_id, _, from_team_id, _, _, _ = transfer
+        chain_index = open_chains.get(player_id)
+
+        if chain_index is not None and chains[chain_index][1][4] == from_team_id:
+            _, first_transfer, length = chains[chain_index]
+            chains[chain_index] = (
+                index,
+                first_transfer[:4] + transfer[4:6],
+                length + 1,
+            )
+            continue
+
+        if player_id != 0:
+            open_chains[player_id] = len(chains)
+        chains.append((index, transfer, 1))
+
+    chains.sort(key=lambda chain: chain[0])
+    compiled_transfers = [
+        transfer
+        for _, transfer, length in chains
+        if length == 1 or transfer[2] != transfer[4]
+    ]
+    return compiled_transfers, transfer_count - len(compiled_transfers)
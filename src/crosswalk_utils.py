@@ -0,0 +1,175 @@
+import os
+import re
+import sqlite3
+
+from cache_utils import get_cache_dir, hash_file
+from roster_utils import ROSTER_CSV_PATTERN
+
+PLAYER = "player"
+CLUB = "club"
+
+TRANSFERMARKT_PLAYER_ID_PATTERN = re.compile(r"/spieler/(\d+)")
+TRANSFERMARKT_CLUB_ID_PATTERN = re.compile(r"/verein/(\d+)")
+
+CROSSWALK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crosswalk (
+    kind TEXT NOT NULL,
+    reference_version TEXT NOT NULL,
+    transfermarkt_id TEXT NOT NULL,
+    pes_id TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    confirmed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, reference_version, transfermarkt_id)
+)
+"""
+
+# Confidence recorded for pairs confirmed by hand
+CONFIRMED_CONFIDENCE = 100.0
+
+
+def get_crosswalk_path():
+    return os.path.join(get_cache_dir(), "crosswalk.sqlite3")
+
+
+def get_reference_version(csv_path):
+    """
+    Return the version a reference CSV is recorded under in the crosswalk: the
+    roster name for data/<version>_players.csv files, the content hash otherwise.
+    """
+    match = ROSTER_CSV_PATTERN.match(os.path.basename(csv_path))
+    if match:
+        return match.group("version")
+    return hash_file(csv_path)
+
+
+def find_transfermarkt_id(tag, pattern):
+    """Return the ID in the first link below a BeautifulSoup tag matching pattern, or ""."""
+    for link in tag.find_all("a", href=True):
+        match = pattern.search(link["href"])
+        if match:
+            return match.group(1)
+    return ""
+
+
+class Crosswalk:
+    """
+    Persistent store of Transfermarkt ID -> PES ID pairs for players and clubs,
+    kept per version of the reference CSV they were matched against.
+
+    Pairs stored by the matcher keep their match confidence and only count as
+    known to runs whose threshold they meet. Pairs confirmed by hand always do,
+    and matches never replace them. A wrong pair is corrected by confirming
+    the right one or forgetting it, see edit_crosswalk.py.
+
+    Args:
+        db_path (str): SQLite database, defaults to one in the tool's cache
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or get_crosswalk_path()
+        self._connection = sqlite3.connect(self.db_path)
+        self._connection.execute(CROSSWALK_SCHEMA)
+        # Crosswalks written before pairs could be confirmed lack the column
+        columns = [
+            row[1] for row in self._connection.execute("PRAGMA table_info(crosswalk)")
+        ]
+        if "confirmed" not in columns:
+            self._connection.execute(
+                "ALTER TABLE crosswalk ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 0"
+            )
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def lookup(self, kind, reference_version, transfermarkt_ids, min_confidence=0):
+        """
+        Return the known pairs among the given Transfermarkt IDs.
+
+        Args:
+            min_confidence (float): Leave out matched pairs below this
+                confidence, confirmed pairs are always returned
+
+        Returns:
+            dict: Transfermarkt ID -> (PES ID, confidence)
+        """
+        transfermarkt_ids = list(dict.fromkeys(filter(None, transfermarkt_ids)))
+        pairs = {}
+        # Stay below SQLite's limit on query parameters
+        for start in range(0, len(transfermarkt_ids), 500):
+            chunk = transfermarkt_ids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._connection.execute(
+                "SELECT transfermarkt_id, pes_id, confidence FROM crosswalk"
+                " WHERE kind = ? AND reference_version = ?"
+                " AND (confirmed = 1 OR confidence >= ?)"
+                f" AND transfermarkt_id IN ({placeholders})",
+                (kind, reference_version, min_confidence, *chunk),
+            )
+            for transfermarkt_id, pes_id, confidence in rows:
+                pairs[transfermarkt_id] = (pes_id, confidence)
+        return pairs
+
+    def store(self, kind, reference_version, pairs):
+        """
+        Record matched pairs, replacing earlier matches for the same IDs but
+        not confirmed pairs.
+
+        Args:
+            pairs (dict): Transfermarkt ID -> (PES ID, confidence)
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO crosswalk"
+                " (kind, reference_version, transfermarkt_id, pes_id, confidence)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (kind, reference_version, transfermarkt_id) DO UPDATE"
+                " SET pes_id = excluded.pes_id, confidence = excluded.confidence"
+                " WHERE confirmed = 0",
+                [
+                    (kind, reference_version, transfermarkt_id, pes_id, confidence)
+                    for transfermarkt_id, (pes_id, confidence) in pairs.items()
+                    if transfermarkt_id
+                ],
+            )
+
+    def confirm(self, kind, reference_version, pairs):
+        """
+        Record pairs checked by hand, which every later run uses.
+
+        Args:
+            pairs (dict): Transfermarkt ID -> PES ID
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO crosswalk VALUES (?, ?, ?, ?, ?, 1)",
+                [
+                    (
+                        kind,
+                        reference_version,
+                        transfermarkt_id,
+                        pes_id,
+                        CONFIRMED_CONFIDENCE,
+                    )
+                    for transfermarkt_id, pes_id in pairs.items()
+                    if transfermarkt_id
+                ],
+            )
+
+    def forget(self, kind, reference_version, transfermarkt_ids):
+        """Remove the pairs of the given IDs, which are then matched again."""
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM crosswalk"
+                " WHERE kind = ? AND reference_version = ? AND transfermarkt_id = ?",
+                [
+                    (kind, reference_version, transfermarkt_id)
+                    for transfermarkt_id in transfermarkt_ids
+                ],
+            )
+
+    def close(self):
+        self._connection.close()
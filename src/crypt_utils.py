@@ -1,14 +1,145 @@
 import os
+import shutil
 import subprocess
 import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
+from cache_utils import get_cache_dir, get_tree_size, hash_file
 
-def decrypt_save_file(save_file_path):
+try:
+    import fcntl
+except ImportError:  # Windows, where the vendor binaries run without wine
+    fcntl = None
+
+# Upper bound for the decrypted save cache, least recently used entries go first
+DECRYPT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+# Files in a wine prefix serialising its pools and listing the open ones
+WINE_PREFIX_LOCK_FILE_NAME = ".pes2021-transfer-tool.lock"
+WINE_PREFIX_POOLS_FILE_NAME = ".pes2021-transfer-tool.pools"
+
+# Vendor binaries already made executable by this process
+_prepared_vendor_tools = set()
+_prepared_vendor_tools_lock = threading.Lock()
+
+
+def run_vendor_tool(tool_name, arguments, environment=None):
+    """
+    Run one of the bundled pesXdecrypter binaries.
+
+    Args:
+        tool_name (str): File name of the binary, e.g. decrypter21.exe
+        arguments (list): Command line arguments for the binary
+        environment (dict): Environment for the process, defaults to ours
+
+    Raises:
+        subprocess.CalledProcessError: If the binary fails
+    """
+    tool_path = os.path.join("vendor", "pesXdecrypter_2021", tool_name)
+
+    # Make the file executable on non-Windows platforms, once per process
+    if os.name != "nt":
+        with _prepared_vendor_tools_lock:
+            if tool_path not in _prepared_vendor_tools:
+                os.chmod(tool_path, 0o777)
+                _prepared_vendor_tools.add(tool_path)
+
+    # Run the executable directly on Windows, use wine on other platforms
+    if os.name == "nt":
+        subprocess.run([tool_path, *arguments], check=True, env=environment)
+    else:
+        subprocess.run(["wine", tool_path, *arguments], check=True, env=environment)
+
+
+def get_cached_decryption(save_hash, destination_dir, cache_dir=None):
+    """
+    Copy a cached decryption of the save with the given content hash into
+    destination_dir.
+
+    Args:
+        save_hash (str): SHA-256 hex digest of the encrypted save file
+        destination_dir (str): Existing directory to copy the decrypted files to
+        cache_dir (str): Cache directory, defaults to the tool's cache
+
+    Returns:
+        bool: True on a cache hit, False otherwise
+    """
+    cache_dir = cache_dir or get_cache_dir("decrypted")
+    entry_dir = os.path.join(cache_dir, save_hash)
+    if not os.path.isfile(os.path.join(entry_dir, "data.dat")):
+        return False
+
+    try:
+        shutil.copytree(entry_dir, destination_dir, dirs_exist_ok=True)
+        # Mark the entry as recently used for eviction
+        os.utime(entry_dir)
+    except OSError:
+        return False
+
+    return True
+
+
+def store_cached_decryption(
+    save_hash, decrypted_folder_path, cache_dir=None, max_size=DECRYPT_CACHE_MAX_SIZE
+):
+    """
+    Store a decrypted save folder in the cache under the save's content hash
+    and evict least recently used entries beyond max_size bytes.
+    """
+    cache_dir = cache_dir or get_cache_dir("decrypted")
+    entry_dir = os.path.join(cache_dir, save_hash)
+    if os.path.isdir(entry_dir):
+        os.utime(entry_dir)
+        return
+
+    # Copy next to the final location first so readers never see partial entries
+    staging_dir = tempfile.mkdtemp(prefix=f".{save_hash}-", dir=cache_dir)
+    try:
+        shutil.copytree(decrypted_folder_path, staging_dir, dirs_exist_ok=True)
+        os.replace(staging_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        if not os.path.isdir(entry_dir):
+            raise
+
+    evict_decryption_cache(cache_dir, max_size)
+
+
+def evict_decryption_cache(cache_dir, max_size=DECRYPT_CACHE_MAX_SIZE):
+    """Remove least recently used cache entries until the cache fits max_size."""
+    entries = []
+    for entry_name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, entry_name)
+        if entry_name.startswith(".") or not os.path.isdir(entry_dir):
+            continue
+        entries.append(
+            (os.path.getmtime(entry_dir), get_tree_size(entry_dir), entry_dir)
+        )
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, entry_dir in sorted(entries):
+        if total_size <= max_size:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total_size -= size
+
+
+def decrypt_save_file(save_file_path, output_dir, use_cache=True, environment=None):
     """
     Decrypt the PES save file and return the paths to the decrypted folder and data.dat file.
 
+    Decrypted saves are cached by the content hash of the save file, so
+    decrypting the same save again only copies the cached files.
+
     Args:
         save_file_path (str): Path to the encrypted save file
+        output_dir (str): Existing empty directory to decrypt into, such as a
+            workspace job directory
+        use_cache (bool): Look up and store the decryption in the cache
+        environment (dict): Environment for the decrypter process
 
     Returns:
         tuple: A tuple containing:
@@ -18,55 +149,181 @@ def decrypt_save_file(save_file_path):
     Raises:
         subprocess.CalledProcessError: If decryption fails
     """
-    # Create temp directory for decrypted files
-    temp_dir = tempfile.mkdtemp()
+    save_hash = hash_file(save_file_path) if use_cache else None
+    if save_hash and get_cached_decryption(save_hash, output_dir):
+        return output_dir, os.path.join(output_dir, "data.dat")
 
     # Run decrypter on save file
-    decrypter_path = os.path.join("vendor", "pesXdecrypter_2021", "decrypter21.exe")
-
-    # Make the file executable on non-Windows platforms
-    if os.name != "nt":
-        os.chmod(decrypter_path, 0o777)
-
-    # Run the executable directly on Windows, use wine on other platforms
-    if os.name == "nt":
-        subprocess.run([decrypter_path, save_file_path, temp_dir], check=True)
-    else:
-        subprocess.run(["wine", decrypter_path, save_file_path, temp_dir], check=True)
+    run_vendor_tool("decrypter21.exe", [save_file_path, output_dir], environment)
 
     # Get path to decrypted data.dat file
-    data_bin_path = os.path.join(temp_dir, "data.dat")
+    data_bin_path = os.path.join(output_dir, "data.dat")
     if not os.path.exists(data_bin_path):
         raise FileNotFoundError("data.dat not found in decrypted files")
 
-    return temp_dir, data_bin_path
+    if save_hash:
+        try:
+            store_cached_decryption(save_hash, output_dir)
+        except OSError as e:
+            # A full or read-only cache must not fail the decryption itself
+            print(f"Could not cache decrypted save file: {e}")
 
+    return output_dir, data_bin_path
 
-def encrypt_save_file(decrypted_folder_path, output_path):
+
+def encrypt_save_file(decrypted_folder_path, output_path, environment=None):
     """
     Encrypt the modified data folder file back into a PES save file.
 
     Args:
         decrypted_folder_path (str): Path to the decrypted data folder
         output_path (str): Path where the new encrypted save file should be written
+        environment (dict): Environment for the encrypter process
 
     Raises:
         subprocess.CalledProcessError: If encryption fails
     """
-    # Get path to encrypter executable
-    encrypter_path = os.path.join("vendor", "pesXdecrypter_2021", "encrypter21.exe")
-
-    # Make executable on non-Windows platforms
-    if os.name != "nt":
-        os.chmod(encrypter_path, 0o777)
-
     # Run the encrypter with appropriate arguments
-    if os.name == "nt":
-        subprocess.run([encrypter_path, decrypted_folder_path, output_path], check=True)
-    else:
-        subprocess.run(
-            ["wine", encrypter_path, decrypted_folder_path, output_path], check=True
-        )
+    run_vendor_tool(
+        "encrypter21.exe", [decrypted_folder_path, output_path], environment
+    )
 
     if not os.path.exists(output_path):
         raise FileNotFoundError("Encrypted save file was not created")
+
+
+@contextmanager
+def lock_wine_prefix(wine_prefix):
+    """Hold an exclusive lock on a wine prefix, shared by all processes."""
+    os.makedirs(wine_prefix, exist_ok=True)
+    with open(os.path.join(wine_prefix, WINE_PREFIX_LOCK_FILE_NAME), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_wine_prefix_pools(wine_prefix):
+    """
+    Return the pools open on a wine prefix as {token: pid}, leaving out those
+    of processes that ended without closing their pool.
+    """
+    pools = {}
+    try:
+        with open(os.path.join(wine_prefix, WINE_PREFIX_POOLS_FILE_NAME)) as f:
+            for line in f:
+                pid, _, token = line.strip().partition(" ")
+                if pid.isdigit() and token and is_process_alive(int(pid)):
+                    pools[token] = int(pid)
+    except FileNotFoundError:
+        pass
+    return pools
+
+
+def write_wine_prefix_pools(wine_prefix, pools):
+    with open(os.path.join(wine_prefix, WINE_PREFIX_POOLS_FILE_NAME), "w") as f:
+        for token, pid in pools.items():
+            f.write(f"{pid} {token}\n")
+
+
+class CryptoWorkerPool:
+    """
+    Pool of workers running decrypt and encrypt jobs concurrently.
+
+    On non-Windows platforms the pool keeps a dedicated wine prefix initialised
+    once and a persistent wineserver running for as long as the pool is open,
+    so jobs do not pay the wine cold start every time.
+
+    Pools of concurrent runs share the prefix and its wineserver. The first
+    pool to open starts the server and the last one to close stops it, so no
+    run stops the server another one is still using.
+
+    Args:
+        max_workers (int): Number of jobs to run at once
+        wine_prefix (str): Wine prefix to use, defaults to one in the tool's cache
+    """
+
+    def __init__(self, max_workers=None, wine_prefix=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.environment = os.environ.copy()
+        self.uses_wine = os.name != "nt"
+        if self.uses_wine:
+            self.environment["WINEPREFIX"] = wine_prefix or get_cache_dir("wine")
+            # Keep wine quiet about missing optional components
+            self.environment.setdefault("WINEDEBUG", "-all")
+        self._executor = None
+        self._token = uuid.uuid4().hex
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        if self._executor is not None:
+            return
+
+        if self.uses_wine:
+            wine_prefix = self.environment["WINEPREFIX"]
+            with lock_wine_prefix(wine_prefix):
+                if not os.path.exists(os.path.join(wine_prefix, "system.reg")):
+                    subprocess.run(
+                        ["wineboot", "--init"], check=True, env=self.environment
+                    )
+
+                pools = read_wine_prefix_pools(wine_prefix)
+                if not pools:
+                    # Not checked: a server left running by a run that crashed
+                    # keeps serving, and wine starts one on demand otherwise
+                    subprocess.run(["wineserver", "--persistent"], env=self.environment)
+                pools[self._token] = os.getpid()
+                write_wine_prefix_pools(wine_prefix, pools)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def close(self):
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+        if self.uses_wine:
+            wine_prefix = self.environment["WINEPREFIX"]
+            with lock_wine_prefix(wine_prefix):
+                pools = read_wine_prefix_pools(wine_prefix)
+                pools.pop(self._token, None)
+                write_wine_prefix_pools(wine_prefix, pools)
+                # Only the last pool open on the prefix stops its wineserver
+                if not pools:
+                    subprocess.run(["wineserver", "--kill"], env=self.environment)
+
+    def submit_decrypt(self, save_file_path, output_dir, use_cache=True):
+        """
+        Queue a decryption into output_dir, e.g. a workspace job directory. The
+        future resolves to decrypt_save_file's result.
+        """
+        self.start()
+        return self._executor.submit(
+            decrypt_save_file, save_file_path, output_dir, use_cache, self.environment
+        )
+
+    def submit_encrypt(self, decrypted_folder_path, output_path):
+        """Queue an encryption, the future resolves once the save is written."""
+        self.start()
+        return self._executor.submit(
+            encrypt_save_file, decrypted_folder_path, output_path, self.environment
+        )
@@ -13,8 +13,11 @@ def read_csv_mapping(file_path):
     return mapping
 
 
-def read_transfers(file_path):
-    transfers = []
+def iter_transfer_rows(file_path):
+    """
+    Yield (transfer date, transfer) for each row of a transfers CSV, reading
+    it row by row. The date is the TransferDate column, or "" without one.
+    """
     with open(file_path, "r") as csvfile:
         csvreader = csv.DictReader(csvfile)
         for row in csvreader:
@@ -24,33 +27,76 @@ def read_transfers(file_path):
             from_team_name = row.get("FromTeamName", "")
             to_team_id = int(row["ToTeamID"])
             to_team_name = row.get("ToTeamName", "")
-            transfers.append(
-                (
-                    player_id,
-                    player_name,
-                    from_team_id,
-                    from_team_name,
-                    to_team_id,
-                    to_team_name,
-                )
+            yield row.get("TransferDate") or "", (
+                player_id,
+                player_name,
+                from_team_id,
+                from_team_name,
+                to_team_id,
+                to_team_name,
             )
-    return transfers
 
 
-def write_to_csv(output_path, teams_data, team_names, player_names):
+def read_transfers(file_path):
+    return [transfer for _, transfer in iter_transfer_rows(file_path)]
+
+
+SQUAD_COLUMNS = ["TeamID", "TeamName", "PlayerID", "PlayerName", "ShirtNumber"]
+
+
+def iter_squad_rows(teams_data, team_names, player_names, skip_empty=False):
+    """
+    Yield a (team ID, team name, player ID, player name, shirt number) row per
+    squad slot. Empty slots are named "Empty Player" unless skipped, players
+    missing from player_names "Unknown Player".
+    """
+    for team_id, team_player_ids, shirt_numbers in teams_data:
+        team_name = team_names.get(team_id, "Unknown Team")
+        for team_player_id, shirt_number in zip(team_player_ids, shirt_numbers):
+            if team_player_id == 0:
+                if not skip_empty:
+                    yield team_id, team_name, 0, "Empty Player", shirt_number
+                continue
+            yield (
+                team_id,
+                team_name,
+                team_player_id,
+                player_names.get(team_player_id, "Unknown Player"),
+                shirt_number,
+            )
+
+
+def write_to_csv(output_path, teams_data, team_names, player_names, skip_empty=False):
     with open(output_path, "w", newline="") as csvfile:
         csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(
-            ["TeamID", "TeamName", "PlayerID", "PlayerName", "ShirtNumber"]
+        csvwriter.writerow(SQUAD_COLUMNS)
+        csvwriter.writerows(
+            iter_squad_rows(teams_data, team_names, player_names, skip_empty)
         )
 
-        for team_id, team_player_ids, shirt_numbers in teams_data:
-            team_name = team_names.get(team_id, "Unknown Team")
-            for team_player_id, shirt_number in zip(team_player_ids, shirt_numbers):
-                player_name = player_names.get(
-                    team_player_id,
-                    "Empty Player" if team_player_id == 0 else "Unknown Player",
-                )
-                csvwriter.writerow(
-                    [team_id, team_name, team_player_id, player_name, shirt_number]
-                )
+
+MATCHED_TRANSFER_COLUMNS = [
+    "TransferDate",
+    "PlayerID",
+    "PlayerName",
+    "PlayerMatchConfidence",
+    "FromTeamID",
+    "FromTeamName",
+    "FromTeamMatchConfidence",
+    "ToTeamID",
+    "ToTeamName",
+    "ToTeamMatchConfidence",
+]
+
+
+def read_csv_rows(file_path):
+    with open(file_path, "r", encoding="utf-8") as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def write_matched_transfers(output_path, transfers):
+    """Write matched transfers in the format the fetch scripts produce."""
+    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(MATCHED_TRANSFER_COLUMNS)
+        csvwriter.writerows(transfers)
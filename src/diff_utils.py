@@ -0,0 +1,207 @@
+import csv
+from collections import namedtuple
+
+from team_utils import np
+
+# Team ID of transfers from or to no team in the save, e.g. free agents
+NO_TEAM_ID = 0
+
+SHIRT_CHANGE_COLUMNS = [
+    "TeamID",
+    "TeamName",
+    "PlayerID",
+    "PlayerName",
+    "OldShirtNumber",
+    "NewShirtNumber",
+]
+
+# Moves are (player_id, from_team_id, to_team_id), shirt changes are
+# (team_id, player_id, old_shirt_number, new_shirt_number)
+SquadDiff = namedtuple("SquadDiff", ["moves", "shirt_changes"])
+
+
+def get_memberships(teams_data):
+    """
+    Return the shirt number of every player in every team of a table, as a
+    {(player_id, team_id): shirt_number} dict. The first slot of a player
+    listed twice in a team wins.
+    """
+    memberships = {}
+    for team_id, team_player_ids, shirt_numbers in teams_data:
+        for player_id, shirt_number in zip(team_player_ids, shirt_numbers):
+            if player_id != 0:
+                memberships.setdefault((player_id, team_id), shirt_number)
+    return memberships
+
+
+def pair_moves(removed, added):
+    """
+    Pair the teams each player left with the teams they joined, in team ID
+    order, into moves. Teams left over on either side are paired with
+    NO_TEAM_ID.
+
+    Args:
+        removed (list): Sorted (player_id, team_id) memberships only in A
+        added (list): Sorted (player_id, team_id) memberships only in B
+    """
+    left_teams = {}
+    for player_id, team_id in removed:
+        left_teams.setdefault(player_id, []).append(team_id)
+    joined_teams = {}
+    for player_id, team_id in added:
+        joined_teams.setdefault(player_id, []).append(team_id)
+
+    moves = []
+    for player_id in sorted(left_teams.keys() | joined_teams.keys()):
+        from_team_ids = left_teams.get(player_id, [])
+        to_team_ids = joined_teams.get(player_id, [])
+        for index in range(max(len(from_team_ids), len(to_team_ids))):
+            from_team_id = (
+                from_team_ids[index] if index < len(from_team_ids) else NO_TEAM_ID
+            )
+            to_team_id = to_team_ids[index] if index < len(to_team_ids) else NO_TEAM_ID
+            moves.append((player_id, from_team_id, to_team_id))
+    return moves
+
+
+def diff_team_data_python(teams_a, teams_b):
+    memberships_a = get_memberships(teams_a)
+    memberships_b = get_memberships(teams_b)
+
+    removed = sorted(memberships_a.keys() - memberships_b.keys())
+    added = sorted(memberships_b.keys() - memberships_a.keys())
+    shirt_changes = []
+    for player_id, team_id in memberships_a.keys() & memberships_b.keys():
+        old_shirt_number = memberships_a[player_id, team_id]
+        new_shirt_number = memberships_b[player_id, team_id]
+        if old_shirt_number != new_shirt_number:
+            shirt_changes.append(
+                (team_id, player_id, old_shirt_number, new_shirt_number)
+            )
+    shirt_changes.sort()
+    return SquadDiff(pair_moves(removed, added), shirt_changes)
+
+
+def get_membership_arrays(teams_data):
+    """
+    Return the memberships of a table as sorted unique uint64 keys, player ID
+    in the high and team ID in the low 32 bits, and the matching shirt numbers.
+    """
+    player_ids = np.zeros((len(teams_data), 40), dtype=np.uint64)
+    shirt_numbers = np.zeros((len(teams_data), 40), dtype=np.uint16)
+    for row, (_, team_player_ids, team_shirt_numbers) in enumerate(teams_data):
+        player_ids[row, : len(team_player_ids)] = team_player_ids
+        shirt_numbers[row, : len(team_shirt_numbers)] = team_shirt_numbers
+    team_ids = np.array([team[0] for team in teams_data], dtype=np.uint64)
+
+    keys = (player_ids << np.uint64(32)) | team_ids[:, None]
+    occupied = player_ids != 0
+    # np.unique keeps the first occurrence, i.e. the player's first slot
+    keys, first_indices = np.unique(keys[occupied], return_index=True)
+    return keys, shirt_numbers[occupied][first_indices]
+
+
+def split_keys(keys):
+    return keys >> np.uint64(32), keys & np.uint64(0xFFFFFFFF)
+
+
+def diff_team_data_numpy(teams_a, teams_b):
+    keys_a, shirts_a = get_membership_arrays(teams_a)
+    keys_b, shirts_b = get_membership_arrays(teams_b)
+
+    removed = np.setdiff1d(keys_a, keys_b, assume_unique=True)
+    added = np.setdiff1d(keys_b, keys_a, assume_unique=True)
+    common, indices_a, indices_b = np.intersect1d(
+        keys_a, keys_b, assume_unique=True, return_indices=True
+    )
+
+    changed = shirts_a[indices_a] != shirts_b[indices_b]
+    changed_players, changed_teams = split_keys(common[changed])
+    shirt_changes = sorted(
+        zip(
+            changed_teams.tolist(),
+            changed_players.tolist(),
+            shirts_a[indices_a][changed].tolist(),
+            shirts_b[indices_b][changed].tolist(),
+        )
+    )
+
+    return SquadDiff(
+        pair_moves(
+            list(zip(*(array.tolist() for array in split_keys(removed)))),
+            list(zip(*(array.tolist() for array in split_keys(added)))),
+        ),
+        shirt_changes,
+    )
+
+
+def diff_team_data(teams_a, teams_b, use_numpy=None):
+    """
+    Compare two team-player tables.
+
+    Every player's team memberships in A and B are compared as sets, so slot
+    order within a team does not matter. A player who left a team and joined
+    another becomes one move between them. A player who only left or only
+    joined teams moves to or from NO_TEAM_ID. Applying the moves to save A in
+    read_transfers format gives the squads of save B.
+
+    Args:
+        teams_a (list): (team_id, player_ids, shirt_numbers) tuples of save A
+        teams_b (list): The same for save B
+        use_numpy (bool): Force (True) or disable (False) the NumPy pass.
+            Defaults to NumPy when it is installed.
+
+    Returns:
+        SquadDiff: Moves sorted by player, and the shirt number changes of
+            players in the same team in both saves, sorted by team
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if use_numpy:
+        return diff_team_data_numpy(teams_a, teams_b)
+    return diff_team_data_python(teams_a, teams_b)
+
+
+def write_diff_transfers(output_path, moves, team_names, player_names):
+    """Write moves as a transfers CSV read_transfers accepts."""
+    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(
+            [
+                "PlayerID",
+                "PlayerName",
+                "FromTeamID",
+                "FromTeamName",
+                "ToTeamID",
+                "ToTeamName",
+            ]
+        )
+        csvwriter.writerows(
+            [
+                player_id,
+                player_names.get(player_id, ""),
+                from_team_id,
+                team_names.get(from_team_id, ""),
+                to_team_id,
+                team_names.get(to_team_id, ""),
+            ]
+            for player_id, from_team_id, to_team_id in moves
+        )
+
+
+def write_shirt_changes(output_path, shirt_changes, team_names, player_names):
+    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(SHIRT_CHANGE_COLUMNS)
+        csvwriter.writerows(
+            [
+                team_id,
+                team_names.get(team_id, ""),
+                player_id,
+                player_names.get(player_id, ""),
+                old_shirt_number,
+                new_shirt_number,
+            ]
+            for team_id, player_id, old_shirt_number, new_shirt_number in shirt_changes
+        )
@@ -0,0 +1,143 @@
+import json
+import os
+
+from csv_utils import SQUAD_COLUMNS, iter_squad_rows, write_to_csv
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the npy format is only offered with it
+    np = None
+
+# Squad exporters by format name, see register_exporter
+EXPORTERS = {}
+
+# Formats chosen by output file extension when none is given
+EXPORT_FORMAT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl"}
+
+
+def register_exporter(export_format, exporter):
+    """
+    Register a squad exporter under a format name.
+
+    An exporter is called as exporter(output_path, teams_data, team_names,
+    player_names, skip_empty) and writes every team's squad to output_path,
+    leaving out empty slots where skip_empty is set and the format allows it.
+    """
+    EXPORTERS[export_format] = exporter
+
+
+def get_export_format(output_path, export_format=None):
+    """
+    Return the format to export to: the one given, or the one the output
+    file's extension stands for, CSV by default.
+
+    Raises:
+        ValueError: If the format has no exporter
+    """
+    if export_format is None:
+        extension = os.path.splitext(output_path)[1].lower()
+        export_format = EXPORT_FORMAT_EXTENSIONS.get(extension, "csv")
+    if export_format not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return export_format
+
+
+def export_squads(
+    output_path,
+    teams_data,
+    team_names,
+    player_names,
+    export_format=None,
+    skip_empty=False,
+):
+    """Write the squads with the exporter of the given or inferred format."""
+    exporter = EXPORTERS[get_export_format(output_path, export_format)]
+    exporter(output_path, teams_data, team_names, player_names, skip_empty)
+
+
+def write_squads_jsonl(
+    output_path, teams_data, team_names, player_names, skip_empty=False
+):
+    """Write one JSON object per team with the players of its slots in order."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        for team in teams_data:
+            players = [
+                dict(zip(SQUAD_COLUMNS[2:], row[2:]))
+                for row in iter_squad_rows([team], team_names, player_names, skip_empty)
+            ]
+            line = {
+                "TeamID": team[0],
+                "TeamName": team_names.get(team[0], "Unknown Team"),
+                "Players": players,
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def get_slot_matrix(teams_data, column, dtype):
+    """Return a team x 40 matrix of a teams_data column, padding short records."""
+    matrix = np.zeros((len(teams_data), 40), dtype=dtype)
+    for row, team in enumerate(teams_data):
+        matrix[row, : len(team[column])] = team[column]
+    return matrix
+
+
+def write_squads_npy(
+    output_path, teams_data, team_names, player_names, skip_empty=False
+):
+    """
+    Write the squads as a directory of .npy files, one per array, which
+    load_squads_npy or np.load(..., mmap_mode="r") maps without reading them:
+
+    - team_ids: uint32 array of the team IDs, one per row
+    - player_ids, shirt_numbers: team x 40 slot matrices of uint32 and uint16
+    - team_names: name of each team, in row order
+    - player_name_ids, player_names: sorted IDs of the players in the squads
+      and their names, to look names up with np.searchsorted
+
+    Empty slots stay 0 in the matrices, so skip_empty has no effect here.
+    """
+    team_ids = np.array([team[0] for team in teams_data], dtype=np.uint32)
+    player_ids = get_slot_matrix(teams_data, 1, np.uint32)
+    shirt_numbers = get_slot_matrix(teams_data, 2, np.uint16)
+
+    player_name_ids = np.unique(player_ids)
+    player_name_ids = player_name_ids[player_name_ids != 0]
+
+    arrays = {
+        "team_ids": team_ids,
+        "player_ids": player_ids,
+        "shirt_numbers": shirt_numbers,
+        "team_names": np.array(
+            [team_names.get(int(team_id), "Unknown Team") for team_id in team_ids],
+            dtype=str,
+        ),
+        "player_name_ids": player_name_ids,
+        "player_names": np.array(
+            [
+                player_names.get(int(player_id), "Unknown Player")
+                for player_id in player_name_ids
+            ],
+            dtype=str,
+        ),
+    }
+
+    os.makedirs(output_path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(output_path, f"{name}.npy"), array)
+
+
+def load_squads_npy(squads_dir, mmap_mode="r"):
+    """Return the arrays write_squads_npy wrote, by name, memory-mapped by default."""
+    return {
+        os.path.splitext(file_name)[0]: np.load(
+            os.path.join(squads_dir, file_name), mmap_mode=mmap_mode
+        )
+        for file_name in sorted(os.listdir(squads_dir))
+        if file_name.endswith(".npy")
+    }
+
+
+register_exporter("csv", write_to_csv)
+register_exporter("jsonl", write_squads_jsonl)
+if np is not None:
+    register_exporter("npy", write_squads_npy)
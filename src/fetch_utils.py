@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from transfermarkt_utils import (
+    DEFAULT_SEASON,
+    TRANSFERMARKT_URL,
+    crawl_pages,
+    extract_latest_transfers,
+    extract_team_transfers,
+    find_team,
+    get_latest_transfers_url,
+    get_search_url,
+    get_team_transfers_url,
+    parse_listing_page,
+    parse_search_results,
+)
+
+# Date of transfers taken from team pages, which do not show one
+UNKNOWN_DATE = "N/A"
+
+
+def fetch_team(fetcher, team_name, season=DEFAULT_SEASON, base_url=TRANSFERMARKT_URL):
+    """
+    Search a team and return the transfers on its transfers page.
+
+    Returns:
+        list: Transfer lists as returned by extract_team_transfers, or None if
+            the search finds no team
+    """
+    search_html = fetcher.fetch(get_search_url(team_name, base_url))
+    team_slug, team_id = find_team(parse_search_results(search_html), team_name)
+    if not team_slug or not team_id:
+        return None
+
+    page_url = get_team_transfers_url(team_slug, team_id, season, base_url)
+    page = parse_listing_page(fetcher.fetch(page_url), page_url)
+    return extract_team_transfers(page.tables, team_name, team_id)
+
+
+def fetch_league(fetcher, league, base_url=TRANSFERMARKT_URL):
+    """Return the transfers on every page of a league's latest transfers."""
+    transfers = []
+    for _, page in crawl_pages(get_latest_transfers_url(league, base_url), fetcher):
+        transfers.extend(extract_latest_transfers(page.tables))
+    return transfers
+
+
+def get_transfer_key(transfer):
+    """
+    Return what identifies a transfer across pages: the Transfermarkt IDs of
+    the player and both clubs, or their names where an ID is missing.
+    """
+    _, player, from_club, to_club, *tm_ids = transfer
+    tm_ids += [""] * (3 - len(tm_ids))
+    return tuple(
+        tm_id or name.casefold()
+        for name, tm_id in zip((player, from_club, to_club), tm_ids)
+    )
+
+
+def dedupe_transfers(transfers):
+    """
+    Drop transfers seen more than once, e.g. on both clubs' team pages or on a
+    team page and a league page. The first one is kept, except that a dated
+    transfer replaces one from a team page without a date.
+    """
+    unique_transfers = {}
+    for transfer in transfers:
+        key = get_transfer_key(transfer)
+        seen_transfer = unique_transfers.get(key)
+        if seen_transfer is None or (
+            seen_transfer[0] == UNKNOWN_DATE and transfer[0] != UNKNOWN_DATE
+        ):
+            unique_transfers[key] = transfer
+    return list(unique_transfers.values())
+
+
+def fetch_batch(
+    fetcher,
+    team_names=(),
+    leagues=(),
+    season=DEFAULT_SEASON,
+    base_url=TRANSFERMARKT_URL,
+):
+    """
+    Fetch the transfers of many teams and leagues concurrently.
+
+    Every team and league runs as its own job on a pool as large as the
+    fetcher's, and all requests go through the fetcher, so its concurrency
+    and rate limits hold for the whole batch.
+
+    Args:
+        fetcher (PageFetcher): Fetcher shared by all jobs
+        team_names (list): Team names to search and fetch the transfers page of
+        leagues (list): League codes to fetch the latest transfers of
+        season (int): Season of the team transfer pages
+        base_url (str): Transfermarkt or a stand-in for it
+
+    Returns:
+        tuple: The deduplicated transfers in job order, and a list of
+            (team name or league code, error message) for failed jobs, e.g.
+            on request errors or pages the parsers cannot read
+    """
+    jobs = [
+        (team_name, fetch_team, (team_name, season, base_url))
+        for team_name in team_names
+    ] + [(league, fetch_league, (league, base_url)) for league in leagues]
+
+    def run_job(job):
+        _, function, arguments = job
+        try:
+            transfers = function(fetcher, *arguments)
+        except requests.RequestException as e:
+            return None, str(e)
+        except Exception as e:
+            # A page whose layout changed fails its job, not the whole batch
+            return None, f"{type(e).__name__}: {e}"
+        if transfers is None:
+            return None, "team not found"
+        return transfers, None
+
+    transfers = []
+    failures = []
+    with ThreadPoolExecutor(max_workers=fetcher.max_workers) as executor:
+        for job, (job_transfers, error) in zip(jobs, executor.map(run_job, jobs)):
+            if error is not None:
+                failures.append((job[0], error))
+            else:
+                transfers.extend(job_transfers)
+
+    return dedupe_transfers(transfers), failures
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cache_utils import get_cache_dir
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.106 Safari/537.36"
+
+# Concurrent requests and request rate used unless the caller asks otherwise
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+
+# Cached pages younger than this are used without asking the server
+DEFAULT_CACHE_TTL = 60 * 60
+
+
+class CacheMissError(requests.RequestException):
+    """A page is not in the HTTP cache while fetching offline."""
+
+
+def create_session(pool_size=DEFAULT_MAX_WORKERS, retries=3):
+    """
+    Return a requests session with a keep-alive connection pool of pool_size
+    connections per host, retrying rate limited and failed requests.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RateLimiter:
+    """
+    Spaces out requests shared by any number of threads so that at most
+    requests_per_second start each second. None or 0 disables the limit.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self._next_time = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_time = max(now, self._next_time)
+            self._next_time = start_time + self.interval
+        if start_time > now:
+            time.sleep(start_time - now)
+
+
+class HttpCache:
+    """
+    On-disk cache of fetched pages with their ETag and Last-Modified headers.
+
+    Each URL is stored as one JSON file named after the URL's hash, written
+    atomically so concurrent fetchers never read partial entries.
+
+    Args:
+        cache_dir (str): Directory of the entries, defaults to the tool's cache
+        ttl (float): Seconds a page is used without revalidating it
+    """
+
+    def __init__(self, cache_dir=None, ttl=DEFAULT_CACHE_TTL):
+        self.cache_dir = cache_dir or get_cache_dir("http")
+        self.ttl = ttl
+
+    def get_entry_path(self, url):
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{url_hash}.json")
+
+    def get(self, url):
+        """Return the cached entry of a URL, or None."""
+        try:
+            with open(self.get_entry_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def get_validators(self, entry):
+        """Return the headers turning a request for the entry into a conditional one."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, text, etag=None, last_modified=None):
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "text": text,
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, self.get_entry_path(url))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return entry
+
+    def refresh(self, url, entry, response):
+        """Restart the TTL of an entry the server confirmed with a 304."""
+        return self.store(
+            url,
+            entry["text"],
+            response.headers.get("ETag") or entry.get("etag"),
+            response.headers.get("Last-Modified") or entry.get("last_modified"),
+        )
+
+
+class PageFetcher:
+    """
+    Fetches pages over one pooled session, at most max_workers at a time and
+    no faster than the rate limiter allows. The fetcher can be shared by
+    several threads, the limits hold across all of them.
+
+    Args:
+        max_workers (int): Number of pages fetched concurrently
+        rate_limiter (RateLimiter): Shared limiter, defaults to a new one
+        session (requests.Session): Session to use, defaults to create_session()
+        timeout (float): Seconds to wait for each response
+        cache (HttpCache): Cache to serve and revalidate pages from, none by
+            default
+        offline (bool): Serve pages from the cache only, never from the network
+    """
+
+    def __init__(
+        self,
+        max_workers=DEFAULT_MAX_WORKERS,
+        rate_limiter=None,
+        session=None,
+        timeout=30,
+        cache=None,
+        offline=False,
+    ):
+        if offline and cache is None:
+            raise ValueError("Fetching offline needs an HTTP cache")
+
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.session = session or create_session(pool_size=max_workers)
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self._request_slots = threading.BoundedSemaphore(max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def fetch(self, url):
+        """
+        Return the text of a page, raising requests.HTTPError on failure.
+
+        With a cache, fresh pages come from disk, stale ones are revalidated
+        with a conditional request and a 304 response is served from disk.
+
+        Raises:
+            CacheMissError: If the page is not cached while offline
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if self.offline:
+            if entry is None:
+                raise CacheMissError(f"{url} is not in the HTTP cache")
+            return entry["text"]
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry["text"]
+
+        headers = self.cache.get_validators(entry) if entry is not None else None
+        with self._request_slots:
+            self.rate_limiter.wait()
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.refresh(url, entry, response)
+            return entry["text"]
+
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.store(
+                url,
+                response.text,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        return response.text
+
+    def fetch_all(self, urls):
+        """Fetch pages concurrently and return their texts in the order of urls."""
+        urls = list(urls)
+        if len(urls) <= 1 or self.max_workers <= 1:
+            return [self.fetch(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def close(self):
+        self.session.close()
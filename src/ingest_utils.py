@@ -0,0 +1,139 @@
+import heapq
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from csv_utils import iter_transfer_rows
+
+# TransferDate formats: Transfermarkt's, then ISO and common day-first ones
+TRANSFER_DATE_FORMATS = ["%b %d, %Y", "%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y"]
+
+# Files read ahead of the one being merged, per worker
+READ_AHEAD_PER_WORKER = 2
+
+
+def parse_transfer_date(text):
+    """Return the date of a TransferDate value, or None if it has none."""
+    text = text.strip()
+    for date_format in TRANSFER_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def list_transfer_files(path):
+    """
+    Return the transfers CSVs at path: the file itself, or the .csv files of a
+    directory sorted by name.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return [
+        os.path.join(path, file_name)
+        for file_name in sorted(os.listdir(path))
+        if file_name.endswith(".csv")
+    ]
+
+
+def iter_keyed_transfers(file_index, file_path):
+    """
+    Yield (sort key, transfer) for each row of a transfers CSV.
+
+    The key orders transfers by date, then by file and row. Transfers without
+    a date count as older than any dated one.
+    """
+    for row_index, (transfer_date, transfer) in enumerate(
+        iter_transfer_rows(file_path)
+    ):
+        key = (parse_transfer_date(transfer_date) or date.min, file_index, row_index)
+        yield key, transfer
+
+
+def read_transfer_file(file_index, file_path):
+    """Read a transfers CSV into (sort key, transfer) tuples sorted by key."""
+    keyed_transfers = list(iter_keyed_transfers(file_index, file_path))
+    keyed_transfers.sort(key=lambda keyed_transfer: keyed_transfer[0])
+    return keyed_transfers
+
+
+def get_first_key(file_index, file_path):
+    """Return the smallest sort key of a transfers CSV, or None if it is empty."""
+    return min(
+        (key for key, _ in iter_keyed_transfers(file_index, file_path)), default=None
+    )
+
+
+def read_ahead(executor, function, arguments, window):
+    """
+    Like executor.map, but only up to window calls run ahead of the result
+    being consumed, so results are not all held in memory at once.
+    """
+    pending = deque()
+    arguments = iter(arguments)
+    for argument in arguments:
+        pending.append(executor.submit(function, *argument))
+        if len(pending) >= window:
+            break
+
+    while pending:
+        result = pending.popleft().result()
+        for argument in arguments:
+            pending.append(executor.submit(function, *argument))
+            break
+        yield result
+
+
+def iter_transfers(path, max_workers=None):
+    """
+    Stream the transfers of a CSV or a directory of CSVs in date order.
+
+    Every transfer is yielded, also several of the same player, so a chain of
+    moves keeps all its legs. compile_transfers reduces them to each player's
+    net move.
+
+    A first pass finds the earliest transfer of each file. Files are then read
+    in parallel, a few at a time, in the order of their earliest transfer, and
+    transfers are yielded as soon as no file still to be read can hold an
+    earlier one. Memory grows with how much the files' dates overlap, so
+    files covering one period each, such as weekly ones, are held one or two
+    at a time.
+
+    Args:
+        path (str): Transfers CSV or a directory of them
+        max_workers (int): Files read at once, defaults to the CPU count
+
+    Yields:
+        tuple: Transfers as returned by read_transfers
+    """
+    file_paths = list_transfer_files(path)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        first_keys = list(
+            executor.map(get_first_key, range(len(file_paths)), file_paths)
+        )
+        files = sorted(
+            (first_key, file_index)
+            for file_index, first_key in enumerate(first_keys)
+            if first_key is not None
+        )
+
+        file_transfers = read_ahead(
+            executor,
+            read_transfer_file,
+            ((file_index, file_paths[file_index]) for _, file_index in files),
+            max_workers * READ_AHEAD_PER_WORKER,
+        )
+
+        # Keys are unique, so the heap never compares two transfers
+        pending = []
+        for position, keyed_transfers in enumerate(file_transfers):
+            for keyed_transfer in keyed_transfers:
+                heapq.heappush(pending, keyed_transfer)
+
+            next_key = files[position + 1][0] if position + 1 < len(files) else None
+            while pending and (next_key is None or pending[0][0] < next_key):
+                yield heapq.heappop(pending)[1]
@@ -0,0 +1,236 @@
+from rapidfuzz import fuzz, process
+
+from crosswalk_utils import CLUB, PLAYER
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, queries are matched one by one without it
+    np = None
+
+# Queries scored against all choices at once, bounds the score matrix memory
+MATCH_CHUNK_SIZE = 256
+
+# cdist scores are float32, so candidates this close to the best are rescored
+SCORE_TOLERANCE = 0.01
+
+
+class BatchMatcher:
+    """
+    Fuzzy matcher scoring many queries against one list of reference names.
+
+    The choices are prepared once and every batch of queries is scored with a
+    single multi-threaded process.cdist call. The best match is the first
+    choice with the highest exact score, just like process.extractOne.
+
+    Args:
+        choices (iterable): Reference names
+        scorer: RapidFuzz scorer, fuzz.ratio by default
+        top_k (int): Number of candidates kept per query
+        workers (int): Threads used by cdist, -1 for all cores
+    """
+
+    def __init__(self, choices, scorer=fuzz.ratio, top_k=5, workers=-1):
+        self.choices = list(choices)
+        self.scorer = scorer
+        self.top_k = top_k
+        self.workers = workers
+
+    def match(self, queries, score_cutoff=0):
+        """
+        Find the best match for every query.
+
+        Args:
+            queries (iterable): Names to match, duplicates are scored once
+            score_cutoff (float): Minimum score for a choice to be listed as a
+                candidate, the best match is returned regardless
+
+        Returns:
+            dict: Query -> (best choice, score, candidates), where candidates are
+                up to top_k (choice, score) tuples, best first. The best choice
+                is None and the score 0 when there are no choices.
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        if not self.choices:
+            return {query: (None, 0, []) for query in unique_queries}
+        if np is None:
+            return {
+                query: self._match_one(query, score_cutoff) for query in unique_queries
+            }
+
+        matches = {}
+        for start in range(0, len(unique_queries), MATCH_CHUNK_SIZE):
+            chunk = unique_queries[start : start + MATCH_CHUNK_SIZE]
+            scores = process.cdist(
+                chunk, self.choices, scorer=self.scorer, workers=self.workers
+            )
+            for query, row in zip(chunk, scores):
+                matches[query] = self._pick(query, row, score_cutoff)
+        return matches
+
+    def _pick(self, query, row, score_cutoff):
+        # Rescore everything near the top exactly so ties resolve like extractOne
+        near_best = np.flatnonzero(row >= row.max() - SCORE_TOLERANCE)
+        best_score, best_index = max(
+            (self.scorer(query, self.choices[index]), -index) for index in near_best
+        )
+        best_index = -best_index
+
+        top_k = min(self.top_k, len(self.choices))
+        top_indices = np.argpartition(row, -top_k)[-top_k:]
+        top_indices = top_indices[np.argsort(-row[top_indices], kind="stable")]
+        candidates = [(self.choices[best_index], best_score)]
+        for index in top_indices:
+            if index != best_index and row[index] >= score_cutoff:
+                candidates.append((self.choices[index], float(row[index])))
+        if best_score < score_cutoff:
+            candidates = candidates[1:]
+
+        return self.choices[best_index], best_score, candidates[:top_k]
+
+    def _match_one(self, query, score_cutoff):
+        extracted = process.extract(
+            query, self.choices, scorer=self.scorer, limit=self.top_k
+        )
+        best_choice, best_score, _ = extracted[0]
+        candidates = [
+            (choice, score) for choice, score, _ in extracted if score >= score_cutoff
+        ]
+        return best_choice, best_score, candidates
+
+
+class EntityMatcher:
+    """
+    Resolves scraped names of one kind of entity, players or clubs, to
+    reference IDs by crosswalk lookup first and fuzzy matching second.
+    """
+
+    def __init__(self, kind, rows, name_column, id_column, crosswalk, version):
+        self.kind = kind
+        self.reference = {row[name_column]: row[id_column] for row in rows}
+        self.names_by_id = {row[id_column]: row[name_column] for row in rows}
+        self.crosswalk = crosswalk
+        self.version = version
+        self.known = {}
+        self.matches = {}
+        self.confidence_threshold = 0
+
+    def match(self, queries, confidence_threshold):
+        """
+        Look up and fuzzy match (name, Transfermarkt ID) queries.
+
+        Known IDs whose PES ID left the reference, or whose stored match is
+        below the threshold, are matched again.
+        """
+        self.confidence_threshold = confidence_threshold
+        if self.crosswalk is not None:
+            known = self.crosswalk.lookup(
+                self.kind,
+                self.version,
+                [tm_id for _, tm_id in queries],
+                min_confidence=confidence_threshold,
+            )
+            self.known = {
+                tm_id: pair
+                for tm_id, pair in known.items()
+                if pair[0] in self.names_by_id
+            }
+
+        self.matches = BatchMatcher(self.reference).match(
+            (name for name, tm_id in queries if tm_id not in self.known),
+            confidence_threshold,
+        )
+
+        if self.crosswalk is not None:
+            new_pairs = {}
+            for name, tm_id in queries:
+                if tm_id and tm_id not in self.known:
+                    best_match, confidence, _ = self.matches[name]
+                    if best_match is not None and confidence >= confidence_threshold:
+                        new_pairs[tm_id] = (self.reference[best_match], confidence)
+            self.crosswalk.store(self.kind, self.version, new_pairs)
+
+    def resolve(self, name, tm_id, miss_id=0, default_id=0):
+        """
+        Return (ID, name, confidence) for a matched query. Names below the
+        threshold get miss_id, accepted matches missing from the reference
+        get default_id.
+        """
+        if tm_id in self.known:
+            pes_id, confidence = self.known[tm_id]
+            return pes_id, self.names_by_id[pes_id], confidence
+
+        best_match, confidence, _ = self.matches[name]
+        if best_match is not None and confidence >= self.confidence_threshold:
+            return self.reference.get(best_match, default_id), best_match, confidence
+        return miss_id, name, confidence
+
+
+def match_transfers(
+    transfers,
+    players_data,
+    teams_data,
+    confidence_threshold=80,
+    miss_id=0,
+    default_id=0,
+    crosswalk=None,
+    player_version="",
+    team_version="",
+):
+    """
+    Match scraped transfers with the reference players and teams.
+
+    With a crosswalk, players and clubs whose Transfermarkt ID was confirmed,
+    or matched before at or above the threshold, are resolved by that ID and
+    only the rest are fuzzy matched. New matches at or above the threshold are
+    added to the crosswalk.
+
+    Args:
+        transfers (list): [date, player, from_club, to_club] lists, optionally
+            followed by the Transfermarkt player, from club and to club IDs
+        players_data (list): Rows with PlayerName and PlayerID
+        teams_data (list): Rows with TeamName and TeamID
+        confidence_threshold (int): Minimum score to accept a match
+        miss_id: ID used for names without a match at or above the threshold
+        default_id: ID used when an accepted match is missing from the
+            reference data
+        crosswalk (Crosswalk): Store of known Transfermarkt -> PES ID pairs
+        player_version (str): Version of the players reference in the crosswalk
+        team_version (str): Version of the teams reference in the crosswalk
+
+    Returns:
+        list: [date, player_id, player_name, player_confidence, from_team_id,
+            from_team_name, from_team_confidence, to_team_id, to_team_name,
+            to_team_confidence] lists
+    """
+    transfers = [
+        (*transfer[:4], *transfer[4:7], *[""] * (7 - len(transfer)))
+        for transfer in transfers
+    ]
+
+    player_matcher = EntityMatcher(
+        PLAYER, players_data, "PlayerName", "PlayerID", crosswalk, player_version
+    )
+    team_matcher = EntityMatcher(
+        CLUB, teams_data, "TeamName", "TeamID", crosswalk, team_version
+    )
+    player_matcher.match(
+        [(transfer[1], transfer[4]) for transfer in transfers], confidence_threshold
+    )
+    team_matcher.match(
+        [(transfer[2], transfer[5]) for transfer in transfers]
+        + [(transfer[3], transfer[6]) for transfer in transfers],
+        confidence_threshold,
+    )
+
+    matched_transfers = []
+    for date, player, from_club, to_club, player_id, from_id, to_id in transfers:
+        matched_transfers.append(
+            [
+                date,
+                *player_matcher.resolve(player, player_id, miss_id, default_id),
+                *team_matcher.resolve(from_club, from_id, miss_id, default_id),
+                *team_matcher.resolve(to_club, to_id, miss_id, default_id),
+            ]
+        )
+
+    return matched_transfers
@@ -0,0 +1,132 @@
+import csv
+import json
+import os
+from collections import namedtuple
+
+APPLIED = "applied"
+ALREADY_PRESENT = "already-present"
+NOT_FOUND = "not-found"
+NO_SLOT = "no-slot"
+CYCLE = "cycle"
+
+OUTCOMES = [APPLIED, ALREADY_PRESENT, NOT_FOUND, NO_SLOT, CYCLE]
+
+# Why a transfer was not applied, where the outcome alone does not say
+PLAYER_NOT_IN_NAMES = "player not in player names"
+PLAYER_NOT_IN_TEAM = "player not in team"
+TEAMS_NOT_IN_SAVE = "teams not in save"
+
+TransferRecord = namedtuple(
+    "TransferRecord",
+    [
+        "index",
+        "player_id",
+        "player_name",
+        "from_team_id",
+        "from_team_name",
+        "to_team_id",
+        "to_team_name",
+        "outcome",
+        "detail",
+    ],
+)
+
+
+def make_transfer_record(index, transfer, outcome, detail=""):
+    return TransferRecord(index, *transfer, outcome, detail)
+
+
+def describe_transfer_record(record):
+    """Return the console message for a transfer record."""
+    player = f"player {record.player_name} ({record.player_id})"
+    teams = f"From Team: {record.from_team_name} ({record.from_team_id}), To Team: {record.to_team_name} ({record.to_team_id})."
+
+    if record.outcome == APPLIED:
+        return f"Transfer successful for {player}. {teams}"
+    if record.outcome == CYCLE:
+        return f"Transfer successful as part of a swap for {player}. {teams}"
+    if record.outcome == ALREADY_PRESENT:
+        return f"Player is already in the team. Skipping transfer for {player}. {teams}"
+    if record.outcome == NO_SLOT:
+        return f"No empty spot in the new team. Skipping transfer for {player}. {teams}"
+    if record.detail == PLAYER_NOT_IN_NAMES:
+        return f"Player {record.player_name} ({record.player_id}) not found. Skipping transfer. {teams}"
+    if record.detail == PLAYER_NOT_IN_TEAM:
+        return f"Player is not in the team. Skipping transfer for {player}. {teams}"
+    return f"Teams not found in the save. Skipping transfer for {player}. {teams}"
+
+
+class TransferResult:
+    """
+    Outcome of apply_transfers: the updated squads, the IDs of the teams that
+    changed, one record per transfer and counts per outcome.
+    """
+
+    def __init__(self):
+        self.teams_data = []
+        self.dirty_team_ids = set()
+        self.records = []
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+
+    def add(self, record):
+        self.records.append(record)
+        self.counts[record.outcome] += 1
+
+    def summary(self):
+        counts = ", ".join(f"{outcome}: {self.counts[outcome]}" for outcome in OUTCOMES)
+        return f"Processed {len(self.records)} transfers ({counts})."
+
+
+class TransferReportWriter:
+    """
+    Buffered JSON Lines or CSV sink for transfer records.
+
+    Args:
+        output_path (str): File to write, the format follows the extension
+            (.jsonl or .csv) unless given
+        report_format (str): "jsonl" or "csv"
+        buffer_size (int): Number of records kept before writing them out
+    """
+
+    def __init__(self, output_path, report_format=None, buffer_size=1000):
+        if report_format is None:
+            extension = os.path.splitext(output_path)[1].lower()
+            report_format = "csv" if extension == ".csv" else "jsonl"
+        if report_format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported report format: {report_format}")
+
+        self.report_format = report_format
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._file = open(output_path, "w", newline="", encoding="utf-8")
+        if report_format == "csv":
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(TransferRecord._fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.report_format == "csv":
+            self._writer.writerows(self._buffer)
+        else:
+            self._file.writelines(
+                json.dumps(record._asdict(), ensure_ascii=False) + "\n"
+                for record in self._buffer
+            )
+        self._buffer = []
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
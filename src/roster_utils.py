@@ -0,0 +1,249 @@
+import csv
+import os
+import re
+from bisect import bisect_right
+from collections.abc import Mapping
+
+from csv_utils import read_csv_mapping
+
+ROSTER_CSV_PATTERN = re.compile(r"^(?P<version>.+)_players\.csv$")
+ROSTER_DIFF_PATTERN = re.compile(r"^diff_(?P<old>[^-]+)-(?P<new>[^-]+)_players\.diff$")
+
+
+def get_roster_csv_path(data_dir, version):
+    return os.path.join(data_dir, f"{version}_players.csv")
+
+
+def get_roster_diff_path(data_dir, old_version, new_version):
+    return os.path.join(data_dir, f"diff_{old_version}-{new_version}_players.diff")
+
+
+def parse_roster_diff(diff_path):
+    """
+    Read a unified diff between two player CSVs.
+
+    Returns:
+        dict: Changed player IDs mapped to their new name, or None if the
+            player was removed
+    """
+    removed = {}
+    added = {}
+    with open(diff_path, "r", encoding="utf-8") as diff_file:
+        for line in diff_file:
+            if line.startswith(("+++", "---")):
+                continue
+            if not line.startswith(("+", "-")):
+                continue
+            row = next(csv.reader([line[1:].rstrip("\r\n")]), None)
+            if not row or not row[0].isdigit():
+                # The header row, should it ever change
+                continue
+            target = added if line[0] == "+" else removed
+            target[int(row[0])] = row[1]
+
+    changes = dict.fromkeys(removed)
+    for player_id, name in added.items():
+        if removed.get(player_id) == name:
+            # Moved rather than changed, e.g. by an edit next to it
+            del changes[player_id]
+        else:
+            changes[player_id] = name
+    return changes
+
+
+def compute_roster_delta(old_mapping, new_mapping):
+    """Return the changes from one ID -> name mapping to another, like parse_roster_diff."""
+    changes = {
+        player_id: None for player_id in old_mapping if player_id not in new_mapping
+    }
+    for player_id, name in new_mapping.items():
+        if old_mapping.get(player_id) != name:
+            changes[player_id] = name
+    return changes
+
+
+def discover_roster_versions(data_dir):
+    """
+    Return the roster versions in data_dir, oldest first.
+
+    The order follows the chain of diff files. Without diffs the versions are
+    sorted by name.
+    """
+    versions = set()
+    next_versions = {}
+    for file_name in os.listdir(data_dir):
+        csv_match = ROSTER_CSV_PATTERN.match(file_name)
+        if csv_match and not file_name.startswith("diff_"):
+            versions.add(csv_match.group("version"))
+            continue
+        diff_match = ROSTER_DIFF_PATTERN.match(file_name)
+        if diff_match:
+            next_versions[diff_match.group("old")] = diff_match.group("new")
+
+    later_versions = set(next_versions.values())
+    bases = sorted(
+        version for version in next_versions if version not in later_versions
+    )
+    if not bases:
+        return sorted(versions)
+
+    chain = [bases[0]]
+    while chain[-1] in next_versions and next_versions[chain[-1]] not in chain:
+        chain.append(next_versions[chain[-1]])
+
+    # Versions outside the chain of diffs are compared against their CSVs
+    return chain + sorted(versions.difference(chain))
+
+
+class RosterStore:
+    """
+    Every player roster version, kept as one base mapping plus per-version
+    deltas.
+
+    Only player IDs that change between versions get a history: a list of
+    (version index, name) entries, with None for a removed player. A name at
+    any version is found by bisecting that history, and a full mapping is
+    rebuilt in linear time by replaying the deltas over the base.
+
+    Args:
+        base_version (str): Name of the oldest version
+        base_mapping (dict): ID -> name mapping of the oldest version
+    """
+
+    def __init__(self, base_version, base_mapping):
+        self.versions = [base_version]
+        self.deltas = [{}]
+        self._version_indices = {base_version: 0}
+        self._base = dict(base_mapping)
+        self._history = {}
+        self._sizes = [len(self._base)]
+
+    @classmethod
+    def from_directory(cls, data_dir, versions=None):
+        """
+        Build a store from the player CSVs and diffs in data_dir.
+
+        Only the base version's CSV is read in full. Each following version is
+        built from the diff against its predecessor, or by comparing the two
+        CSVs when there is no diff.
+        """
+        versions = versions or discover_roster_versions(data_dir)
+        if not versions:
+            raise FileNotFoundError(f"No player rosters found in {data_dir}")
+
+        store = cls(
+            versions[0], read_csv_mapping(get_roster_csv_path(data_dir, versions[0]))
+        )
+        for old_version, new_version in zip(versions, versions[1:]):
+            diff_path = get_roster_diff_path(data_dir, old_version, new_version)
+            if os.path.exists(diff_path):
+                changes = parse_roster_diff(diff_path)
+            else:
+                changes = compute_roster_delta(
+                    store.mapping(old_version),
+                    read_csv_mapping(get_roster_csv_path(data_dir, new_version)),
+                )
+            store.add_version(new_version, changes)
+        return store
+
+    def add_version(self, version, changes):
+        """
+        Append a version on top of the latest one.
+
+        Args:
+            version (str): Name of the new version
+            changes (dict): Player ID -> new name, or None for removed players
+        """
+        if version in self._version_indices:
+            raise ValueError(f"Duplicate roster version: {version}")
+
+        version_index = len(self.versions)
+        previous_index = version_index - 1
+        size = self._sizes[-1]
+        delta = {}
+        for player_id, name in changes.items():
+            old_name = self._name_at(player_id, previous_index)
+            if old_name == name:
+                continue
+            delta[player_id] = name
+            size += (name is not None) - (old_name is not None)
+            self._history.setdefault(player_id, []).append((version_index, name))
+
+        self.versions.append(version)
+        self.deltas.append(delta)
+        self._version_indices[version] = version_index
+        self._sizes.append(size)
+
+    def version_index(self, version):
+        try:
+            return self._version_indices[version]
+        except KeyError:
+            raise KeyError(f"Unknown roster version: {version}") from None
+
+    def _name_at(self, player_id, version_index):
+        history = self._history.get(player_id)
+        if history:
+            position = bisect_right(history, version_index, key=lambda entry: entry[0])
+            if position > 0:
+                return history[position - 1][1]
+        return self._base.get(player_id)
+
+    def name(self, player_id, version, default=None):
+        """Return the player's name in the given version, or default."""
+        name = self._name_at(player_id, self.version_index(version))
+        return default if name is None else name
+
+    def size(self, version):
+        return self._sizes[self.version_index(version)]
+
+    def materialize(self, version):
+        """Return the full ID -> name dict of a version."""
+        mapping = dict(self._base)
+        for delta in self.deltas[1 : self.version_index(version) + 1]:
+            for player_id, name in delta.items():
+                if name is None:
+                    mapping.pop(player_id, None)
+                else:
+                    mapping[player_id] = name
+        return mapping
+
+    def mapping(self, version):
+        """Return a read-only mapping view of a version, usable like read_csv_mapping's dict."""
+        return RosterView(self, version)
+
+
+class RosterView(Mapping):
+    """
+    ID -> name mapping of one version of a RosterStore, without a copy of its
+    own. Iteration walks the base and the version's changes.
+    """
+
+    def __init__(self, store, version):
+        self.store = store
+        self.version = version
+        self._version_index = store.version_index(version)
+
+    def __getitem__(self, player_id):
+        name = self.store._name_at(player_id, self._version_index)
+        if name is None:
+            raise KeyError(player_id)
+        return name
+
+    def __contains__(self, player_id):
+        return self.store._name_at(player_id, self._version_index) is not None
+
+    def __iter__(self):
+        store = self.store
+        for player_id in store._base:
+            if player_id not in store._history or player_id in self:
+                yield player_id
+        for player_id in store._history:
+            if player_id not in store._base and player_id in self:
+                yield player_id
+
+    def __len__(self):
+        return self.store._sizes[self._version_index]
+
+
+def load_roster_store(data_dir="data"):
+    return RosterStore.from_directory(data_dir)
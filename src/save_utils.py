@@ -0,0 +1,100 @@
+import mmap
+from contextlib import contextmanager
+
+TEAM_ENTRIES_START_OFFSET = 10307144
+TEAM_ENTRIES_END_OFFSET = 10520143
+
+TEAMS_START_OFFSET = 0x8ED2FC
+TEAMS_END_OFFSET = 0x958DA3
+
+TACTICS_START_OFFSET = 10524800
+
+
+class SaveImage:
+    """
+    Memory-mapped view of a decrypted data.dat file.
+
+    The file is opened and mapped once, and every reader/writer works on
+    zero-copy memoryview windows over the mapping instead of seeking and
+    reading the file itself. Views handed out by this object must be released
+    (or go out of scope) before the image is closed.
+
+    Args:
+        binary_file_path (str): Path to the decrypted data.dat file
+        writable (bool): Map the file for writing. Changes are flushed to disk
+            when the image is closed.
+    """
+
+    def __init__(self, binary_file_path, writable=True):
+        self.binary_file_path = binary_file_path
+        self.writable = writable
+        self._file = open(binary_file_path, "r+b" if writable else "rb")
+        try:
+            self._mmap = mmap.mmap(
+                self._file.fileno(),
+                0,
+                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+            )
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._mmap)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def view(self, start, end=None):
+        """Return a memoryview over [start, end), clamped to the file size."""
+        size = len(self._mmap)
+        start = min(start, size)
+        end = size if end is None else max(start, min(end, size))
+        return self._view[start:end]
+
+    def team_player_table(self):
+        """Return a view over the team-player table."""
+        return self.view(TEAM_ENTRIES_START_OFFSET, TEAM_ENTRIES_END_OFFSET + 1)
+
+    def team_name_table(self):
+        """Return a view over the team name table."""
+        return self.view(TEAMS_START_OFFSET, TEAMS_END_OFFSET + 1)
+
+    def tactics_table(self):
+        """Return a view over the tactics table (up to the end of the file)."""
+        return self.view(TACTICS_START_OFFSET)
+
+    def flush(self):
+        if self.writable:
+            self._mmap.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+
+@contextmanager
+def open_save_image(binary_file_path, writable=False):
+    """
+    Yield a SaveImage for the given data.dat path, or the image itself if one
+    is passed in. Images opened here are closed on exit; images passed in are
+    left open for the caller.
+    """
+    if isinstance(binary_file_path, SaveImage):
+        yield binary_file_path
+        return
+
+    with SaveImage(binary_file_path, writable=writable) as image:
+        yield image
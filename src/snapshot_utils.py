@@ -0,0 +1,172 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from cache_utils import get_cache_dir, hash_file
+from csv_utils import read_csv_mapping
+
+SNAPSHOT_MAGIC = b"PESNAP1" + (b"L" if sys.byteorder == "little" else b"B")
+
+# Magic, CSV size, CSV mtime (ns), CSV SHA-256, entry count, name blob size
+SNAPSHOT_HEADER = struct.Struct("<8sQq32sQQ")
+
+
+def get_snapshot_path(csv_path, cache_dir=None):
+    """Return where the compiled snapshot of a CSV is stored."""
+    cache_dir = cache_dir or get_cache_dir("snapshots")
+    path_hash = hashlib.sha256(os.path.abspath(csv_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{path_hash[:32]}.snap")
+
+
+def write_snapshot(snapshot_path, mapping, csv_size, csv_mtime_ns, csv_sha256):
+    """
+    Write a snapshot of an ID -> name mapping: sorted uint32 IDs, uint32 offsets
+    into one UTF-8 blob of all names, and the blob itself.
+    """
+    player_ids = array("I", sorted(mapping))
+    offsets = array("I", [0])
+    names = bytearray()
+    for player_id in player_ids:
+        names += mapping[player_id].encode("utf-8")
+        offsets.append(len(names))
+
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC,
+        csv_size,
+        csv_mtime_ns,
+        bytes.fromhex(csv_sha256),
+        len(player_ids),
+        len(names),
+    )
+
+    # Write next to the final file and swap it in, so readers never see half
+    snapshot_dir = os.path.dirname(snapshot_path)
+    fd, temp_path = tempfile.mkstemp(dir=snapshot_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(player_ids.tobytes())
+            f.write(offsets.tobytes())
+            f.write(names)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_snapshot_header(snapshot_path):
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+    except OSError:
+        return None
+
+    if len(header) < SNAPSHOT_HEADER.size:
+        return None
+    fields = SNAPSHOT_HEADER.unpack(header)
+    if fields[0] != SNAPSHOT_MAGIC:
+        return None
+    return fields
+
+
+class RosterSnapshot(Mapping):
+    """
+    Read-only ID -> name mapping backed by a memory-mapped snapshot file.
+
+    Lookups bisect the sorted ID array and decode only the requested name.
+    """
+
+    def __init__(self, snapshot_path):
+        with open(snapshot_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        _, _, _, _, count, blob_size = SNAPSHOT_HEADER.unpack_from(self._mmap)
+        view = memoryview(self._mmap)
+        ids_start = SNAPSHOT_HEADER.size
+        offsets_start = ids_start + count * 4
+        blob_start = offsets_start + (count + 1) * 4
+
+        self._view = view
+        self._ids = view[ids_start:offsets_start].cast("I")
+        self._offsets = view[offsets_start:blob_start].cast("I")
+        self._names = view[blob_start : blob_start + blob_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _find(self, player_id):
+        index = bisect_left(self._ids, player_id)
+        if index < len(self._ids) and self._ids[index] == player_id:
+            return index
+        return None
+
+    def __getitem__(self, player_id):
+        index = self._find(player_id) if isinstance(player_id, int) else None
+        if index is None:
+            raise KeyError(player_id)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return str(self._names[start:end], "utf-8")
+
+    def __contains__(self, player_id):
+        return isinstance(player_id, int) and self._find(player_id) is not None
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def close(self):
+        for view in (self._ids, self._offsets, self._names, self._view):
+            view.release()
+        self._mmap.close()
+
+
+def load_player_names(csv_path, cache_dir=None):
+    """
+    Return the ID -> name mapping of a player CSV from its compiled snapshot,
+    compiling it first if there is none yet or the CSV changed.
+
+    A snapshot is reused while the CSV's size and mtime match. If only the
+    mtime changed, the content hash decides whether it is rebuilt.
+    """
+    snapshot_path = get_snapshot_path(csv_path, cache_dir)
+    csv_stat = os.stat(csv_path)
+    header = read_snapshot_header(snapshot_path)
+
+    if header is None or (header[1], header[2]) != (
+        csv_stat.st_size,
+        csv_stat.st_mtime_ns,
+    ):
+        csv_sha256 = hash_file(csv_path)
+        if header is not None and header[3] == bytes.fromhex(csv_sha256):
+            # Same content, only the timestamp moved: re-stamp the snapshot
+            with open(snapshot_path, "r+b") as f:
+                f.write(
+                    SNAPSHOT_HEADER.pack(
+                        SNAPSHOT_MAGIC,
+                        csv_stat.st_size,
+                        csv_stat.st_mtime_ns,
+                        *header[3:],
+                    )
+                )
+        else:
+            write_snapshot(
+                snapshot_path,
+                read_csv_mapping(csv_path),
+                csv_stat.st_size,
+                csv_stat.st_mtime_ns,
+                csv_sha256,
+            )
+
+    return RosterSnapshot(snapshot_path)
@@ -0,0 +1,171 @@
+import heapq
+
+# A squad has 40 slots, so the lowest unused shirt number is at most 41
+MAX_FREE_SHIRT_NUMBER = 41
+
+
+class SquadState:
+    """
+    Squads of every team with indexes for constant-time transfer steps.
+
+    Per team it keeps a min-heap of empty slots, a max-heap of occupied slots
+    and a min-heap of unused shirt numbers, plus a global player -> team -> slots
+    reverse index. Heaps are cleaned lazily: stale entries are dropped when they
+    reach the top.
+
+    The player and shirt lists from teams_data are updated in place, exactly as
+    the list-based transfer code did. The IDs of the teams changed since the
+    state was created are kept in dirty_team_ids, so only their records need
+    writing back.
+
+    Args:
+        teams_data (list): (team_id, player_ids, shirt_numbers) tuples
+    """
+
+    def __init__(self, teams_data):
+        self.teams = {}
+        self.locations = {}
+        self._free_slots = {}
+        self._occupied_slots = {}
+        self._shirt_counts = {}
+        self._free_shirts = {}
+        self.dirty_team_ids = set()
+
+        for team_id, team_player_ids, shirt_numbers in teams_data:
+            self.teams[team_id] = (team_player_ids, shirt_numbers)
+
+        # Later duplicates of a team ID replace earlier ones, like a dict would
+        for team_id, (team_player_ids, shirt_numbers) in self.teams.items():
+            self._index_team(team_id, team_player_ids, shirt_numbers)
+
+    def _index_team(self, team_id, team_player_ids, shirt_numbers):
+        free_slots = []
+        occupied_slots = []
+        for slot, player_id in enumerate(team_player_ids):
+            if player_id == 0:
+                free_slots.append(slot)
+            else:
+                occupied_slots.append(-slot)
+                self.locations.setdefault(player_id, {}).setdefault(team_id, []).append(
+                    slot
+                )
+        heapq.heapify(free_slots)
+        heapq.heapify(occupied_slots)
+
+        shirt_counts = {}
+        for shirt_number in shirt_numbers:
+            shirt_counts[shirt_number] = shirt_counts.get(shirt_number, 0) + 1
+        free_shirts = [
+            shirt_number
+            for shirt_number in range(1, MAX_FREE_SHIRT_NUMBER + 1)
+            if shirt_number not in shirt_counts
+        ]
+
+        self._free_slots[team_id] = free_slots
+        self._occupied_slots[team_id] = occupied_slots
+        self._shirt_counts[team_id] = shirt_counts
+        self._free_shirts[team_id] = free_shirts
+
+    def __contains__(self, team_id):
+        return team_id in self.teams
+
+    def has_player(self, team_id, player_id):
+        return team_id in self.locations.get(player_id, ())
+
+    def player_slot(self, team_id, player_id):
+        """Return the first slot of the player in the team."""
+        return min(self.locations[player_id][team_id])
+
+    def first_free_slot(self, team_id):
+        """Return the lowest empty slot of the team, or None if it is full."""
+        team_player_ids = self.teams[team_id][0]
+        free_slots = self._free_slots[team_id]
+        while free_slots and team_player_ids[free_slots[0]] != 0:
+            heapq.heappop(free_slots)
+        return free_slots[0] if free_slots else None
+
+    def last_occupied_slot(self, team_id):
+        """Return the highest slot holding a player, or None if the team is empty."""
+        team_player_ids = self.teams[team_id][0]
+        occupied_slots = self._occupied_slots[team_id]
+        while occupied_slots and team_player_ids[-occupied_slots[0]] == 0:
+            heapq.heappop(occupied_slots)
+        return -occupied_slots[0] if occupied_slots else None
+
+    def first_free_shirt_number(self, team_id):
+        """Return the lowest shirt number not used by any slot of the team."""
+        shirt_counts = self._shirt_counts[team_id]
+        free_shirts = self._free_shirts[team_id]
+        while free_shirts and shirt_counts.get(free_shirts[0], 0) > 0:
+            heapq.heappop(free_shirts)
+        return free_shirts[0]
+
+    def set_slot(self, team_id, slot, player_id, shirt_number):
+        """Put a player and shirt number into a slot, keeping the indexes current."""
+        team_player_ids, shirt_numbers = self.teams[team_id]
+        self.dirty_team_ids.add(team_id)
+
+        old_player_id = team_player_ids[slot]
+        if old_player_id != 0:
+            team_slots = self.locations[old_player_id][team_id]
+            team_slots.remove(slot)
+            if not team_slots:
+                del self.locations[old_player_id][team_id]
+                if not self.locations[old_player_id]:
+                    del self.locations[old_player_id]
+
+        old_shirt_number = shirt_numbers[slot]
+        shirt_counts = self._shirt_counts[team_id]
+        shirt_counts[old_shirt_number] -= 1
+        if shirt_counts[old_shirt_number] == 0:
+            del shirt_counts[old_shirt_number]
+            if 0 < old_shirt_number <= MAX_FREE_SHIRT_NUMBER:
+                heapq.heappush(self._free_shirts[team_id], old_shirt_number)
+        shirt_counts[shirt_number] = shirt_counts.get(shirt_number, 0) + 1
+
+        team_player_ids[slot] = player_id
+        shirt_numbers[slot] = shirt_number
+
+        if player_id == 0:
+            heapq.heappush(self._free_slots[team_id], slot)
+        else:
+            heapq.heappush(self._occupied_slots[team_id], -slot)
+            self.locations.setdefault(player_id, {}).setdefault(team_id, []).append(
+                slot
+            )
+
+    def remove_player(self, team_id, player_id):
+        """
+        Remove the player from the team by moving the team's last player into
+        the freed slot.
+
+        Returns:
+            int: The slot that was emptied, i.e. the last player's old slot
+        """
+        team_player_ids, shirt_numbers = self.teams[team_id]
+        slot = self.player_slot(team_id, player_id)
+        last_slot = self.last_occupied_slot(team_id)
+
+        self.set_slot(
+            team_id, slot, team_player_ids[last_slot], shirt_numbers[last_slot]
+        )
+        self.set_slot(team_id, last_slot, 0, 0)
+
+        return last_slot
+
+    def add_player(self, team_id, player_id, slot):
+        """
+        Put the player into the slot with the lowest unused shirt number.
+
+        Returns:
+            int: The player's shirt number
+        """
+        shirt_number = self.first_free_shirt_number(team_id)
+        self.set_slot(team_id, slot, player_id, shirt_number)
+        return shirt_number
+
+    def to_teams_data(self):
+        return [
+            (team_id, team_player_ids, shirt_numbers)
+            for team_id, (team_player_ids, shirt_numbers) in self.teams.items()
+        ]
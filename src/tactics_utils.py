@@ -1,39 +1,123 @@
 import struct
 
+from save_utils import TACTICS_START_OFFSET, open_save_image
 
-def update_tactics_for_team(binary_file_path, team_id, player_index):
-    tactics_start_offset = 10524800
-    team_block_size = 628
-    team_id_size = 4
-    padding_size = 480
-    player_indices_size = 40
-
-    with open(binary_file_path, "r+b") as f:
-        current_offset = tactics_start_offset
-
-        while True:
-            f.seek(current_offset)
-            current_team_id = struct.unpack("<I", f.read(team_id_size))[0]
-
-            if current_team_id == team_id:
-                f.seek(current_offset + team_id_size + padding_size)
-                player_indices = list(f.read(player_indices_size))
-
-                if player_index in player_indices:
-                    # Find the index of the player index to be removed
-                    index_to_remove = player_indices.index(player_index)
-
-                    # Remove the player index and shift the rest
-                    player_indices.pop(index_to_remove)
-                    player_indices = (
-                        player_indices[:player_index]
-                        + [player_index]
-                        + player_indices[player_index:]
+TEAM_BLOCK_SIZE = 628
+TEAM_ID_SIZE = 4
+PADDING_SIZE = 480
+PLAYER_INDICES_SIZE = 40
+
+# Team ID at the start of each tactics block, the rest of the block is skipped
+TACTICS_BLOCK_TEAM_ID = struct.Struct(f"<I{TEAM_BLOCK_SIZE - TEAM_ID_SIZE}x")
+
+
+def build_tactics_index(binary_file_path):
+    """
+    Map every team ID in the tactics table to the absolute offset of its block.
+
+    The table is walked once. If a team ID appears more than once, the first
+    block wins, as it is the one a linear scan would stop at.
+    """
+    tactics_index = {}
+
+    with open_save_image(binary_file_path) as image:
+        with image.tactics_table() as view:
+            block_count = len(view) // TEAM_BLOCK_SIZE
+            with view[: block_count * TEAM_BLOCK_SIZE] as blocks:
+                for block_number, (team_id,) in enumerate(
+                    TACTICS_BLOCK_TEAM_ID.iter_unpack(blocks)
+                ):
+                    tactics_index.setdefault(
+                        team_id, TACTICS_START_OFFSET + block_number * TEAM_BLOCK_SIZE
                     )
 
-                    # Write back the modified player indices
-                    f.seek(current_offset + team_id_size + padding_size)
-                    f.write(bytes(player_indices))
-                break
+            # A last block cut short by the end of the file still has a team ID
+            tail_offset = block_count * TEAM_BLOCK_SIZE
+            if tail_offset + TEAM_ID_SIZE <= len(view):
+                team_id = struct.unpack_from("<I", view, tail_offset)[0]
+                tactics_index.setdefault(team_id, TACTICS_START_OFFSET + tail_offset)
+
+    return tactics_index
+
+
+def remove_player_index(player_indices, player_index):
+    """Return the player indices with the removed player's index shifted back."""
+    if player_index not in player_indices:
+        return player_indices
+
+    # Find the index of the player index to be removed
+    index_to_remove = player_indices.index(player_index)
+
+    # Remove the player index and shift the rest
+    player_indices = list(player_indices)
+    player_indices.pop(index_to_remove)
+    return (
+        player_indices[:player_index] + [player_index] + player_indices[player_index:]
+    )
+
+
+def update_tactics_for_team(
+    binary_file_path, team_id, player_index, tactics_index=None
+):
+    with open_save_image(binary_file_path, writable=True) as image:
+        if tactics_index is None:
+            tactics_index = build_tactics_index(image)
+
+        if team_id not in tactics_index:
+            return
+
+        indices_offset = tactics_index[team_id] + TEAM_ID_SIZE + PADDING_SIZE
+        with image.view(indices_offset, indices_offset + PLAYER_INDICES_SIZE) as view:
+            player_indices = list(view)
+            updated_indices = remove_player_index(player_indices, player_index)
+
+            if updated_indices != player_indices:
+                # Write back the modified player indices
+                view[:] = bytes(updated_indices)
+
+
+class TacticsBatch:
+    """
+    Collect tactics updates for many teams and apply them in one pass.
+
+    Removals are recorded per team in the order they happen and replayed on
+    each team's player indices in memory, so the result is the same as calling
+    update_tactics_for_team after every removal, but the tactics table is
+    indexed once and every team's indices are written at most once.
+    """
+
+    def __init__(self):
+        self.pending = {}
+
+    def __len__(self):
+        return sum(len(player_indices) for player_indices in self.pending.values())
+
+    def remove_player_index(self, team_id, player_index):
+        self.pending.setdefault(team_id, []).append(player_index)
+
+    def apply(self, binary_file_path):
+        if not self.pending:
+            return
+
+        with open_save_image(binary_file_path, writable=True) as image:
+            tactics_index = build_tactics_index(image)
+
+            for team_id, removed_indices in self.pending.items():
+                if team_id not in tactics_index:
+                    continue
+
+                indices_offset = tactics_index[team_id] + TEAM_ID_SIZE + PADDING_SIZE
+                with image.view(
+                    indices_offset, indices_offset + PLAYER_INDICES_SIZE
+                ) as view:
+                    player_indices = list(view)
+                    updated_indices = player_indices
+                    for player_index in removed_indices:
+                        updated_indices = remove_player_index(
+                            updated_indices, player_index
+                        )
+
+                    if updated_indices != player_indices:
+                        view[:] = bytes(updated_indices)
 
-            current_offset += team_block_size
+        self.pending = {}
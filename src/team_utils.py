@@ -1,95 +1,265 @@
 import struct
 
+from save_utils import TEAM_ENTRIES_END_OFFSET, open_save_image
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the struct codec is used without it
+    np = None
+
+TEAM_RECORD_SIZE = 284
+
+# Team ID, 40 player IDs, 40 shirt numbers and 40 bytes of padding
+TEAM_RECORD = struct.Struct("<I40I40H40x")
+# Everything but the padding, which is left untouched when writing
+TEAM_RECORD_HEAD = struct.Struct("<I40I40H")
+# Team ID at the start of each record, the rest of the record is skipped
+TEAM_RECORD_TEAM_ID = struct.Struct(f"<I{TEAM_RECORD_SIZE - 4}x")
+
+if np is not None:
+    TEAM_RECORD_DTYPE = np.dtype(
+        [
+            ("team_id", "<u4"),
+            ("players", "<u4", (40,)),
+            ("shirts", "<u2", (40,)),
+            ("padding", "V40"),
+        ]
+    )
+else:
+    TEAM_RECORD_DTYPE = None
+
+
+def decode_team_records(buffer, use_numpy=None):
+    """
+    Decode a buffer of complete 284-byte team-player records.
+
+    Args:
+        buffer: Bytes-like object whose length is a multiple of 284
+        use_numpy (bool): Force (True) or disable (False) the NumPy codec.
+            Defaults to NumPy when it is installed.
+
+    Returns:
+        list: (team_id, player_ids, shirt_numbers) tuples
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if use_numpy:
+        records = np.frombuffer(buffer, dtype=TEAM_RECORD_DTYPE)
+        teams_data = list(
+            zip(
+                records["team_id"].tolist(),
+                records["players"].tolist(),
+                records["shirts"].tolist(),
+            )
+        )
+        # Drop the array before returning so the buffer can be released
+        del records
+        return teams_data
+
+    return [
+        (record[0], list(record[1:41]), list(record[41:81]))
+        for record in TEAM_RECORD.iter_unpack(buffer)
+    ]
+
+
+def encode_team_records(teams_data, buffer, use_numpy=None):
+    """
+    Encode team-player records into a writable buffer, keeping the padding
+    bytes already present in it.
+
+    Args:
+        teams_data (list): (team_id, player_ids, shirt_numbers) tuples with
+            40 player IDs and 40 shirt numbers each
+        buffer: Writable bytes-like object of len(teams_data) * 284 bytes
+        use_numpy (bool): Force (True) or disable (False) the NumPy codec.
+            Defaults to NumPy when it is installed.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if use_numpy and teams_data:
+        records = np.frombuffer(buffer, dtype=TEAM_RECORD_DTYPE)
+        team_ids, team_player_ids, shirt_numbers = zip(*teams_data)
+        records["team_id"] = team_ids
+        records["players"] = team_player_ids
+        records["shirts"] = shirt_numbers
+        del records
+        return
+
+    for index, (team_id, team_player_ids, shirt_numbers) in enumerate(teams_data):
+        TEAM_RECORD_HEAD.pack_into(
+            buffer,
+            index * TEAM_RECORD_SIZE,
+            team_id,
+            *team_player_ids,
+            *shirt_numbers,
+        )
+
 
 def read_team_id_and_name(
     binary_file_path, team_entry_start_offset, team_entries_end_offset
 ):
     teams_data = {}
 
-    with open(binary_file_path, "rb") as f:
-        f.seek(team_entry_start_offset)
-
-        while f.tell() < team_entries_end_offset:
-            # Read the next 4 bytes for teamID in little-endian format
-            team_id_bytes = f.read(4)
-            if len(team_id_bytes) < 4:
-                break
-            team_id = struct.unpack("<I", team_id_bytes)[0]
+    with open_save_image(binary_file_path) as image:
+        with image.view(team_entry_start_offset) as view:
+            offset = 0
+            end = team_entries_end_offset - team_entry_start_offset
 
-            # Seek to team name offset
-            f.seek(100, 1)
+            while offset < end:
+                # Read the next 4 bytes for teamID in little-endian format
+                if offset + 4 > len(view):
+                    break
+                team_id = struct.unpack_from("<I", view, offset)[0]
 
-            # Read the next 70 bytes for team name
-            team_name_bytes = f.read(70)
-            try:
-                team_name = team_name_bytes.decode("utf-8").split("\x00")[0]
-            except UnicodeDecodeError:
-                team_name = "Unknown"  # Fallback if decoding fails
+                # Skip to team name offset and read the next 70 bytes for team name
+                team_name_bytes = bytes(view[offset + 104 : offset + 174])
+                try:
+                    team_name = team_name_bytes.decode("utf-8").split("\x00")[0]
+                except UnicodeDecodeError:
+                    team_name = "Unknown"  # Fallback if decoding fails
 
-            teams_data[team_id] = team_name
+                teams_data[team_id] = team_name
 
-            # Skip the next 414 bytes to reach next team
-            f.seek(414, 1)
+                # Skip the next 414 bytes to reach next team
+                offset += 588
 
     return teams_data
 
 
+def read_partial_team_record(view, offset):
+    """Read a record cut short by the end of the buffer, field by field."""
+    team_id = struct.unpack_from("<I", view, offset)[0]
+    offset += 4
+
+    team_player_ids = []
+    for _ in range(40):
+        if offset + 4 > len(view):
+            break
+        team_player_ids.append(struct.unpack_from("<I", view, offset)[0])
+        offset += 4
+
+    shirt_numbers = []
+    for _ in range(40):
+        if offset + 2 > len(view):
+            break
+        shirt_numbers.append(struct.unpack_from("<H", view, offset)[0])
+        offset += 2
+
+    return (team_id, team_player_ids, shirt_numbers)
+
+
 def read_team_data(
-    binary_file_path, team_entries_start_offset, team_entries_end_offset
+    binary_file_path,
+    team_entries_start_offset,
+    team_entries_end_offset,
+    use_numpy=None,
 ):
-    teams_data = []
-
-    with open(binary_file_path, "rb") as f:
-        f.seek(team_entries_start_offset)
-
-        while f.tell() < team_entries_end_offset:
-            # Read the next 4 bytes for teamID in little-endian format
-            team_id_bytes = f.read(4)
-            if len(team_id_bytes) < 4:
-                break
-            team_id = struct.unpack("<I", team_id_bytes)[0]
-
-            # Read the next 160 bytes for playerIDs in little-endian format
-            team_player_ids = []
-            for _ in range(40):
-                player_id_bytes = f.read(4)
-                if len(player_id_bytes) < 4:
-                    break
-                player_id = struct.unpack("<I", player_id_bytes)[0]
-                team_player_ids.append(player_id)
-
-            # Read the next 80 bytes for shirtNumbers in little-endian format
-            shirt_numbers = []
-            for _ in range(40):
-                shirt_number_bytes = f.read(2)
-                if len(shirt_number_bytes) < 2:
-                    break
-                shirt_number = struct.unpack("<H", shirt_number_bytes)[0]
-                shirt_numbers.append(shirt_number)
+    # Number of records starting before the end offset
+    record_count = -(
+        -(team_entries_end_offset - team_entries_start_offset) // TEAM_RECORD_SIZE
+    )
 
-            teams_data.append((team_id, team_player_ids, shirt_numbers))
+    with open_save_image(binary_file_path) as image:
+        with image.view(team_entries_start_offset) as view:
+            complete_count = min(record_count, len(view) // TEAM_RECORD_SIZE)
+            complete_size = complete_count * TEAM_RECORD_SIZE
 
-            # Skip the next 40 bytes to reach next team
-            f.seek(40, 1)
+            with view[:complete_size] as records:
+                teams_data = decode_team_records(records, use_numpy)
+
+            # A truncated file can end in the middle of the last record
+            if complete_count < record_count and complete_size + 4 <= len(view):
+                teams_data.append(read_partial_team_record(view, complete_size))
 
     return teams_data
 
 
-def write_team_data(binary_file_path, teams_data, team_entries_start_offset):
-    with open(binary_file_path, "r+b") as f:
-        f.seek(team_entries_start_offset)
+def build_team_offset_index(
+    binary_file_path,
+    team_entries_start_offset,
+    team_entries_end_offset=TEAM_ENTRIES_END_OFFSET,
+):
+    """
+    Map every team ID in the team-player table to the absolute offset of its
+    record. If a team ID appears more than once, the last record wins, as it
+    is the one SquadState keeps.
+    """
+    record_count = -(
+        -(team_entries_end_offset - team_entries_start_offset) // TEAM_RECORD_SIZE
+    )
+    team_offsets = {}
+
+    with open_save_image(binary_file_path) as image:
+        with image.view(team_entries_start_offset) as view:
+            complete_count = min(record_count, len(view) // TEAM_RECORD_SIZE)
+            with view[: complete_count * TEAM_RECORD_SIZE] as records:
+                for record_number, (team_id,) in enumerate(
+                    TEAM_RECORD_TEAM_ID.iter_unpack(records)
+                ):
+                    team_offsets[team_id] = (
+                        team_entries_start_offset + record_number * TEAM_RECORD_SIZE
+                    )
+
+    return team_offsets
 
-        for team_id, team_player_ids, shirt_numbers in teams_data:
-            # Write team ID
-            f.write(struct.pack("<I", team_id))
 
-            # Write player IDs
-            for player_id in team_player_ids:
-                f.write(struct.pack("<I", player_id))
+def write_team_data(
+    binary_file_path,
+    teams_data,
+    team_entries_start_offset,
+    use_numpy=None,
+    dirty_team_ids=None,
+):
+    """
+    Write team-player records back to the save.
+
+    Without dirty_team_ids the whole table is rewritten in order. With it,
+    only the records of those teams are written, each in place at the offset
+    the table holds it at, so the cost follows the number of changed teams.
+
+    Args:
+        teams_data (list): (team_id, player_ids, shirt_numbers) tuples
+        use_numpy (bool): Force (True) or disable (False) the NumPy codec for
+            whole-table writes. Defaults to NumPy when it is installed.
+        dirty_team_ids (set): IDs of the teams to write, e.g. from
+            SquadState.dirty_team_ids
+    """
+    if dirty_team_ids is not None:
+        write_dirty_team_data(
+            binary_file_path, teams_data, team_entries_start_offset, dirty_team_ids
+        )
+        return
+
+    table_size = len(teams_data) * TEAM_RECORD_SIZE
+
+    with open_save_image(binary_file_path, writable=True) as image:
+        with image.view(
+            team_entries_start_offset, team_entries_start_offset + table_size
+        ) as view:
+            # Encode into a copy of the table and write it back in one go
+            table = bytearray(view)
+            encode_team_records(teams_data, table, use_numpy)
+            view[:] = table
 
-            # Write shirt numbers
-            for shirt_number in shirt_numbers:
-                f.write(struct.pack("<H", shirt_number))
 
-            # Skip 40 bytes
-            f.seek(40, 1)
+def write_dirty_team_data(
+    binary_file_path, teams_data, team_entries_start_offset, dirty_team_ids
+):
+    """Write the records of the dirty teams in place, keeping their padding."""
+    if not dirty_team_ids:
+        return
+
+    with open_save_image(binary_file_path, writable=True) as image:
+        team_offsets = build_team_offset_index(image, team_entries_start_offset)
+
+        for team_id, team_player_ids, shirt_numbers in teams_data:
+            if team_id not in dirty_team_ids or team_id not in team_offsets:
+                continue
+
+            offset = team_offsets[team_id]
+            with image.view(offset, offset + TEAM_RECORD_SIZE) as view:
+                TEAM_RECORD_HEAD.pack_into(
+                    view, 0, team_id, *team_player_ids, *shirt_numbers
+                )
@@ -1,43 +1,177 @@
-from tactics_utils import update_tactics_for_team
+from collections import deque
 
+from report_utils import (
+    ALREADY_PRESENT,
+    APPLIED,
+    CYCLE,
+    NO_SLOT,
+    NOT_FOUND,
+    PLAYER_NOT_IN_NAMES,
+    PLAYER_NOT_IN_TEAM,
+    TEAMS_NOT_IN_SAVE,
+    TransferResult,
+    describe_transfer_record,
+    make_transfer_record,
+)
+from squad_utils import SquadState
+from tactics_utils import TacticsBatch
+
+
+def remove_player_from_team(squad_state, tactics_batch, team_id, player_id):
+    """Remove the player with the given ID from the team, queueing its tactics update."""
+    last_non_zero_index = squad_state.remove_player(team_id, player_id)
+
+    tactics_batch.remove_player_index(team_id, last_non_zero_index)
+
+
+def add_player_to_team(squad_state, team_id, player_id, new_index):
+    """Add the player with the given ID to the team with an unused shirt number."""
+    squad_state.add_player(team_id, player_id, new_index)
+
+
+def apply_transfer(squad_state, tactics_batch, transfer, player_names):
+    """
+    Apply a single transfer to the squads.
+
+    Returns:
+        tuple: The outcome (APPLIED, ALREADY_PRESENT, NOT_FOUND or NO_SLOT), a
+            detail for skipped transfers and the ID of the team that lost a
+            player, or None
+    """
+    player_id, _, from_team_id, _, to_team_id, _ = transfer
+
+    if not player_id in player_names:
+        return NOT_FOUND, PLAYER_NOT_IN_NAMES, None
+
+    # Check if there's an empty spot in the new team
+    new_index = None
+    if to_team_id in squad_state:
+        new_index = squad_state.first_free_slot(to_team_id)
+        if new_index is None:
+            return NO_SLOT, "", None
+
+    # Transfer between two teams
+    if from_team_id in squad_state and to_team_id in squad_state:
+        if from_team_id == to_team_id and squad_state.has_player(to_team_id, player_id):
+            return ALREADY_PRESENT, "", None
+
+        freed_team_id = None
+        if squad_state.has_player(from_team_id, player_id):
+            remove_player_from_team(squad_state, tactics_batch, from_team_id, player_id)
+            freed_team_id = from_team_id
+
+        add_player_to_team(squad_state, to_team_id, player_id, new_index)
+        return APPLIED, "", freed_team_id
+
+    # Transfer from a team to Without Team, Retired or a team that doesn't exist
+    if from_team_id in squad_state and to_team_id not in squad_state:
+        if squad_state.has_player(from_team_id, player_id):
+            remove_player_from_team(squad_state, tactics_batch, from_team_id, player_id)
+            return APPLIED, "", from_team_id
+
+        return NOT_FOUND, PLAYER_NOT_IN_TEAM, None
+
+    # Transfer from Without Team or a team that doesn't exist to a team
+    if from_team_id not in squad_state and to_team_id in squad_state:
+        if not squad_state.has_player(to_team_id, player_id):
+            add_player_to_team(squad_state, to_team_id, player_id, new_index)
+            return APPLIED, "", None
+
+        return ALREADY_PRESENT, "", None
+
+    return NOT_FOUND, TEAMS_NOT_IN_SAVE, None
+
+
+def apply_transfer_cycle(squad_state, tactics_batch, cycle):
+    """
+    Apply a cycle of transfers between full teams as one simultaneous swap:
+    every player leaves their team first, then joins the next one.
+    """
+    for player_id, _, from_team_id, _, _, _ in cycle:
+        remove_player_from_team(squad_state, tactics_batch, from_team_id, player_id)
+
+    for player_id, _, _, _, to_team_id, _ in cycle:
+        new_index = squad_state.first_free_slot(to_team_id)
+        add_player_to_team(squad_state, to_team_id, player_id, new_index)
+
+
+def resolve_transfer_cycles(squad_state, tactics_batch, blocked_transfers, outcomes):
+    """
+    Find cycles of blocked transfers in which every full team gives up a player
+    to the next one, and apply each cycle as a swap.
+
+    Blocked transfers are edges from_team -> to_team. A single depth-first
+    search walks them, keeping a per-team position in its list of edges so
+    every edge is looked at once. After a cycle is applied the search unwinds
+    to where the cycle started and carries on from there.
+
+    Args:
+        blocked_transfers (list): Transfers that were blocked by a full team
+        outcomes (list): (outcome, detail) per blocked transfer, or None while it
+            is still waiting. Set to CYCLE for the transfers swapped here.
+    """
+    outgoing_transfers = {}
+    for index, transfer in enumerate(blocked_transfers):
+        _, _, from_team_id, _, to_team_id, _ = transfer
+        if outcomes[index] is None and from_team_id != to_team_id:
+            if from_team_id in squad_state and to_team_id in squad_state:
+                outgoing_transfers.setdefault(from_team_id, []).append(index)
 
-def replace_with_last_non_zero(players, shirts, index):
-    """Replace the player at the given index with the last non-zero player in the list."""
-    last_non_zero_index = next(
-        (i for i in range(len(players) - 1, -1, -1) if players[i] != 0), index
-    )
-    players[index] = players[last_non_zero_index]
-    shirts[index] = shirts[last_non_zero_index]
-    players[last_non_zero_index] = 0
-    shirts[last_non_zero_index] = 0
-    return players, shirts, last_non_zero_index
-
-
-def remove_player_from_team(binary_file_path, team_id, players, shirts, player_id):
-    """Remove the player with the given ID from the team."""
-    index = players.index(player_id)
-    players, shirts, last_non_zero_index = replace_with_last_non_zero(
-        players, shirts, index
-    )
-
-    update_tactics_for_team(binary_file_path, team_id, last_non_zero_index)
-
-    return (players, shirts)
-
+    next_edges = dict.fromkeys(outgoing_transfers, 0)
+    dead_team_ids = set()
 
-def add_player_to_team(team_id, players, shirts, player_id, new_index):
-    """Add the player with the given ID to the team."""
-    # Add player to the new team
-    players[new_index] = player_id
+    for root_team_id in outgoing_transfers:
+        if root_team_id in dead_team_ids:
+            continue
 
-    # Find an unused shirt number
-    used_shirt_numbers = set(shirts)
-    new_shirt_number = 1
-    while new_shirt_number in used_shirt_numbers:
-        new_shirt_number += 1
-    shirts[new_index] = new_shirt_number
+        path_team_ids = [root_team_id]
+        path_transfers = []
+        positions = {root_team_id: 0}
+
+        while path_team_ids:
+            team_id = path_team_ids[-1]
+            edges = outgoing_transfers.get(team_id, ())
+            if next_edges.get(team_id, 0) >= len(edges):
+                # No cycle goes through this team any more
+                dead_team_ids.add(team_id)
+                del positions[path_team_ids.pop()]
+                if path_transfers:
+                    path_transfers.pop()
+                continue
+
+            index = edges[next_edges[team_id]]
+            next_edges[team_id] += 1
+
+            player_id, _, from_team_id, _, to_team_id, _ = blocked_transfers[index]
+            # The player may have left the team since the transfer was blocked
+            if outcomes[index] is not None or not squad_state.has_player(
+                from_team_id, player_id
+            ):
+                continue
+            if to_team_id in dead_team_ids:
+                continue
+
+            if to_team_id not in positions:
+                positions[to_team_id] = len(path_team_ids)
+                path_team_ids.append(to_team_id)
+                path_transfers.append(index)
+                continue
+
+            # Back at a team on the path, so the transfers since then form a cycle
+            cycle_start = positions[to_team_id]
+            cycle = path_transfers[cycle_start:] + [index]
+            apply_transfer_cycle(
+                squad_state,
+                tactics_batch,
+                [blocked_transfers[cycle_index] for cycle_index in cycle],
+            )
+            for cycle_index in cycle:
+                outcomes[cycle_index] = (CYCLE, "")
 
-    return (players, shirts)
+            for cycle_team_id in path_team_ids[cycle_start + 1 :]:
+                del positions[cycle_team_id]
+            del path_team_ids[cycle_start + 1 :]
+            del path_transfers[cycle_start:]
 
 
 def apply_transfers(
@@ -45,148 +179,106 @@ def apply_transfers(
     teams_data,
     transfers,
     player_names={},
-    previous_skipped_transfers=[],
+    report_sink=None,
+    verbose=False,
 ):
-    team_dict = {
-        team_id: (team_player_ids, shirt_numbers)
-        for team_id, team_player_ids, shirt_numbers in teams_data
-    }
-
-    skipped_transfers = []
-
-    for (
-        player_id,
-        player_name,
-        from_team_id,
-        from_team_name,
-        to_team_id,
-        to_team_name,
-    ) in transfers:
-        if not player_id in player_names:
-            print(
-                f"Player {player_name} ({player_id}) not found. Skipping transfer. From Team: {from_team_name} ({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-            )
+    """
+    Apply transfers to the squads in a single pass and write the resulting
+    tactics changes to the save.
+
+    Transfers into a full team wait until a later transfer frees a slot in that
+    team. Transfers left waiting on each other in a cycle of full teams are
+    applied as a simultaneous swap, and anything still blocked after that is
+    reported as skipped.
+
+    Args:
+        binary_file_path: Path to data.dat or an open SaveImage
+        teams_data (list): (team_id, player_ids, shirt_numbers) tuples
+        transfers (iterable): Transfer tuples as returned by read_transfers
+        player_names (dict): Known player IDs, transfers of others are skipped
+        report_sink: Object with a write(record) method, such as a
+            TransferReportWriter, receiving every TransferRecord
+        verbose (bool): Print a line per transfer
+
+    Returns:
+        TransferResult: Updated squads and the teams that changed, per-transfer
+            records and outcome counts
+    """
+    squad_state = SquadState(teams_data)
+    tactics_batch = TacticsBatch()
+    result = TransferResult()
+
+    def add_record(index, transfer, outcome, detail):
+        record = make_transfer_record(index, transfer, outcome, detail)
+        result.add(record)
+        if report_sink is not None:
+            report_sink.write(record)
+        if verbose:
+            print(describe_transfer_record(record))
+
+    # Transfers blocked by a full destination team, and their indices per team
+    blocked_transfers = []
+    blocked_indices = []
+    waiting_transfers = {}
+
+    for index, transfer in enumerate(transfers):
+        outcome, detail, _ = apply_transfer(
+            squad_state, tactics_batch, transfer, player_names
+        )
+        if outcome != NO_SLOT:
+            add_record(index, transfer, outcome, detail)
             continue
 
-        # Check if there's an empty spot in the new team
-        try:
-            # Transfer between two teams
-            if from_team_id in team_dict and to_team_id in team_dict:
-                from_team_players, from_team_shirts = team_dict[from_team_id]
-                to_team_players, to_team_shirts = team_dict[to_team_id]
-
-                new_index = to_team_players.index(0)  # Find the first empty spot
-
-                if from_team_id == to_team_id and player_id in to_team_players:
-                    print(
-                        f"Player is already in the team. Skipping transfer for player {player_name} ({player_id}). From Team: {from_team_name} ({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-                    )
-                    continue
-
-                if player_id in from_team_players:
-                    team_dict[from_team_id] = remove_player_from_team(
-                        binary_file_path,
-                        from_team_id,
-                        from_team_players,
-                        from_team_shirts,
-                        player_id,
-                    )
-
-                team_dict[to_team_id] = add_player_to_team(
-                    to_team_id,
-                    to_team_players,
-                    to_team_shirts,
-                    player_id,
-                    new_index,
-                )
-
-                # Log the successful transfer
-                print(
-                    f"Transfer successful for player {player_name} ({player_id}). From Team: {from_team_name}({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-                )
-
-            # Transfer from a team to Without Team, Retired or a team that doesn't exist
-            if from_team_id in team_dict and to_team_id not in team_dict:
-                from_team_players, from_team_shirts = team_dict[from_team_id]
-
-                if player_id in from_team_players:
-                    remove_player_from_team(
-                        binary_file_path,
-                        from_team_id,
-                        from_team_players,
-                        from_team_shirts,
-                        player_id,
-                    )
-
-                    # Log the successful transfer
-                    print(
-                        f"Transfer successful for player {player_name} ({player_id}). From Team: {from_team_name}({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-                    )
-                else:
-                    print(
-                        f"Player is not in the team. Skipping transfer for player {player_name} ({player_id}). From Team: {from_team_name} ({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-                    )
-
-            # Transfer from Without Team or a team that doesn't exist to a team
-            if from_team_id not in team_dict and to_team_id in team_dict:
-                to_team_players, to_team_shirts = team_dict[to_team_id]
-
-                new_index = to_team_players.index(0)  # Find the first empty spot
-
-                if player_id not in to_team_players:
-                    team_dict[to_team_id] = add_player_to_team(
-                        to_team_id,
-                        to_team_players,
-                        to_team_shirts,
-                        player_id,
-                        new_index,
-                    )
-
-                    # Log the successful transfer
-                    print(
-                        f"Transfer successful for player {player_name} ({player_id}). From Team: {from_team_name}({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-                    )
-                else:
-                    print(
-                        f"Player is already in the team. Skipping transfer for player {player_name} ({player_id}). From Team: {from_team_name} ({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-                    )
-
-        except ValueError:
-            # No empty spot in the new team, store the skipped transfer and try again later
-            skipped_transfers.append(
-                (
-                    player_id,
-                    player_name,
-                    from_team_id,
-                    from_team_name,
-                    to_team_id,
-                    to_team_name,
-                )
-            )
-            print(
-                f"No empty spot in the new team. Skipping transfer for player {player_name} ({player_id}). From Team: {from_team_name} ({from_team_id}), To Team: {to_team_name} ({to_team_id})."
-            )
+        waiting_transfers.setdefault(transfer[4], deque()).append(
+            len(blocked_transfers)
+        )
+        blocked_transfers.append(transfer)
+        blocked_indices.append(index)
 
-    modified_teams_data = [
-        (team_id, team_player_ids, shirt_numbers)
-        for team_id, (team_player_ids, shirt_numbers) in team_dict.items()
-    ]
+    outcomes = [None] * len(blocked_transfers)
 
-    while skipped_transfers != previous_skipped_transfers:
+    if blocked_transfers and verbose:
         print(
-            f"Retrying {len(skipped_transfers)} skipped transfers (because of no empty spot in new team)."
-        )
-        return apply_transfers(
-            binary_file_path,
-            modified_teams_data,
-            skipped_transfers,
-            player_names,
-            skipped_transfers,
+            f"Retrying {len(blocked_transfers)} skipped transfers (because of no empty spot in new team)."
         )
 
-    if len(skipped_transfers) > 0:
+    # Every removal frees a slot, which lets the first transfer waiting for that
+    # team go ahead, which may free a slot in another team in turn
+    ready_team_ids = deque(
+        team_id
+        for team_id in waiting_transfers
+        if squad_state.first_free_slot(team_id) is not None
+    )
+    while ready_team_ids:
+        team_id = ready_team_ids.popleft()
+        queue = waiting_transfers[team_id]
+
+        while queue and squad_state.first_free_slot(team_id) is not None:
+            blocked_index = queue.popleft()
+            outcome, detail, freed_team_id = apply_transfer(
+                squad_state,
+                tactics_batch,
+                blocked_transfers[blocked_index],
+                player_names,
+            )
+            outcomes[blocked_index] = (outcome, detail)
+            if freed_team_id is not None and waiting_transfers.get(freed_team_id):
+                ready_team_ids.append(freed_team_id)
+
+    # What is left waits on full teams, cycles of them can still be swapped
+    resolve_transfer_cycles(squad_state, tactics_batch, blocked_transfers, outcomes)
+
+    for blocked_index, transfer in enumerate(blocked_transfers):
+        outcome, detail = outcomes[blocked_index] or (NO_SLOT, "")
+        add_record(blocked_indices[blocked_index], transfer, outcome, detail)
+
+    if result.counts[NO_SLOT] > 0 and verbose:
         print(
-            f"Exhausted retrials to apply {len(skipped_transfers)} skipped transfers (because of no empty spot in new team)."
+            f"Exhausted retrials to apply {result.counts[NO_SLOT]} skipped transfers (because of no empty spot in new team)."
         )
 
-    return modified_teams_data
+    tactics_batch.apply(binary_file_path)
+
+    result.teams_data = squad_state.to_teams_data()
+    result.dirty_team_ids = squad_state.dirty_team_ids
+    return result
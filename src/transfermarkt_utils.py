@@ -0,0 +1,282 @@
+import re
+from collections import namedtuple
+from urllib.parse import quote_plus, urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+from rapidfuzz import fuzz, process
+
+from crosswalk_utils import (
+    TRANSFERMARKT_CLUB_ID_PATTERN,
+    TRANSFERMARKT_PLAYER_ID_PATTERN,
+    find_transfermarkt_id,
+)
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:  # lxml is optional, the pure Python parser is used without it
+    HTML_PARSER = "html.parser"
+
+TRANSFERMARKT_URL = "https://www.transfermarkt.com"
+
+# Season of the team transfer pages
+DEFAULT_SEASON = 2024
+
+PAGE_NUMBER_PATTERN = re.compile(r"/page/(\d+)")
+
+# Only the transfer tables and the pagination items of a listing are parsed
+LISTING_STRAINER = SoupStrainer(
+    ["table", "li"],
+    attrs={"class": re.compile(r"(^|\s)(items|tm-pagination__list-item\S*)(\s|$)")},
+)
+# Only the club links of a search result page are parsed
+SEARCH_RESULTS_STRAINER = SoupStrainer("a", href=re.compile(r"startseite/verein/"))
+
+ListingPage = namedtuple("ListingPage", ["tables", "next_page_url", "page_urls"])
+
+
+def get_latest_transfers_url(league, base_url=TRANSFERMARKT_URL):
+    """Returns the URL of the first page of a league's latest transfers."""
+    return (
+        "%s/transfers/neuestetransfers/statistik/plus/?plus=1&galerie=0&wettbewerb_id=%s&land_id=&selectedOptionInternalType=nothingSelected&minMarktwert=0&maxMarktwert=500.000.000&minAbloese=0&maxAbloese=500.000.000&yt0=Show"
+        % (base_url, league)
+    )
+
+
+def get_search_url(team_name, base_url=TRANSFERMARKT_URL):
+    return (
+        f"{base_url}/schnellsuche/ergebnis/schnellsuche?query={quote_plus(team_name)}"
+    )
+
+
+def get_team_transfers_url(
+    team_slug, team_id, season=DEFAULT_SEASON, base_url=TRANSFERMARKT_URL
+):
+    return f"{base_url}/{team_slug}/transfers/verein/{team_id}/saison_id/{season}"
+
+
+def parse_html(html, strainer=None, parser=None):
+    """
+    Parse HTML into a BeautifulSoup tree, keeping only what the strainer
+    matches.
+
+    Args:
+        strainer (SoupStrainer): Parts of the page to keep, all by default
+        parser (str): BeautifulSoup parser, lxml if installed by default
+    """
+    return BeautifulSoup(html, parser or HTML_PARSER, parse_only=strainer)
+
+
+def parse_listing_page(html, page_url=TRANSFERMARKT_URL, parser=None):
+    """
+    Parse a Transfermarkt listing page once and return its transfer tables
+    along with its pagination.
+
+    Returns:
+        ListingPage: The table.items tags, the next page's URL or None and the
+            URLs of pages 2 to N as returned by get_page_urls
+    """
+    soup = parse_html(html, LISTING_STRAINER, parser)
+    return ListingPage(
+        soup.find_all("table", {"class": "items"}),
+        get_next_page_url(soup, page_url),
+        get_page_urls(soup, page_url),
+    )
+
+
+def parse_search_results(html, parser=None):
+    """Return the club links of a Transfermarkt search page."""
+    return parse_html(html, SEARCH_RESULTS_STRAINER, parser).find_all("a")
+
+
+def find_team(search_results, team_name):
+    """Returns the slug and ID of the search result best matching the team name."""
+    if not search_results:
+        return None, None
+
+    # Extract text from search results
+    team_names = [result.text.strip() for result in search_results]
+
+    best_match = process.extractOne(team_name, team_names, scorer=fuzz.ratio)
+
+    if best_match:
+        index = team_names.index(best_match[0])
+        result = search_results[index]
+        href_parts = result["href"].split("/")
+        team_slug = href_parts[1]
+        team_id = href_parts[-1]
+        return team_slug, team_id
+
+    return None, None
+
+
+def extract_latest_transfers(tables):
+    """Extracts the transfer data from the parsed tables of a latest transfers page."""
+    table = tables[0]
+    rows = table.find_all("tr", {"class": ["odd", "even"]})
+
+    transfers = []
+
+    for row in rows:
+        columns = row.find_all("td", recursive=False)
+
+        date = columns[5].text.strip()
+        player = columns[0].find("a").text.strip()
+        from_club = columns[3].find_all("img")[0].get("title").strip()
+        to_club = columns[4].find_all("img")[0].get("title").strip()
+
+        # Transfermarkt IDs for the crosswalk, empty where a link is missing
+        player_tm_id = find_transfermarkt_id(
+            columns[0], TRANSFERMARKT_PLAYER_ID_PATTERN
+        )
+        from_club_tm_id = find_transfermarkt_id(
+            columns[3], TRANSFERMARKT_CLUB_ID_PATTERN
+        )
+        to_club_tm_id = find_transfermarkt_id(columns[4], TRANSFERMARKT_CLUB_ID_PATTERN)
+
+        transfers.append(
+            [
+                date,
+                player,
+                from_club,
+                to_club,
+                player_tm_id,
+                from_club_tm_id,
+                to_club_tm_id,
+            ]
+        )
+
+    return transfers
+
+
+def extract_team_transfers(tables, team_name, team_tm_id=""):
+    """
+    Extracts the transfer data from the parsed tables of a team's transfers
+    page, where the first table holds arrivals and the second departures.
+    """
+
+    transfers = []
+
+    for i, table in reversed(list(enumerate(tables))):
+        rows = table.find_all("tr", {"class": ["odd", "even"]})
+
+        for row in rows:
+            columns = row.find_all("td", recursive=False)
+
+            date = "N/A"
+            player = columns[1].find("a").text.strip()
+            current_club = team_name
+            other_club = columns[4].find_all("img")[0].get("title").strip()
+
+            # Transfermarkt IDs for the crosswalk, empty where a link is missing
+            player_tm_id = find_transfermarkt_id(
+                columns[1], TRANSFERMARKT_PLAYER_ID_PATTERN
+            )
+            other_club_tm_id = find_transfermarkt_id(
+                columns[4], TRANSFERMARKT_CLUB_ID_PATTERN
+            )
+
+            if i == 0:
+                transfers.append(
+                    [
+                        date,
+                        player,
+                        other_club,
+                        current_club,
+                        player_tm_id,
+                        other_club_tm_id,
+                        team_tm_id,
+                    ]
+                )
+            else:
+                transfers.append(
+                    [
+                        date,
+                        player,
+                        current_club,
+                        other_club,
+                        player_tm_id,
+                        team_tm_id,
+                        other_club_tm_id,
+                    ]
+                )
+
+    return transfers
+
+
+def get_next_page_url(soup, page_url=TRANSFERMARKT_URL):
+    """Gets the URL of the next page if it exists, otherwise returns None."""
+    next_page_tag = soup.select_one("li.tm-pagination__list-item--icon-next-page > a")
+    if next_page_tag:
+        return urljoin(page_url, next_page_tag["href"])
+    return None
+
+
+def get_page_urls(soup, page_url=TRANSFERMARKT_URL):
+    """
+    Return the URLs of pages 2 to N of a paginated listing from its first page.
+
+    The page count comes from the highest /page/N link in the pagination,
+    normally the last page link, which also serves as the template for the
+    other page URLs.
+
+    Returns:
+        list: The page URLs in order, or None if the pagination has no
+            numbered links to build them from
+    """
+    last_page_href = None
+    last_page_number = 0
+    for link in soup.select("li[class*='tm-pagination__list-item'] a[href]"):
+        match = PAGE_NUMBER_PATTERN.search(link["href"])
+        if match and int(match.group(1)) > last_page_number:
+            last_page_href = link["href"]
+            last_page_number = int(match.group(1))
+
+    if last_page_href is None:
+        return None
+
+    return [
+        urljoin(
+            page_url,
+            PAGE_NUMBER_PATTERN.sub(f"/page/{page_number}", last_page_href),
+        )
+        for page_number in range(2, last_page_number + 1)
+    ]
+
+
+def crawl_pages(first_page_url, fetcher, parser=None):
+    """
+    Fetch and parse every page of a paginated Transfermarkt listing.
+
+    The first page is fetched on its own to learn the page count, then the
+    others are fetched concurrently. Without a usable page count the next page
+    links are followed one by one.
+
+    Args:
+        first_page_url (str): URL of the first page
+        fetcher (PageFetcher): Fetcher to download the pages with
+        parser (str): BeautifulSoup parser, lxml if installed by default
+
+    Returns:
+        list: (url, ListingPage) tuples in page order
+    """
+    first_page = parse_listing_page(
+        fetcher.fetch(first_page_url), first_page_url, parser
+    )
+    pages = [(first_page_url, first_page)]
+
+    if first_page.page_urls is not None:
+        for page_url, html in zip(
+            first_page.page_urls, fetcher.fetch_all(first_page.page_urls)
+        ):
+            pages.append((page_url, parse_listing_page(html, page_url, parser)))
+        return pages
+
+    current_url = first_page.next_page_url
+    while current_url:
+        page = parse_listing_page(fetcher.fetch(current_url), current_url, parser)
+        pages.append((current_url, page))
+        current_url = page.next_page_url
+
+    return pages
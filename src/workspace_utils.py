@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import weakref
+from contextlib import contextmanager
+
+from cache_utils import get_tree_size
+
+# RAM-backed directory used for workspaces when it is available
+SHM_DIR = "/dev/shm"
+
+# Upper bound for the files in a workspace, about 60 decrypted saves
+DEFAULT_WORKSPACE_QUOTA = 1024 * 1024 * 1024
+
+
+class WorkspaceQuotaError(OSError):
+    """A workspace is full, so no job can start in it."""
+
+
+def get_workspace_root(quota=DEFAULT_WORKSPACE_QUOTA):
+    """
+    Return the directory workspaces are created in.
+
+    The location can be set with the PES_TRANSFER_TOOL_WORKSPACE_DIR
+    environment variable. Otherwise /dev/shm is used if it is writable and has
+    room for the quota, and the system temp directory if not.
+    """
+    workspace_root = os.environ.get("PES_TRANSFER_TOOL_WORKSPACE_DIR")
+    if workspace_root:
+        os.makedirs(workspace_root, exist_ok=True)
+        return workspace_root
+
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        try:
+            if shutil.disk_usage(SHM_DIR).free >= quota:
+                return SHM_DIR
+        except OSError:
+            pass
+
+    return tempfile.gettempdir()
+
+
+def clear_directory(path):
+    """Remove everything inside a directory, keeping the directory itself."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+
+
+class Workspace:
+    """
+    Scratch directory for decrypted saves, removed with everything in it when
+    the workspace is closed, whether the work in it succeeded or not.
+
+    Each job gets a directory of its own, which is emptied and handed to the
+    next job once the job is done. No job starts while the files in the
+    workspace take up the quota or more.
+
+    Args:
+        root_dir (str): Directory to create the workspace in, defaults to
+            get_workspace_root()
+        quota (int): Bytes the workspace may hold
+    """
+
+    def __init__(self, root_dir=None, quota=DEFAULT_WORKSPACE_QUOTA):
+        self.root_dir = root_dir
+        self.quota = quota
+        self.path = None
+        self._free_job_dirs = []
+        self._job_count = 0
+        self._finalizer = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        if self.path is not None:
+            return
+
+        root_dir = self.root_dir or get_workspace_root(self.quota)
+        self.path = tempfile.mkdtemp(prefix="pes2021-transfer-tool-", dir=root_dir)
+        # Also remove the workspace if the interpreter exits without closing it
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def close(self):
+        if self.path is None:
+            return
+
+        self._finalizer()
+        self.path = None
+        self._free_job_dirs = []
+
+    def check_quota(self):
+        """Raise WorkspaceQuotaError if the workspace holds its quota or more."""
+        used_size = get_tree_size(self.path)
+        if used_size >= self.quota:
+            raise WorkspaceQuotaError(
+                f"Workspace {self.path} holds {used_size} bytes, "
+                f"its quota is {self.quota} bytes"
+            )
+
+    def acquire(self):
+        """Return an empty directory for a job, reusing a released one if possible."""
+        self.open()
+        self.check_quota()
+
+        if self._free_job_dirs:
+            return self._free_job_dirs.pop()
+
+        self._job_count += 1
+        job_dir = os.path.join(self.path, f"job-{self._job_count}")
+        os.mkdir(job_dir)
+        return job_dir
+
+    def release(self, job_dir):
+        """Empty a job's directory and keep it for the next job."""
+        try:
+            clear_directory(job_dir)
+        except OSError:
+            # A directory that cannot be emptied is not handed out again
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return
+        self._free_job_dirs.append(job_dir)
+
+    @contextmanager
+    def job(self):
+        """Yield an empty job directory, released when the block exits."""
+        job_dir = self.acquire()
+        try:
+            yield job_dir
+        finally:
+            self.release(job_dir)
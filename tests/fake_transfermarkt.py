@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "transfermarkt")
+
+
+def read_fixture(file_name):
+    with open(os.path.join(FIXTURES_DIR, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class RecordedPagesHandler(BaseHTTPRequestHandler):
+    """
+    Serves the recorded pages and keeps track of the requests. Pages carry an
+    ETag of their content and unchanged pages are answered with a 304.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requested_paths.append(self.path)
+            server.active_requests += 1
+            server.peak_requests = max(server.peak_requests, server.active_requests)
+        try:
+            # Give concurrent requests the chance to overlap
+            time.sleep(0.05)
+            html = server.pages.get(self.path)
+            if html is None:
+                self.send_error(404)
+                return
+            body = html.encode("utf-8")
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+            if self.headers.get("If-None-Match") == etag:
+                with server.lock:
+                    server.not_modified_count += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active_requests -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTransfermarkt:
+    """
+    Local stand-in for Transfermarkt serving recorded pages by path and query.
+
+    Args:
+        pages (dict): Request path, including the query string -> HTML
+    """
+
+    def __init__(self, pages=None):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RecordedPagesHandler)
+        self.server.lock = threading.Lock()
+        self.server.requested_paths = []
+        self.server.active_requests = 0
+        self.server.peak_requests = 0
+        self.server.not_modified_count = 0
+        self.server.pages = dict(pages or {})
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def pages(self):
+        return self.server.pages
+
+    @property
+    def requested_paths(self):
+        return self.server.requested_paths
+
+    @property
+    def peak_requests(self):
+        return self.server.peak_requests
+
+    @property
+    def not_modified_count(self):
+        return self.server.not_modified_count
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
@@ -0,0 +1,175 @@
+import csv
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from apply_utils import apply_batch, get_save_jobs
+from report_utils import APPLIED
+from save_utils import TEAM_ENTRIES_START_OFFSET, TEAMS_START_OFFSET
+from team_utils import TEAM_RECORD, TEAM_RECORD_SIZE
+from tests.test_crypt_utils import fake_vendor_tool
+from workspace_utils import Workspace
+
+
+class TestApplyUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        environment = patch.dict(
+            os.environ,
+            {"PES_TRANSFER_TOOL_CACHE_DIR": os.path.join(self.work_dir, "cache")},
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+        for patcher in (
+            patch("crypt_utils.subprocess.run", side_effect=fake_vendor_tool),
+            patch("crypt_utils.os.chmod"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.player_names_csv = os.path.join(self.work_dir, "players.csv")
+        with open(self.player_names_csv, "w", encoding="utf-8") as f:
+            f.write("PlayerID,PlayerName\n101,Player 101\n201,Player 201\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def create_save(self, relative_path):
+        """Write a save the fake vendor tools decrypt, with teams 1 and 2."""
+        image = bytearray(TEAM_ENTRIES_START_OFFSET + 2 * TEAM_RECORD_SIZE)
+        for index, team_id in enumerate((1, 2)):
+            name_offset = TEAMS_START_OFFSET + index * 588
+            struct.pack_into("<I", image, name_offset, team_id)
+            image[name_offset + 104 : name_offset + 110] = b"Team %d" % team_id
+
+            player_ids = [team_id * 100 + 1] + [0] * 39
+            shirt_numbers = [1] + [0] * 39
+            TEAM_RECORD.pack_into(
+                image,
+                TEAM_ENTRIES_START_OFFSET + index * TEAM_RECORD_SIZE,
+                team_id,
+                *player_ids,
+                *shirt_numbers,
+            )
+
+        save_file_path = os.path.join(self.work_dir, "saves", relative_path)
+        os.makedirs(os.path.dirname(save_file_path), exist_ok=True)
+        with open(save_file_path, "wb") as f:
+            f.write(image)
+        return save_file_path
+
+    def test_get_save_jobs_keeps_folders_apart(self):
+        output_dir = os.path.join(self.work_dir, "output")
+        jobs = get_save_jobs(
+            [
+                os.path.join(self.work_dir, "saves", "a", "EDIT00000000"),
+                os.path.join(self.work_dir, "saves", "b", "EDIT00000000"),
+            ],
+            output_dir,
+            report_format="jsonl",
+        )
+
+        self.assertEqual(
+            [job.new_save_file_path for job in jobs],
+            [
+                os.path.join(output_dir, "a", "EDIT00000000"),
+                os.path.join(output_dir, "b", "EDIT00000000"),
+            ],
+        )
+        self.assertEqual(
+            jobs[0].csv_output_path, os.path.join(output_dir, "a", "EDIT00000000.csv")
+        )
+        self.assertEqual(
+            jobs[0].report_path,
+            os.path.join(output_dir, "a", "EDIT00000000.report.jsonl"),
+        )
+
+    def test_apply_batch_updates_every_save(self):
+        save_file_paths = [
+            self.create_save(os.path.join(slot, "EDIT00000000"))
+            for slot in ("slot1", "slot2")
+        ]
+        jobs = get_save_jobs(save_file_paths, os.path.join(self.work_dir, "output"))
+        transfers = [(101, "Player 101", 1, "Team 1", 2, "Team 2")]
+
+        with Workspace(self.work_dir) as workspace:
+            results = list(
+                apply_batch(
+                    jobs, self.player_names_csv, transfers, workspace, max_workers=1
+                )
+            )
+            # The decrypted saves are gone, only the emptied job directory is left
+            self.assertEqual(os.listdir(workspace.path), ["job-1"])
+            self.assertEqual(os.listdir(os.path.join(workspace.path, "job-1")), [])
+
+        self.assertEqual([result.job for result in results], jobs)
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.counts[APPLIED], 1)
+            self.assertTrue(os.path.exists(result.job.new_save_file_path))
+
+            with open(result.job.csv_output_path, newline="") as f:
+                squads = {
+                    (row["TeamName"], row["PlayerName"])
+                    for row in csv.DictReader(f)
+                    if row["PlayerID"] != "0"
+                }
+            self.assertEqual(
+                squads, {("Team 2", "Player 101"), ("Team 2", "Player 201")}
+            )
+
+    def test_apply_batch_keeps_going_after_a_bad_save(self):
+        good_save_file_path = self.create_save(os.path.join("good", "EDIT00000000"))
+        # Decrypts to an empty data.dat, which cannot be mapped
+        bad_save_file_path = os.path.join(self.work_dir, "saves", "bad", "EDIT00000000")
+        os.makedirs(os.path.dirname(bad_save_file_path))
+        with open(bad_save_file_path, "wb"):
+            pass
+        jobs = get_save_jobs(
+            [bad_save_file_path, good_save_file_path],
+            os.path.join(self.work_dir, "output"),
+        )
+        transfers = [(101, "Player 101", 1, "Team 1", 2, "Team 2")]
+
+        for max_workers in (1, 2):
+            with Workspace(self.work_dir) as workspace:
+                results = {
+                    result.job: result
+                    for result in apply_batch(
+                        jobs,
+                        self.player_names_csv,
+                        transfers,
+                        workspace,
+                        max_workers=max_workers,
+                    )
+                }
+
+            self.assertEqual(set(results), set(jobs))
+            self.assertIn("ValueError", results[jobs[0]].error)
+            self.assertIsNone(results[jobs[0]].counts)
+            self.assertIsNone(results[jobs[1]].error)
+            self.assertEqual(results[jobs[1]].counts[APPLIED], 1)
+
+    def test_apply_batch_reports_failed_saves(self):
+        save_file_paths = [
+            os.path.join(self.work_dir, "saves", name)
+            for name in ("missing1", "missing2")
+        ]
+        jobs = get_save_jobs(save_file_paths, os.path.join(self.work_dir, "output"))
+
+        with Workspace(self.work_dir) as workspace:
+            results = list(
+                apply_batch(jobs, self.player_names_csv, [], workspace, max_workers=2)
+            )
+
+        self.assertEqual({result.job for result in results}, set(jobs))
+        for result in results:
+            self.assertIsNotNone(result.error)
+            self.assertIsNone(result.counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
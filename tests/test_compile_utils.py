@@ -0,0 +1,124 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from compile_utils import compile_transfers
+from transfer_utils import apply_transfers
+
+
+def make_transfer(player_id, from_team_id, to_team_id):
+    return (
+        player_id,
+        f"Player {player_id}",
+        from_team_id,
+        f"Team {from_team_id}",
+        to_team_id,
+        f"Team {to_team_id}",
+    )
+
+
+class TestCompileUtils(unittest.TestCase):
+    def test_chain_is_folded(self):
+        transfers = [
+            make_transfer(101, 1, 2),
+            make_transfer(201, 2, 3),
+            make_transfer(101, 2, 3),
+            make_transfer(101, 3, 0),
+        ]
+
+        compiled_transfers, removed_count = compile_transfers(transfers)
+
+        self.assertEqual(
+            compiled_transfers, [make_transfer(201, 2, 3), make_transfer(101, 1, 0)]
+        )
+        self.assertEqual(removed_count, 2)
+
+    def test_return_home_is_dropped(self):
+        transfers = [
+            make_transfer(101, 1, 2),
+            make_transfer(101, 2, 1),
+            make_transfer(102, 1, 1),
+        ]
+
+        compiled_transfers, removed_count = compile_transfers(transfers)
+
+        # A single transfer to the same team is left to apply_transfers
+        self.assertEqual(compiled_transfers, [make_transfer(102, 1, 1)])
+        self.assertEqual(removed_count, 2)
+
+    def test_unlinked_transfers_are_kept(self):
+        transfers = [
+            make_transfer(101, 1, 2),
+            make_transfer(101, 3, 4),
+            make_transfer(101, 4, 5),
+            make_transfer(0, 1, 2),
+            make_transfer(0, 2, 3),
+        ]
+
+        compiled_transfers, removed_count = compile_transfers(transfers)
+
+        self.assertEqual(
+            compiled_transfers,
+            [
+                make_transfer(101, 1, 2),
+                make_transfer(101, 3, 5),
+                make_transfer(0, 1, 2),
+                make_transfer(0, 2, 3),
+            ],
+        )
+        self.assertEqual(removed_count, 1)
+
+    def test_compiled_transfers_match_sequential_transfers(self):
+        rng = random.Random(2024)
+        team_ids = [1, 2, 3, 4]
+        # 0 is Without Team and 99 a team missing from the save
+        destination_team_ids = team_ids + [0, 99]
+
+        def make_teams_data():
+            return [
+                (
+                    team_id,
+                    [team_id * 100 + i for i in range(1, 6)] + [0] * 35,
+                    list(range(1, 6)) + [0] * 35,
+                )
+                for team_id in team_ids
+            ]
+
+        def get_squads(transfers):
+            with patch("transfer_utils.TacticsBatch.apply"):
+                result = apply_transfers(
+                    "path/to/binary",
+                    make_teams_data(),
+                    transfers,
+                    player_names=dict.fromkeys(current_team_ids, ""),
+                )
+            return {
+                team_id: sorted(player_id for player_id in player_ids if player_id)
+                for team_id, player_ids, _ in result.teams_data
+            }
+
+        for _ in range(20):
+            current_team_ids = {
+                player_id: team_id
+                for team_id, player_ids, _ in make_teams_data()
+                for player_id in player_ids
+                if player_id
+            }
+            transfers = []
+            for _ in range(60):
+                player_id = rng.choice(sorted(current_team_ids))
+                to_team_id = rng.choice(destination_team_ids)
+                transfers.append(
+                    make_transfer(player_id, current_team_ids[player_id], to_team_id)
+                )
+                current_team_ids[player_id] = to_team_id
+
+            compiled_transfers, removed_count = compile_transfers(transfers)
+
+            self.assertEqual(get_squads(compiled_transfers), get_squads(transfers))
+            self.assertEqual(len(compiled_transfers) + removed_count, len(transfers))
+            self.assertLessEqual(len(compiled_transfers), len(current_team_ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from bs4 import BeautifulSoup
+
+from crosswalk_utils import (
+    CLUB,
+    PLAYER,
+    TRANSFERMARKT_CLUB_ID_PATTERN,
+    TRANSFERMARKT_PLAYER_ID_PATTERN,
+    Crosswalk,
+    find_transfermarkt_id,
+    get_reference_version,
+)
+from match_utils import match_transfers
+
+
+class TestCrosswalkUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.crosswalk = Crosswalk(os.path.join(self.work_dir, "crosswalk.sqlite3"))
+        self.players_data = [
+            {"PlayerName": "Karim Benzema", "PlayerID": "8944"},
+            {"PlayerName": "Samir Nasri", "PlayerID": "8946"},
+        ]
+        self.teams_data = [
+            {"TeamName": "Real Madrid", "TeamID": "108"},
+            {"TeamName": "Olympique Lyon", "TeamID": "116"},
+        ]
+
+    def tearDown(self):
+        self.crosswalk.close()
+        shutil.rmtree(self.work_dir)
+
+    def test_find_transfermarkt_id(self):
+        cell = BeautifulSoup(
+            '<td><a href="/real-madrid/startseite/verein/418/saison_id/2024">'
+            '<img title="Real Madrid"></a></td><td><a href="#">Karim</a>'
+            '<a href="/karim-benzema/profil/spieler/18922">Karim Benzema</a></td>',
+            "html.parser",
+        )
+
+        self.assertEqual(
+            find_transfermarkt_id(cell, TRANSFERMARKT_CLUB_ID_PATTERN), "418"
+        )
+        self.assertEqual(
+            find_transfermarkt_id(cell, TRANSFERMARKT_PLAYER_ID_PATTERN), "18922"
+        )
+        self.assertEqual(
+            find_transfermarkt_id(
+                BeautifulSoup("<td></td>", "html.parser"), TRANSFERMARKT_CLUB_ID_PATTERN
+            ),
+            "",
+        )
+
+    def test_reference_version(self):
+        roster_path = os.path.join("data", "FL25v1.5_players.csv")
+        self.assertEqual(get_reference_version(roster_path), "FL25v1.5")
+
+        teams_path = os.path.join(self.work_dir, "teams.csv")
+        with open(teams_path, "w") as f:
+            f.write("TeamID,TeamName\n108,Real Madrid\n")
+        self.assertEqual(len(get_reference_version(teams_path)), 64)
+
+    def test_store_and_lookup(self):
+        self.crosswalk.store(
+            PLAYER, "FL25v1.5", {"18922": ("8944", 100.0), "": ("1", 90)}
+        )
+        self.crosswalk.store(PLAYER, "FL25v1.5", {"18922": ("8944", 96.0)})
+
+        self.assertEqual(
+            self.crosswalk.lookup(PLAYER, "FL25v1.5", ["18922", "3333", ""]),
+            {"18922": ("8944", 96.0)},
+        )
+        self.assertEqual(self.crosswalk.lookup(PLAYER, "FL25v1.4", ["18922"]), {})
+        self.assertEqual(self.crosswalk.lookup(CLUB, "FL25v1.5", ["18922"]), {})
+
+    def test_confirmed_pairs_are_kept(self):
+        self.crosswalk.store(PLAYER, "A", {"18922": ("8946", 60.0), "3333": ("1", 90)})
+        self.crosswalk.confirm(PLAYER, "A", {"18922": "8944"})
+        self.crosswalk.store(PLAYER, "A", {"18922": ("8946", 99.0)})
+
+        self.assertEqual(
+            self.crosswalk.lookup(PLAYER, "A", ["18922", "3333"], min_confidence=95),
+            {"18922": ("8944", 100.0)},
+        )
+
+        self.crosswalk.forget(PLAYER, "A", ["18922"])
+        self.assertEqual(self.crosswalk.lookup(PLAYER, "A", ["18922"]), {})
+
+    def test_crosswalk_without_confirmed_column(self):
+        db_path = os.path.join(self.work_dir, "old.sqlite3")
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE crosswalk (kind TEXT NOT NULL,"
+            " reference_version TEXT NOT NULL, transfermarkt_id TEXT NOT NULL,"
+            " pes_id TEXT NOT NULL, confidence REAL NOT NULL,"
+            " PRIMARY KEY (kind, reference_version, transfermarkt_id))"
+        )
+        connection.execute(
+            "INSERT INTO crosswalk VALUES ('player', 'A', '18922', '8944', 90.0)"
+        )
+        connection.commit()
+        connection.close()
+
+        with Crosswalk(db_path) as crosswalk:
+            crosswalk.store(PLAYER, "A", {"18922": ("8946", 91.0)})
+            self.assertEqual(
+                crosswalk.lookup(PLAYER, "A", ["18922"]), {"18922": ("8946", 91.0)}
+            )
+
+    def test_raised_threshold_matches_weak_pairs_again(self):
+        transfers = [["Jul 1, 2024", "Danilo", "Real Madrid", "Lyon", "1", "", ""]]
+        players_data = [{"PlayerName": "Danilo Pereira", "PlayerID": "7000"}]
+
+        def match(confidence_threshold):
+            return match_transfers(
+                transfers,
+                players_data,
+                self.teams_data,
+                confidence_threshold,
+                crosswalk=self.crosswalk,
+                player_version="A",
+                team_version="B",
+            )
+
+        self.assertEqual(match(50)[0][1:4], ["7000", "Danilo Pereira", 60.0])
+        self.assertEqual(match(95)[0][1:4], [0, "Danilo", 60.0])
+        # The weak pair is still there for runs that accept it
+        self.assertEqual(
+            self.crosswalk.lookup(PLAYER, "A", ["1"]), {"1": ("7000", 60.0)}
+        )
+
+    def test_match_transfers_with_crosswalk(self):
+        transfers = [
+            [
+                "Jul 1, 2024",
+                "Karim Benzema",
+                "Real Madrid",
+                "Lyon",
+                "18922",
+                "418",
+                "1041",
+            ]
+        ]
+
+        first = match_transfers(
+            transfers,
+            self.players_data,
+            self.teams_data,
+            80,
+            crosswalk=self.crosswalk,
+            player_version="A",
+            team_version="B",
+        )
+        self.assertEqual(first[0][1:3], ["8944", "Karim Benzema"])
+        self.assertEqual(first[0][7:9], [0, "Lyon"])
+        self.assertEqual(
+            self.crosswalk.lookup(CLUB, "B", ["418", "1041"]), {"418": ("108", 100.0)}
+        )
+
+        # A known ID resolves even if the scraped name no longer matches
+        self.crosswalk.store(CLUB, "B", {"1041": ("116", 85.0)})
+        transfers[0][1] = "K. Benzema"
+        second = match_transfers(
+            transfers,
+            self.players_data,
+            self.teams_data,
+            80,
+            crosswalk=self.crosswalk,
+            player_version="A",
+            team_version="B",
+        )
+        self.assertEqual(second[0][1:4], ["8944", "Karim Benzema", 100.0])
+        self.assertEqual(second[0][7:], ["116", "Olympique Lyon", 85.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from crypt_utils import (
+    CryptoWorkerPool,
+    decrypt_save_file,
+    encrypt_save_file,
+    evict_decryption_cache,
+)
+
+
+def fake_decrypter(command, **kwargs):
+    # The decrypter writes the split save into the output directory
+    output_dir = command[-1]
+    with open(os.path.join(output_dir, "data.dat"), "wb") as f:
+        f.write(b"decrypted")
+    with open(os.path.join(output_dir, "header.dat"), "wb") as f:
+        f.write(b"header")
+
+
+def fake_vendor_tool(command, **kwargs):
+    """Stands in for both vendor binaries, saves are their data.dat as is."""
+    if not any(part.endswith(".exe") for part in command):
+        return
+    input_path, output_path = command[-2:]
+    if any(part.endswith("decrypter21.exe") for part in command):
+        shutil.copyfile(input_path, os.path.join(output_path, "data.dat"))
+    else:
+        shutil.copyfile(os.path.join(input_path, "data.dat"), output_path)
+
+
+class TestCryptUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.save_file = os.path.join(self.work_dir, "EDIT00000000")
+        with open(self.save_file, "wb") as f:
+            f.write(b"encrypted save")
+
+        environment = patch.dict(
+            os.environ,
+            {"PES_TRANSFER_TOOL_CACHE_DIR": os.path.join(self.work_dir, "cache")},
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        chmod = patch("crypt_utils.os.chmod")
+        chmod.start()
+        self.addCleanup(chmod.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def make_output_dirs(self, count):
+        output_dirs = []
+        for index in range(count):
+            output_dir = os.path.join(self.work_dir, f"output-{index}")
+            os.mkdir(output_dir)
+            output_dirs.append(output_dir)
+        return output_dirs
+
+    def test_decrypt_save_file_uses_cache(self):
+        first_dir, second_dir, third_dir = self.make_output_dirs(3)
+        with patch("crypt_utils.subprocess.run", side_effect=fake_decrypter) as run:
+            _, first_data = decrypt_save_file(self.save_file, first_dir)
+            _, second_data = decrypt_save_file(self.save_file, second_dir)
+
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(sorted(os.listdir(second_dir)), ["data.dat", "header.dat"])
+        with open(second_data, "rb") as f:
+            self.assertEqual(f.read(), b"decrypted")
+
+        # Editing a decrypted copy must not change the cached entry
+        with open(second_data, "wb") as f:
+            f.write(b"modified")
+        with patch("crypt_utils.subprocess.run", side_effect=fake_decrypter) as run:
+            _, third_data = decrypt_save_file(self.save_file, third_dir)
+        self.assertEqual(run.call_count, 0)
+        with open(third_data, "rb") as f:
+            self.assertEqual(f.read(), b"decrypted")
+
+    def test_decrypt_save_file_without_cache(self):
+        first_dir, second_dir = self.make_output_dirs(2)
+        with patch("crypt_utils.subprocess.run", side_effect=fake_decrypter) as run:
+            decrypt_save_file(self.save_file, first_dir, use_cache=False)
+            decrypt_save_file(self.save_file, second_dir, use_cache=False)
+
+        self.assertEqual(run.call_count, 2)
+
+    def test_evict_decryption_cache_removes_least_recently_used(self):
+        cache_dir = os.path.join(self.work_dir, "entries")
+        for age, entry_name in enumerate(["newest", "middle", "oldest"]):
+            entry_dir = os.path.join(cache_dir, entry_name)
+            os.makedirs(entry_dir)
+            with open(os.path.join(entry_dir, "data.dat"), "wb") as f:
+                f.write(b"x" * 100)
+            os.utime(entry_dir, (1000 - age, 1000 - age))
+
+        evict_decryption_cache(cache_dir, max_size=250)
+
+        self.assertEqual(sorted(os.listdir(cache_dir)), ["middle", "newest"])
+
+    @unittest.skipIf(os.name == "nt", "wine is only used on non-Windows platforms")
+    def test_crypto_worker_pool_keeps_wine_warm(self):
+        wine_prefix = os.path.join(self.work_dir, "wine")
+        save_files = []
+        for index in range(3):
+            save_file = os.path.join(self.work_dir, f"EDIT0000000{index}")
+            with open(save_file, "wb") as f:
+                f.write(b"encrypted save %d" % index)
+            save_files.append(save_file)
+
+        def fake_run(command, **kwargs):
+            self.assertEqual(kwargs["env"]["WINEPREFIX"], wine_prefix)
+            if command[0] == "wine":
+                fake_decrypter(command)
+
+        with patch("crypt_utils.subprocess.run", side_effect=fake_run) as run:
+            with CryptoWorkerPool(max_workers=2, wine_prefix=wine_prefix) as pool:
+                futures = [
+                    pool.submit_decrypt(path, output_dir)
+                    for path, output_dir in zip(
+                        save_files, self.make_output_dirs(len(save_files))
+                    )
+                ]
+                results = [future.result() for future in futures]
+
+        commands = [call.args[0] for call in run.call_args_list]
+        self.assertEqual(commands[0], ["wineboot", "--init"])
+        self.assertEqual(commands[1], ["wineserver", "--persistent"])
+        self.assertEqual(commands[-1], ["wineserver", "--kill"])
+        self.assertEqual(
+            sum(command[0] == "wine" for command in commands), len(save_files)
+        )
+
+        for output_dir, data_bin_path in results:
+            self.assertEqual(os.path.dirname(data_bin_path), output_dir)
+            self.assertTrue(os.path.exists(data_bin_path))
+
+    @unittest.skipIf(os.name == "nt", "wine is only used on non-Windows platforms")
+    def test_crypto_worker_pools_share_the_wineserver(self):
+        wine_prefix = os.path.join(self.work_dir, "wine")
+        os.makedirs(wine_prefix)
+        with open(os.path.join(wine_prefix, "system.reg"), "w"):
+            pass
+        # A pool of a process that ended without closing it
+        with open(os.path.join(wine_prefix, ".pes2021-transfer-tool.pools"), "w") as f:
+            f.write("999999999 stale\n")
+
+        with patch("crypt_utils.subprocess.run") as run:
+            first = CryptoWorkerPool(max_workers=1, wine_prefix=wine_prefix)
+            second = CryptoWorkerPool(max_workers=1, wine_prefix=wine_prefix)
+            first.start()
+            second.start()
+            first.close()
+            commands = [call.args[0] for call in run.call_args_list]
+            self.assertEqual(commands, [["wineserver", "--persistent"]])
+
+            second.close()
+            commands = [call.args[0] for call in run.call_args_list]
+            self.assertEqual(commands[-1], ["wineserver", "--kill"])
+            self.assertEqual(len(commands), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
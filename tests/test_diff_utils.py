@@ -0,0 +1,96 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from csv_utils import read_transfers
+from diff_utils import diff_team_data, get_memberships, np, write_diff_transfers
+from transfer_utils import apply_transfers
+
+
+def make_team(team_id, player_ids, shirt_numbers=None):
+    shirt_numbers = shirt_numbers or list(range(1, len(player_ids) + 1))
+    padding = [0] * (40 - len(player_ids))
+    return (team_id, player_ids + padding, shirt_numbers + padding)
+
+
+class TestDiffUtils(unittest.TestCase):
+    def setUp(self):
+        self.codecs = [False] if np is None else [False, True]
+
+    def test_diff_team_data(self):
+        teams_a = [
+            make_team(1, [101, 102, 103]),
+            make_team(2, [201, 202]),
+            # National team, which 101 stays in
+            make_team(90, [101]),
+        ]
+        teams_b = [
+            # A player moving to another slot of the same team is not a change
+            make_team(1, [103, 201], [3, 10]),
+            make_team(2, [202, 101, 301], [2, 1, 3]),
+            make_team(90, [101]),
+        ]
+
+        for use_numpy in self.codecs:
+            squad_diff = diff_team_data(teams_a, teams_b, use_numpy)
+
+            self.assertEqual(
+                squad_diff.moves,
+                [(101, 1, 2), (102, 1, 0), (201, 2, 1), (301, 0, 2)],
+            )
+            self.assertEqual(squad_diff.shirt_changes, [])
+
+        teams_b[0] = make_team(1, [101, 102, 103], [1, 2, 30])
+        for use_numpy in self.codecs:
+            squad_diff = diff_team_data(teams_a, teams_b, use_numpy)
+            self.assertEqual(squad_diff.shirt_changes, [(1, 103, 3, 30)])
+
+    def test_diff_transfers_turn_a_into_b(self):
+        rng = random.Random(24)
+        player_ids = list(range(1000, 1120))
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+
+        def make_save():
+            squads = {team_id: [] for team_id in range(1, 6)}
+            for player_id in player_ids:
+                team_id = rng.randrange(0, 7)
+                if team_id in squads and len(squads[team_id]) < 30:
+                    squads[team_id].append(player_id)
+            return [make_team(team_id, squad) for team_id, squad in squads.items()]
+
+        for _ in range(10):
+            teams_a = make_save()
+            teams_b = make_save()
+
+            results = []
+            for use_numpy in self.codecs:
+                squad_diff = diff_team_data(teams_a, teams_b, use_numpy)
+                results.append(squad_diff)
+
+                transfers_path = os.path.join(work_dir, "transfers.csv")
+                write_diff_transfers(transfers_path, squad_diff.moves, {}, {})
+                with patch("transfer_utils.TacticsBatch.apply"):
+                    result = apply_transfers(
+                        "path/to/binary",
+                        [
+                            (team_id, list(team_player_ids), list(shirt_numbers))
+                            for team_id, team_player_ids, shirt_numbers in teams_a
+                        ],
+                        read_transfers(transfers_path),
+                        player_names=dict.fromkeys(player_ids, ""),
+                    )
+
+                self.assertEqual(
+                    get_memberships(result.teams_data).keys(),
+                    get_memberships(teams_b).keys(),
+                )
+
+            self.assertEqual(results[0], results[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from export_utils import (
+    EXPORTERS,
+    export_squads,
+    get_export_format,
+    load_squads_npy,
+    np,
+)
+
+
+class TestExportUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.teams_data = [
+            (1, [101, 999] + [0] * 38, [1, 2] + [0] * 38),
+            (7, [0] * 40, [0] * 40),
+        ]
+        self.team_names = {1: "Team A"}
+        self.player_names = {101: "John Doe"}
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def export(self, file_name, **kwargs):
+        output_path = os.path.join(self.work_dir, file_name)
+        export_squads(
+            output_path, self.teams_data, self.team_names, self.player_names, **kwargs
+        )
+        return output_path
+
+    def test_get_export_format(self):
+        self.assertEqual(get_export_format("squads.jsonl"), "jsonl")
+        self.assertEqual(get_export_format("squads.txt"), "csv")
+        self.assertEqual(get_export_format("squads.csv", "jsonl"), "jsonl")
+        with self.assertRaises(ValueError):
+            get_export_format("squads.csv", "xlsx")
+
+    def test_csv_export(self):
+        with open(self.export("squads.csv"), newline="") as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(
+            rows[:4],
+            [
+                ["TeamID", "TeamName", "PlayerID", "PlayerName", "ShirtNumber"],
+                ["1", "Team A", "101", "John Doe", "1"],
+                ["1", "Team A", "999", "Unknown Player", "2"],
+                ["1", "Team A", "0", "Empty Player", "0"],
+            ],
+        )
+        self.assertEqual(rows[-1], ["7", "Unknown Team", "0", "Empty Player", "0"])
+        self.assertEqual(len(rows), 81)
+
+        with open(self.export("squads.csv", skip_empty=True), newline="") as f:
+            self.assertEqual(len(list(csv.reader(f))), 3)
+
+    def test_jsonl_export(self):
+        with open(self.export("squads.jsonl", skip_empty=True), encoding="utf-8") as f:
+            teams = [json.loads(line) for line in f]
+
+        self.assertEqual(
+            teams,
+            [
+                {
+                    "TeamID": 1,
+                    "TeamName": "Team A",
+                    "Players": [
+                        {"PlayerID": 101, "PlayerName": "John Doe", "ShirtNumber": 1},
+                        {
+                            "PlayerID": 999,
+                            "PlayerName": "Unknown Player",
+                            "ShirtNumber": 2,
+                        },
+                    ],
+                },
+                {"TeamID": 7, "TeamName": "Unknown Team", "Players": []},
+            ],
+        )
+
+    @unittest.skipIf(np is None, "the npy format needs NumPy")
+    def test_npy_export(self):
+        self.assertIn("npy", EXPORTERS)
+        output_path = self.export("squads", export_format="npy")
+
+        squads = load_squads_npy(output_path)
+        self.assertEqual(
+            sorted(squads),
+            [
+                "player_ids",
+                "player_name_ids",
+                "player_names",
+                "shirt_numbers",
+                "team_ids",
+                "team_names",
+            ],
+        )
+        for array in squads.values():
+            self.assertIsInstance(array, np.memmap)
+
+        self.assertEqual(squads["team_ids"].tolist(), [1, 7])
+        self.assertEqual(squads["player_ids"].shape, (2, 40))
+        self.assertEqual(squads["player_ids"][0, :3].tolist(), [101, 999, 0])
+        self.assertEqual(squads["shirt_numbers"][0, :3].tolist(), [1, 2, 0])
+        self.assertEqual(squads["team_names"].tolist(), ["Team A", "Unknown Team"])
+
+        name_index = np.searchsorted(squads["player_name_ids"], 999)
+        self.assertEqual(squads["player_names"][name_index], "Unknown Player")
+        self.assertEqual(squads["player_name_ids"].tolist(), [101, 999])
+
+        # Plain np.load maps each file too
+        player_ids = np.load(os.path.join(output_path, "player_ids.npy"), mmap_mode="r")
+        self.assertIsInstance(player_ids, np.memmap)
+        # Unmap the files before tearDown removes them
+        del squads, player_ids
+
+
+if __name__ == "__main__":
+    unittest.main()
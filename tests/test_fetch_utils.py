@@ -0,0 +1,173 @@
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fetch_utils import dedupe_transfers, fetch_batch
+from http_utils import PageFetcher, RateLimiter
+from tests.fake_transfermarkt import FakeTransfermarkt, read_fixture
+from transfermarkt_utils import (
+    get_latest_transfers_url,
+    get_search_url,
+    get_team_transfers_url,
+)
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LISTING_PATH = "/transfers/neuestetransfers/statistik/plus"
+
+
+class TestFetchUtils(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeTransfermarkt(
+            {
+                get_search_url("Sevilla", ""): read_fixture(
+                    "search_results_sevilla.html"
+                ),
+                get_search_url("Nowhere FC", ""): "<html></html>",
+                get_team_transfers_url("fc-sevilla", "368", 2024, ""): read_fixture(
+                    "team_transfers_368.html"
+                ),
+                get_latest_transfers_url("GB1", ""): read_fixture(
+                    "latest_transfers_page_1.html"
+                ),
+                f"{LISTING_PATH}/page/2": read_fixture("latest_transfers_page_2.html"),
+                f"{LISTING_PATH}/page/3": read_fixture("latest_transfers_page_3.html"),
+            }
+        )
+        self.server.start()
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop()
+        shutil.rmtree(self.work_dir)
+
+    def test_dedupe_transfers(self):
+        team_page_transfer = [
+            "N/A",
+            "Samir Nasri",
+            "Man City",
+            "Sevilla",
+            "18944",
+            "281",
+            "368",
+        ]
+        league_transfer = [
+            "Aug 24, 2016",
+            "Samir Nasri",
+            "Manchester City",
+            "Sevilla FC",
+            "18944",
+            "281",
+            "368",
+        ]
+        unlinked_transfer = ["N/A", "Vitolo", "Sevilla", "Atlético", "", "368", ""]
+
+        self.assertEqual(
+            dedupe_transfers(
+                [
+                    team_page_transfer,
+                    unlinked_transfer,
+                    league_transfer,
+                    unlinked_transfer[:],
+                ]
+            ),
+            [league_transfer, unlinked_transfer],
+        )
+
+    def test_fetch_batch(self):
+        with PageFetcher(max_workers=3, rate_limiter=RateLimiter(None)) as fetcher:
+            transfers, failures = fetch_batch(
+                fetcher,
+                ["Sevilla", "Nowhere FC"],
+                ["GB1", "XX1"],
+                base_url=self.server.base_url,
+            )
+
+        self.assertEqual(
+            [transfer[:2] for transfer in transfers],
+            [
+                ["N/A", "Vitolo"],
+                # Seen on the team page and on the league page
+                ["Aug 24, 2016", "Samir Nasri"],
+                ["N/A", "Wissam Ben Yedder"],
+                ["Jul 1, 2023", "Karim Benzema"],
+                ["Sep 1, 2014", "Hatem Ben Arfa"],
+            ],
+        )
+        self.assertEqual([name for name, _ in failures], ["Nowhere FC", "XX1"])
+        self.assertLessEqual(self.server.peak_requests, 3)
+
+    def test_fetch_batch_keeps_going_after_a_page_it_cannot_parse(self):
+        with patch(
+            "fetch_utils.extract_team_transfers",
+            side_effect=IndexError("list index out of range"),
+        ):
+            with PageFetcher(max_workers=2, rate_limiter=RateLimiter(None)) as fetcher:
+                transfers, failures = fetch_batch(
+                    fetcher, ["Sevilla"], ["GB1"], base_url=self.server.base_url
+                )
+
+        self.assertEqual(failures, [("Sevilla", "IndexError: list index out of range")])
+        self.assertEqual(len(transfers), 3)
+
+    def test_fetch_batch_script(self):
+        players_csv = os.path.join(self.work_dir, "players.csv")
+        with open(players_csv, "w", encoding="utf-8") as f:
+            f.write("PlayerID,PlayerName\n8946,Samir Nasri\n8944,Karim Benzema\n")
+        teams_csv = os.path.join(self.work_dir, "teams.csv")
+        with open(teams_csv, "w", encoding="utf-8") as f:
+            f.write("TeamID,TeamName\n173,Manchester City\n108,Real Madrid\n")
+        teams_file = os.path.join(self.work_dir, "teams.txt")
+        with open(teams_file, "w", encoding="utf-8") as f:
+            f.write("# LaLiga\nSevilla\n\n")
+        output_path = os.path.join(self.work_dir, "out", "transfers.csv")
+
+        environment = dict(
+            os.environ,
+            PYTHONPATH=os.path.join(ROOT_DIR, "src"),
+            PES_TRANSFER_TOOL_CACHE_DIR=os.path.join(self.work_dir, "cache"),
+        )
+        command = [
+            sys.executable,
+            os.path.join(ROOT_DIR, "fetch_batch_transfers.py"),
+            players_csv,
+            teams_csv,
+            "--teams-file",
+            teams_file,
+            "--league",
+            "GB1",
+            "--requests-per-second",
+            "0",
+            "--output",
+            output_path,
+            "--base-url",
+            self.server.base_url,
+        ]
+        subprocess.run(command, check=True, capture_output=True, env=environment)
+
+        with open(output_path, "r", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            (rows[1]["PlayerID"], rows[1]["FromTeamID"], rows[1]["ToTeamID"]),
+            ("8946", "173", "0"),
+        )
+
+        # The cached pages replay the same batch without the server
+        self.server.stop()
+        self.server = None
+        os.remove(output_path)
+        subprocess.run(
+            command + ["--offline"], check=True, capture_output=True, env=environment
+        )
+        with open(output_path, "r", encoding="utf-8") as f:
+            self.assertEqual(list(csv.DictReader(f)), rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from http_utils import CacheMissError, HttpCache, PageFetcher, RateLimiter
+from tests.fake_transfermarkt import FakeTransfermarkt, read_fixture
+from transfermarkt_utils import crawl_pages
+
+LISTING_PATH = "/transfers/neuestetransfers/statistik/plus/"
+
+
+def read_listing_page(page_number):
+    return read_fixture(f"latest_transfers_page_{page_number}.html")
+
+
+class TestHttpUtils(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeTransfermarkt({LISTING_PATH: read_listing_page(1)})
+        for page_number in (2, 3):
+            self.server.pages[f"{LISTING_PATH.rstrip('/')}/page/{page_number}"] = (
+                read_listing_page(page_number)
+            )
+        self.server.start()
+        self.base_url = self.server.base_url
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.cache_dir)
+
+    def test_crawl_pages_in_order(self):
+        # Pad the listing to 8 pages so several are fetched at once
+        for page_number in range(4, 9):
+            html = read_listing_page(2).replace("Samir Nasri", f"Player {page_number}")
+            self.server.pages[f"{LISTING_PATH.rstrip('/')}/page/{page_number}"] = html
+        self.server.pages[LISTING_PATH] = read_listing_page(1).replace(
+            "/page/3", "/page/8"
+        )
+
+        with PageFetcher(max_workers=4, rate_limiter=RateLimiter(None)) as fetcher:
+            pages = crawl_pages(self.base_url + LISTING_PATH, fetcher)
+
+        self.assertEqual(len(pages), 8)
+        self.assertEqual(pages[0][0], self.base_url + LISTING_PATH)
+        for page_number, (url, _) in enumerate(pages[1:], 2):
+            self.assertTrue(url.endswith(f"/page/{page_number}"))
+        self.assertIn("Karim Benzema", pages[0][1].tables[0].text)
+        self.assertIn("Samir Nasri", pages[1][1].tables[0].text)
+        self.assertIn("Hatem Ben Arfa", pages[2][1].tables[0].text)
+        self.assertIn("Player 8", pages[7][1].tables[0].text)
+
+        self.assertEqual(len(self.server.requested_paths), 8)
+        self.assertGreater(self.server.peak_requests, 1)
+        self.assertLessEqual(self.server.peak_requests, 4)
+
+    def test_crawl_pages_follows_next_links_without_page_numbers(self):
+        next_page = f"{LISTING_PATH}?page=2"
+        self.server.pages[LISTING_PATH] = (
+            '<li class="tm-pagination__list-item--icon-next-page">'
+            f'<a href="{next_page}">next</a></li>'
+        )
+        self.server.pages[next_page] = "<p>last page</p>"
+
+        with PageFetcher(max_workers=4, rate_limiter=RateLimiter(None)) as fetcher:
+            pages = crawl_pages(self.base_url + LISTING_PATH, fetcher)
+
+        self.assertEqual(
+            [url for url, _ in pages],
+            [self.base_url + LISTING_PATH, self.base_url + next_page],
+        )
+
+    def test_http_cache(self):
+        url = self.base_url + LISTING_PATH
+        cache = HttpCache(self.cache_dir, ttl=60)
+
+        with PageFetcher(rate_limiter=RateLimiter(None), cache=cache) as fetcher:
+            first_html = fetcher.fetch(url)
+            # Fresh pages do not reach the server
+            self.assertEqual(fetcher.fetch(url), first_html)
+            self.assertEqual(len(self.server.requested_paths), 1)
+
+            # Stale pages are revalidated and an unchanged page comes from disk
+            cache.ttl = 0
+            self.assertEqual(fetcher.fetch(url), first_html)
+            self.assertEqual(len(self.server.requested_paths), 2)
+            self.assertEqual(self.server.not_modified_count, 1)
+
+            self.server.pages[LISTING_PATH] = "<p>updated</p>"
+            self.assertEqual(fetcher.fetch(url), "<p>updated</p>")
+            self.assertEqual(self.server.not_modified_count, 1)
+
+        self.assertEqual(cache.get(url)["text"], "<p>updated</p>")
+        self.assertTrue(cache.get(url)["etag"])
+
+    def test_offline_fetch(self):
+        url = self.base_url + LISTING_PATH
+        cache = HttpCache(self.cache_dir, ttl=0)
+        cache.store(url, "<p>cached</p>")
+
+        with PageFetcher(cache=cache, offline=True) as fetcher:
+            self.assertEqual(fetcher.fetch(url), "<p>cached</p>")
+            with self.assertRaises(CacheMissError):
+                fetcher.fetch(url + "page/2")
+
+        self.assertEqual(self.server.requested_paths, [])
+        with self.assertRaises(ValueError):
+            PageFetcher(offline=True)
+
+    def test_rate_limiter_spaces_requests(self):
+        rate_limiter = RateLimiter(requests_per_second=20)
+        start_time = time.monotonic()
+        threads = [threading.Thread(target=rate_limiter.wait) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # The first request starts right away, the others 50 ms apart
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.19)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import ingest_utils
+from compile_utils import compile_transfers
+from ingest_utils import iter_transfers, parse_transfer_date
+
+
+class TestIngestUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def write_csv(self, file_name, rows):
+        file_path = os.path.join(self.work_dir, file_name)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("TransferDate,PlayerID,FromTeamID,ToTeamID\n")
+            for transfer_date, player_id, from_team_id, to_team_id in rows:
+                f.write(f'"{transfer_date}",{player_id},{from_team_id},{to_team_id}\n')
+        return file_path
+
+    def get_moves(self, transfers):
+        return [(transfer[0], transfer[2], transfer[4]) for transfer in transfers]
+
+    def test_parse_transfer_date(self):
+        self.assertEqual(parse_transfer_date("Jul 1, 2024"), date(2024, 7, 1))
+        self.assertEqual(parse_transfer_date("2024-07-01"), date(2024, 7, 1))
+        self.assertEqual(parse_transfer_date("01.07.2024"), date(2024, 7, 1))
+        self.assertIsNone(parse_transfer_date("N/A"))
+        self.assertIsNone(parse_transfer_date(""))
+
+    def test_transfers_are_merged_by_date_across_files(self):
+        self.write_csv(
+            "a.csv",
+            [
+                ("Aug 30, 2024", 91, 1, 2),
+                ("Jul 1, 2024", 141, 3, 4),
+                ("N/A", 0, 5, 6),
+            ],
+        )
+        self.write_csv(
+            "b.csv",
+            [
+                ("Jul 15, 2024", 91, 7, 1),
+                ("Sep 1, 2024", 141, 4, 9),
+                ("N/A", 8944, 10, 11),
+                ("N/A", 0, 12, 13),
+            ],
+        )
+
+        transfers = list(iter_transfers(self.work_dir, max_workers=2))
+
+        # Undated transfers come first in file order, then every dated one
+        self.assertEqual(
+            self.get_moves(transfers),
+            [
+                (0, 5, 6),
+                (8944, 10, 11),
+                (0, 12, 13),
+                (141, 3, 4),
+                (91, 7, 1),
+                (91, 1, 2),
+                (141, 4, 9),
+            ],
+        )
+
+    def test_files_are_merged_while_they_are_read(self):
+        for week in range(4):
+            self.write_csv(
+                f"week{week}.csv",
+                [(f"2024-07-{week * 7 + day + 1:02d}", week, 1, 2) for day in range(7)],
+            )
+
+        with patch(
+            "ingest_utils.read_transfer_file", wraps=ingest_utils.read_transfer_file
+        ) as read_transfer_file:
+            transfers = iter_transfers(self.work_dir, max_workers=1)
+            # The first week comes out before the files past the read-ahead
+            first_week = [next(transfers)[0] for _ in range(7)]
+            self.assertEqual(first_week, [0] * 7)
+            self.assertLess(read_transfer_file.call_count, 4)
+
+            self.assertEqual(
+                [transfer[0] for transfer in transfers], [1] * 7 + [2] * 7 + [3] * 7
+            )
+
+    def test_chains_across_files_keep_every_leg(self):
+        self.write_csv("week1.csv", [("Jul 1, 2024", 7, 1, 2)])
+        self.write_csv("week2.csv", [("Jul 8, 2024", 7, 2, 3)])
+
+        transfers = list(iter_transfers(self.work_dir, max_workers=1))
+
+        self.assertEqual(self.get_moves(transfers), [(7, 1, 2), (7, 2, 3)])
+        compiled, removed_count = compile_transfers(transfers)
+        self.assertEqual(self.get_moves(compiled), [(7, 1, 3)])
+        self.assertEqual(removed_count, 1)
+
+    def test_undated_transfers_keep_file_order(self):
+        self.write_csv("a.csv", [("N/A", 91, 1, 2)])
+        self.write_csv("b.csv", [("N/A", 91, 2, 3)])
+
+        transfers = list(iter_transfers(self.work_dir))
+
+        self.assertEqual(self.get_moves(transfers), [(91, 1, 2), (91, 2, 3)])
+
+    def test_single_file(self):
+        file_path = self.write_csv(
+            "transfers.csv", [("Aug 1, 2024", 91, 2, 3), ("Jul 1, 2024", 91, 1, 2)]
+        )
+        self.write_csv("other.csv", [("Sep 1, 2024", 141, 1, 2)])
+
+        transfers = list(iter_transfers(file_path))
+
+        self.assertEqual(self.get_moves(transfers), [(91, 1, 2), (91, 2, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
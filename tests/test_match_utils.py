@@ -0,0 +1,84 @@
+import unittest
+
+from rapidfuzz import fuzz, process
+
+import fetch_team_transfers
+from match_utils import BatchMatcher, match_transfers
+
+
+class TestMatchUtils(unittest.TestCase):
+    def setUp(self):
+        self.players_data = [
+            {"PlayerName": "Karim Benzema", "PlayerID": "8944"},
+            {"PlayerName": "Samir Nasri", "PlayerID": "8946"},
+            {"PlayerName": "Hatem Ben Arfa", "PlayerID": "8940"},
+        ]
+        self.teams_data = [
+            {"TeamName": "Real Madrid", "TeamID": "108"},
+            {"TeamName": "Manchester City", "TeamID": "173"},
+        ]
+
+    def test_batch_matcher_agrees_with_extract_one(self):
+        choices = ["Karim Benzema", "Karim Benzena", "Samir Nasri", "Sami Nasri"]
+        queries = ["Karim Benzem", "Samir Nasr", "Samir Nasr", "Zinedine Zidane"]
+
+        matches = BatchMatcher(choices, top_k=2).match(queries, score_cutoff=80)
+
+        self.assertEqual(len(matches), 3)
+        for query in queries:
+            best_choice, best_score, _ = process.extractOne(
+                query, choices, scorer=fuzz.ratio
+            )
+            self.assertEqual(matches[query][:2], (best_choice, best_score))
+
+        # Ties keep the first choice, candidates are limited to top_k
+        self.assertEqual(matches["Karim Benzem"][0], "Karim Benzema")
+        self.assertEqual(len(matches["Karim Benzem"][2]), 2)
+        self.assertEqual(matches["Zinedine Zidane"][2], [])
+
+    def test_batch_matcher_without_choices(self):
+        self.assertEqual(
+            BatchMatcher([]).match(["Karim Benzema"]), {"Karim Benzema": (None, 0, [])}
+        )
+
+    def test_match_transfers(self):
+        transfers = [
+            ["Jul 1, 2024", "Karim Benzema", "Real Madrid", "Al-Ittihad"],
+            ["Jul 2, 2024", "Unknown Youngster", "Man City", "Manchester City"],
+        ]
+
+        matched = match_transfers(
+            transfers, self.players_data, self.teams_data, 80, default_id="N/A"
+        )
+
+        self.assertEqual(
+            matched[0][:7],
+            [
+                "Jul 1, 2024",
+                "8944",
+                "Karim Benzema",
+                100.0,
+                "108",
+                "Real Madrid",
+                100.0,
+            ],
+        )
+        # default_id is only for accepted matches missing from the reference
+        self.assertEqual(matched[0][7:9], [0, "Al-Ittihad"])
+        self.assertEqual(matched[1][1:3], [0, "Unknown Youngster"])
+        self.assertEqual(matched[1][7:], ["173", "Manchester City", 100.0])
+
+    def test_fetch_team_transfers_writes_zero_for_unmatched_names(self):
+        transfers = [["Jul 1, 2024", "Zzzzz Qqqq", "Xyzzy FC", "Real Madrid"]]
+
+        matched = fetch_team_transfers.match_data(
+            transfers, self.players_data, self.teams_data
+        )
+
+        self.assertEqual(matched[0][1:3], [0, "Zzzzz Qqqq"])
+        self.assertEqual(matched[0][4:6], [0, "Xyzzy FC"])
+        self.assertEqual(matched[0][7:9], ["108", "Real Madrid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from report_utils import (
+    APPLIED,
+    NOT_FOUND,
+    PLAYER_NOT_IN_NAMES,
+    TransferReportWriter,
+    TransferResult,
+    describe_transfer_record,
+    make_transfer_record,
+)
+
+
+class TestReportUtils(unittest.TestCase):
+    def create_records(self):
+        return [
+            make_transfer_record(
+                0, (101, "Player A", 1, "Team A", 2, "Team B"), APPLIED
+            ),
+            make_transfer_record(
+                1,
+                (999, "Player Z", 1, "Team A", 2, "Team B"),
+                NOT_FOUND,
+                PLAYER_NOT_IN_NAMES,
+            ),
+        ]
+
+    def test_transfer_result_counts_outcomes(self):
+        result = TransferResult()
+        for record in self.create_records():
+            result.add(record)
+
+        self.assertEqual(result.counts[APPLIED], 1)
+        self.assertEqual(result.counts[NOT_FOUND], 1)
+        self.assertIn("Processed 2 transfers", result.summary())
+        self.assertEqual(
+            describe_transfer_record(result.records[1]),
+            "Player Player Z (999) not found. Skipping transfer. From Team: Team A (1), To Team: Team B (2).",
+        )
+
+    def test_report_writer_formats(self):
+        records = self.create_records()
+        temp_dir = tempfile.mkdtemp()
+        jsonl_path = os.path.join(temp_dir, "report.jsonl")
+        csv_path = os.path.join(temp_dir, "report.csv")
+
+        try:
+            for path in (jsonl_path, csv_path):
+                with TransferReportWriter(path, buffer_size=1) as writer:
+                    for record in records:
+                        writer.write(record)
+
+            with open(jsonl_path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(lines[0]["outcome"], APPLIED)
+            self.assertEqual(lines[1]["detail"], PLAYER_NOT_IN_NAMES)
+
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(rows[0]["player_id"], "101")
+            self.assertEqual(rows[1]["outcome"], NOT_FOUND)
+        finally:
+            os.remove(jsonl_path)
+            os.remove(csv_path)
+            os.rmdir(temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from csv_utils import read_csv_mapping
+from roster_utils import RosterStore, discover_roster_versions, parse_roster_diff
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+class TestRosterUtils(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.write_roster("A", [(52, "Shinji Ono"), (91, "Hong Myung-Bo")])
+        self.write_roster(
+            "B", [(52, "Shinji Ono"), (91, "Hong Myung Bo"), (141, "Kitazawa")]
+        )
+        self.write_roster("C", [(91, "Hong Myung Bo"), (141, "Kitazawa")])
+        with open(os.path.join(self.data_dir, "diff_A-B_players.diff"), "w") as f:
+            f.write(
+                "--- a/data/A_players.csv\n"
+                "+++ b/data/B_players.csv\n"
+                "@@ -1,3 +1,4 @@\n"
+                " PlayerID,PlayerName\n"
+                " 52,Shinji Ono\n"
+                "-91,Hong Myung-Bo\n"
+                "+91,Hong Myung Bo\n"
+                "+141,Kitazawa\n"
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def write_roster(self, version, rows):
+        path = os.path.join(self.data_dir, f"{version}_players.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("PlayerID,PlayerName\n")
+            for player_id, player_name in rows:
+                f.write(f"{player_id},{player_name}\n")
+
+    def test_parse_roster_diff(self):
+        changes = parse_roster_diff(
+            os.path.join(self.data_dir, "diff_A-B_players.diff")
+        )
+        self.assertEqual(changes, {91: "Hong Myung Bo", 141: "Kitazawa"})
+
+    def test_store_versions(self):
+        self.assertEqual(discover_roster_versions(self.data_dir), ["A", "B", "C"])
+
+        # B -> C has no diff and falls back to comparing the CSVs
+        store = RosterStore.from_directory(self.data_dir)
+        self.assertEqual(store.deltas[2], {52: None})
+
+        self.assertEqual(store.name(91, "A"), "Hong Myung-Bo")
+        self.assertEqual(store.name(91, "C"), "Hong Myung Bo")
+        self.assertIsNone(store.name(141, "A"))
+        self.assertEqual(store.name(52, "C", "Unknown Player"), "Unknown Player")
+        with self.assertRaises(KeyError):
+            store.name(52, "D")
+
+        for version in store.versions:
+            expected = read_csv_mapping(
+                os.path.join(self.data_dir, f"{version}_players.csv")
+            )
+            self.assertEqual(store.materialize(version), expected)
+            mapping = store.mapping(version)
+            self.assertEqual(dict(mapping), expected)
+            self.assertEqual(len(mapping), len(expected))
+
+    def test_store_matches_bundled_rosters(self):
+        store = RosterStore.from_directory(DATA_DIR)
+        self.assertEqual(store.versions[0], "FL24v2")
+        self.assertEqual(store.versions[-1], "FL25v1.5")
+        for version in (store.versions[1], store.versions[-1]):
+            expected = read_csv_mapping(
+                os.path.join(DATA_DIR, f"{version}_players.csv")
+            )
+            self.assertEqual(store.materialize(version), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
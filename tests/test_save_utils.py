@@ -0,0 +1,90 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from save_utils import SaveImage, open_save_image
+from tactics_utils import update_tactics_for_team
+from team_utils import read_team_data, write_team_data
+
+
+class TestSaveUtils(unittest.TestCase):
+    def create_test_file(self, teams):
+        temp_file = tempfile.NamedTemporaryFile(delete=False)
+        with open(temp_file.name, "wb") as f:
+            offset = 10307144  # Start offset
+            f.seek(offset)
+            for team_id, player_ids, shirt_numbers in teams:
+                f.write(struct.pack("<I", team_id))
+                for player_id in player_ids:
+                    f.write(struct.pack("<I", player_id))
+                for shirt_number in shirt_numbers:
+                    f.write(struct.pack("<H", shirt_number))
+                f.write(b"\x00" * 40)
+            # Tactics section for the same teams
+            f.seek(10524800)
+            for team_id, _, _ in teams:
+                f.write(struct.pack("<I", team_id))
+                f.write(b"\x00" * 480)
+                f.write(bytes(range(40)))
+                f.write(b"\x00" * (628 - 4 - 480 - 40))
+        return temp_file.name
+
+    def test_views_are_clamped_to_file_size(self):
+        teams = [(1, list(range(101, 141)), list(range(1, 41)))]
+        test_file = self.create_test_file(teams)
+
+        try:
+            with SaveImage(test_file, writable=False) as image:
+                with image.team_player_table() as view:
+                    self.assertEqual(len(view), 10520143 - 10307144 + 1)
+                    self.assertEqual(struct.unpack_from("<I", view)[0], 1)
+                with image.tactics_table() as view:
+                    self.assertEqual(len(view), 628)
+                with image.view(len(image) + 10) as view:
+                    self.assertEqual(len(view), 0)
+        finally:
+            os.remove(test_file)
+
+    def test_shared_image_reads_and_writes(self):
+        teams = [
+            (1, list(range(101, 141)), list(range(1, 41))),
+            (2, list(range(201, 241)), list(range(1, 41))),
+        ]
+        test_file = self.create_test_file(teams)
+
+        try:
+            with SaveImage(test_file) as image:
+                teams_data = read_team_data(image, 10307144, 10520143)
+                teams_data[1][1][0] = 999
+                write_team_data(image, teams_data, 10307144)
+                update_tactics_for_team(image, 2, 5)
+
+                # Changes are visible through the same image before closing
+                self.assertEqual(
+                    read_team_data(image, 10307144, 10520143)[1][1][0], 999
+                )
+                self.assertFalse(image.closed)
+
+            self.assertTrue(image.closed)
+            self.assertEqual(
+                read_team_data(test_file, 10307144, 10520143)[1][1][0], 999
+            )
+        finally:
+            os.remove(test_file)
+
+    def test_open_save_image_leaves_passed_image_open(self):
+        teams = [(1, list(range(101, 141)), list(range(1, 41)))]
+        test_file = self.create_test_file(teams)
+
+        try:
+            with SaveImage(test_file, writable=False) as image:
+                with open_save_image(image) as shared:
+                    self.assertIs(shared, image)
+                self.assertFalse(image.closed)
+        finally:
+            os.remove(test_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
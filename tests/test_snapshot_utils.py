@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from snapshot_utils import get_snapshot_path, load_player_names
+
+
+class TestSnapshotUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.work_dir, "cache")
+        os.makedirs(self.cache_dir)
+        self.csv_path = os.path.join(self.work_dir, "players.csv")
+        self.write_csv([(141, "Tsuyoshi Kitazawa"), (91, "Hong Myung-Bo")])
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def write_csv(self, rows, mtime=None):
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write("PlayerID,PlayerName\n")
+            for player_id, player_name in rows:
+                f.write(f"{player_id},{player_name}\n")
+        if mtime is not None:
+            os.utime(self.csv_path, (mtime, mtime))
+
+    def test_snapshot_lookups(self):
+        with load_player_names(self.csv_path, self.cache_dir) as player_names:
+            self.assertEqual(len(player_names), 2)
+            self.assertEqual(player_names[91], "Hong Myung-Bo")
+            self.assertEqual(player_names.get(141), "Tsuyoshi Kitazawa")
+            self.assertIn(141, player_names)
+            self.assertNotIn(100, player_names)
+            self.assertEqual(player_names.get(100, "Unknown Player"), "Unknown Player")
+            self.assertEqual(list(player_names), [91, 141])
+
+    def test_snapshot_is_rebuilt_when_csv_changes(self):
+        self.write_csv([(91, "Hong Myung-Bo")], mtime=1000)
+        with load_player_names(self.csv_path, self.cache_dir) as player_names:
+            self.assertEqual(len(player_names), 1)
+
+        snapshot_path = get_snapshot_path(self.csv_path, self.cache_dir)
+        snapshot_inode = os.stat(snapshot_path).st_ino
+
+        # Touching the CSV without changing it keeps the compiled data
+        os.utime(self.csv_path, (2000, 2000))
+        with load_player_names(self.csv_path, self.cache_dir) as player_names:
+            self.assertEqual(dict(player_names), {91: "Hong Myung-Bo"})
+        self.assertEqual(os.stat(snapshot_path).st_ino, snapshot_inode)
+
+        self.write_csv([(91, "Hong Myung-Bo"), (8944, "Karim Benzema")], mtime=3000)
+        with load_player_names(self.csv_path, self.cache_dir) as player_names:
+            self.assertEqual(player_names[8944], "Karim Benzema")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from squad_utils import SquadState
+
+
+class TestSquadUtils(unittest.TestCase):
+    def create_teams_data(self):
+        return [
+            (1, [101, 102, 103] + [0] * 37, [1, 2, 3] + [0] * 37),
+            (2, [201 + i for i in range(40)], [i + 1 for i in range(40)]),
+        ]
+
+    def test_remove_player_moves_last_player(self):
+        teams_data = self.create_teams_data()
+        squad_state = SquadState(teams_data)
+
+        emptied_slot = squad_state.remove_player(1, 101)
+
+        self.assertEqual(emptied_slot, 2)
+        self.assertEqual(teams_data[0][1][:3], [103, 102, 0])
+        self.assertEqual(teams_data[0][2][:3], [3, 2, 0])
+        self.assertFalse(squad_state.has_player(1, 101))
+        self.assertEqual(squad_state.player_slot(1, 103), 0)
+        self.assertEqual(squad_state.first_free_slot(1), 2)
+
+    def test_add_player_uses_lowest_free_slot_and_shirt(self):
+        teams_data = self.create_teams_data()
+        squad_state = SquadState(teams_data)
+
+        self.assertIsNone(squad_state.first_free_slot(2))
+        squad_state.remove_player(2, 205)
+        self.assertEqual(squad_state.first_free_slot(2), 39)
+
+        shirt_number = squad_state.add_player(2, 101, 39)
+
+        self.assertEqual(shirt_number, 5)
+        self.assertEqual(teams_data[1][1][4], 240)
+        self.assertEqual(teams_data[1][1][39], 101)
+        self.assertTrue(squad_state.has_player(2, 101))
+        self.assertTrue(squad_state.has_player(1, 101))
+        self.assertIsNone(squad_state.first_free_slot(2))
+
+    def test_first_free_shirt_number_skips_used_numbers(self):
+        teams_data = [(1, [0] * 40, [1, 2, 4] + [0] * 37)]
+        squad_state = SquadState(teams_data)
+
+        self.assertEqual(squad_state.add_player(1, 11, 3), 3)
+        self.assertEqual(squad_state.add_player(1, 12, 4), 5)
+        squad_state.remove_player(1, 11)
+        self.assertEqual(squad_state.add_player(1, 13, 4), 3)
+
+    def test_dirty_team_ids_track_changed_teams(self):
+        teams_data = self.create_teams_data() + [(3, [301] + [0] * 39, [1] + [0] * 39)]
+        squad_state = SquadState(teams_data)
+        self.assertEqual(squad_state.dirty_team_ids, set())
+
+        squad_state.remove_player(2, 205)
+        squad_state.add_player(1, 205, squad_state.first_free_slot(1))
+
+        self.assertEqual(squad_state.dirty_team_ids, {1, 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,11 @@ import struct
 import tempfile
 import unittest
 
-from tactics_utils import update_tactics_for_team
+from tactics_utils import (
+    TacticsBatch,
+    build_tactics_index,
+    update_tactics_for_team,
+)
 
 
 class TestTacticsUtils(unittest.TestCase):
@@ -221,6 +225,47 @@ class TestTacticsUtils(unittest.TestCase):
         finally:
             os.remove(test_file)
 
+    def test_build_tactics_index(self):
+        test_file = self.create_test_file({7: list(range(40)), 3: list(range(40))})
+
+        try:
+            self.assertEqual(
+                build_tactics_index(test_file), {7: 10524800, 3: 10524800 + 628}
+            )
+        finally:
+            os.remove(test_file)
+
+    def test_tactics_batch_matches_sequential_updates(self):
+        teams = {
+            1: [(i * 7) % 40 for i in range(40)],
+            2: [(i * 11) % 40 for i in range(40)],
+            3: list(range(39, -1, -1)),
+        }
+        removals = [(1, 27), (2, 29), (1, 3), (3, 39), (1, 27), (2, 0), (4, 5)]
+
+        sequential_file = self.create_test_file(teams)
+        batch_file = self.create_test_file(teams)
+
+        try:
+            for team_id, player_index in removals:
+                update_tactics_for_team(sequential_file, team_id, player_index)
+
+            batch = TacticsBatch()
+            for team_id, player_index in removals:
+                batch.remove_player_index(team_id, player_index)
+            self.assertEqual(len(batch), len(removals))
+            batch.apply(batch_file)
+            self.assertEqual(len(batch), 0)
+
+            with open(sequential_file, "rb") as f:
+                sequential_data = f.read()
+            with open(batch_file, "rb") as f:
+                batch_data = f.read()
+            self.assertEqual(batch_data, sequential_data)
+        finally:
+            os.remove(sequential_file)
+            os.remove(batch_file)
+
 
 if __name__ == "__main__":
     unittest.main()
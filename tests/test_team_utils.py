@@ -3,7 +3,15 @@ import struct
 import tempfile
 import unittest
 
-from team_utils import read_team_data
+from team_utils import (
+    TEAM_RECORD_SIZE,
+    build_team_offset_index,
+    decode_team_records,
+    encode_team_records,
+    np,
+    read_team_data,
+    write_team_data,
+)
 
 
 class TestTeamUtils(unittest.TestCase):
@@ -402,6 +410,87 @@ class TestTeamUtils(unittest.TestCase):
         finally:
             os.remove(test_file)
 
+    def test_struct_and_numpy_codecs_match(self):
+        teams = [
+            (team_id, [team_id * 100 + i for i in range(40)], list(range(40, 0, -1)))
+            for team_id in range(1, 6)
+        ]
+        test_file = self.create_test_file(teams)
+
+        try:
+            struct_data = read_team_data(test_file, 10307144, 10520143, use_numpy=False)
+            self.assertEqual(struct_data, teams)
+
+            if np is not None:
+                numpy_data = read_team_data(
+                    test_file, 10307144, 10520143, use_numpy=True
+                )
+                self.assertEqual(numpy_data, struct_data)
+        finally:
+            os.remove(test_file)
+
+    def test_encode_team_records_keeps_padding(self):
+        teams = [(7, list(range(1, 41)), list(range(1, 41)))]
+        codecs = [False] if np is None else [False, True]
+
+        for use_numpy in codecs:
+            buffer = bytearray(b"\xaa" * TEAM_RECORD_SIZE)
+            encode_team_records(teams, buffer, use_numpy)
+
+            self.assertEqual(bytes(buffer[-40:]), b"\xaa" * 40)
+            self.assertEqual(decode_team_records(buffer, use_numpy), teams)
+
+    def test_write_team_data_round_trip(self):
+        teams = [
+            (1, list(range(101, 141)), list(range(1, 41))),
+            (2, list(range(201, 241)), list(range(1, 41))),
+        ]
+        test_file = self.create_test_file(teams)
+
+        try:
+            updated = [
+                (1, list(range(101, 141))[::-1], list(range(1, 41))[::-1]),
+                (2, [0] * 40, [0] * 40),
+            ]
+            write_team_data(test_file, updated, 10307144)
+
+            self.assertEqual(read_team_data(test_file, 10307144, 10520143), updated)
+        finally:
+            os.remove(test_file)
+
+    def test_write_team_data_only_writes_dirty_teams(self):
+        teams = [
+            (1, list(range(101, 141)), list(range(1, 41))),
+            (2, list(range(201, 241)), list(range(1, 41))),
+            (3, list(range(301, 341)), list(range(1, 41))),
+        ]
+        test_file = self.create_test_file(teams)
+
+        try:
+            self.assertEqual(
+                build_team_offset_index(test_file, 10307144),
+                {
+                    1: 10307144,
+                    2: 10307144 + TEAM_RECORD_SIZE,
+                    3: 10307144 + 2 * TEAM_RECORD_SIZE,
+                },
+            )
+
+            # Out of table order, and team 1 changed but not marked dirty
+            updated = [
+                (3, [0] * 40, [0] * 40),
+                (1, [0] * 40, [0] * 40),
+                (2, list(range(201, 241))[::-1], list(range(1, 41))[::-1]),
+            ]
+            write_team_data(test_file, updated, 10307144, dirty_team_ids={2, 3})
+
+            self.assertEqual(
+                read_team_data(test_file, 10307144, 10520143),
+                [teams[0], updated[2], updated[0]],
+            )
+        finally:
+            os.remove(test_file)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch
 
+from report_utils import CYCLE, NO_SLOT
 from transfer_utils import apply_transfers
 
 
@@ -202,14 +203,16 @@ class TestTransferUtils(unittest.TestCase):
             ),  # Move player 216 from team 2 to team 1
         ]
 
-        with patch("src.transfer_utils.update_tactics_for_team"):
-            updated_teams_data = apply_transfers(
+        with patch("transfer_utils.TacticsBatch.apply"):
+            result = apply_transfers(
                 "path/to/binary",
                 teams_data,
                 transfers,
                 player_names={102: "John Doe", 216: "Jane Smith"},
             )
 
+        updated_teams_data = result.teams_data
+
         # Check team 1 updated data
         team1_id, team1_player_ids, team1_shirt_numbers = updated_teams_data[0]
         self.assertEqual(team1_id, 1)
@@ -230,6 +233,71 @@ class TestTransferUtils(unittest.TestCase):
         self.assertNotIn(16, team2_shirt_numbers)  # Shirt 16 should be removed
         self.assertIn(39, team2_shirt_numbers)  # Shirt 39 should be added
 
+    def test_apply_transfers_waits_for_free_slot(self):
+        teams_data = [
+            (1, [100 + i for i in range(1, 41)], list(range(1, 41))),
+            (2, [200 + i for i in range(1, 39)] + [0, 0], list(range(1, 39)) + [0, 0]),
+        ]
+        transfers = [
+            # Team 1 is full until player 101 leaves for team 2
+            (201, "Player 201", 2, "Team B", 1, "Team A"),
+            (101, "Player 101", 1, "Team A", 2, "Team B"),
+        ]
+
+        with patch("transfer_utils.TacticsBatch.apply"):
+            result = apply_transfers(
+                "path/to/binary",
+                teams_data,
+                transfers,
+                player_names={201: "Player 201", 101: "Player 101"},
+            )
+
+        updated_teams_data = result.teams_data
+
+        team1_player_ids = updated_teams_data[0][1]
+        team2_player_ids = updated_teams_data[1][1]
+        self.assertIn(201, team1_player_ids)
+        self.assertNotIn(101, team1_player_ids)
+        self.assertIn(101, team2_player_ids)
+        self.assertNotIn(201, team2_player_ids)
+
+    def test_apply_transfers_swaps_cycle_of_full_teams(self):
+        teams_data = [
+            (team_id, [team_id * 100 + i for i in range(1, 41)], list(range(1, 41)))
+            for team_id in (1, 2, 3)
+        ]
+        transfers = [
+            (101, "Player 101", 1, "Team A", 2, "Team B"),
+            (202, "Player 202", 2, "Team B", 3, "Team C"),
+            (303, "Player 303", 3, "Team C", 1, "Team A"),
+            # Nothing leaves team 3 for this one, so it stays skipped
+            (104, "Player 104", 1, "Team A", 3, "Team C"),
+        ]
+
+        with patch("transfer_utils.TacticsBatch.apply"):
+            result = apply_transfers(
+                "path/to/binary",
+                teams_data,
+                transfers,
+                player_names={101: "A", 202: "B", 303: "C", 104: "D"},
+            )
+
+        updated_teams_data = result.teams_data
+
+        squads = {team_id: player_ids for team_id, player_ids, _ in updated_teams_data}
+        self.assertIn(101, squads[2])
+        self.assertIn(202, squads[3])
+        self.assertIn(303, squads[1])
+        self.assertIn(104, squads[1])
+        self.assertNotIn(104, squads[3])
+        for player_ids in squads.values():
+            self.assertNotIn(0, player_ids)
+
+        self.assertEqual(result.counts[CYCLE], 3)
+        self.assertEqual(result.counts[NO_SLOT], 1)
+        outcomes = {record.player_id: record.outcome for record in result.records}
+        self.assertEqual(outcomes[104], NO_SLOT)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import os
+import unittest
+
+from transfermarkt_utils import (
+    HTML_PARSER,
+    parse_listing_page,
+    parse_search_results,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "transfermarkt")
+PAGE_URL = "https://www.transfermarkt.com/transfers/neuestetransfers/statistik/plus/"
+
+
+def read_fixture(file_name):
+    with open(os.path.join(FIXTURES_DIR, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestTransfermarktUtils(unittest.TestCase):
+    def setUp(self):
+        self.parsers = sorted({"html.parser", HTML_PARSER})
+
+    def test_parse_listing_page(self):
+        html = read_fixture("latest_transfers_page_1.html")
+        for parser in self.parsers:
+            page = parse_listing_page(html, PAGE_URL, parser)
+
+            self.assertEqual(len(page.tables), 1)
+            rows = page.tables[0].find_all("tr", {"class": ["odd", "even"]})
+            self.assertEqual(len(rows), 1)
+            columns = rows[0].find_all("td", recursive=False)
+            self.assertEqual(columns[0].find("a").text, "Karim Benzema")
+            self.assertEqual(columns[3].find("img").get("title"), "Real Madrid")
+
+            self.assertEqual(
+                page.next_page_url,
+                "https://www.transfermarkt.com/transfers/neuestetransfers/statistik/plus/page/2",
+            )
+            self.assertEqual(len(page.page_urls), 2)
+            self.assertTrue(page.page_urls[-1].endswith("/page/3"))
+
+    def test_parse_last_listing_page(self):
+        html = read_fixture("latest_transfers_page_3.html")
+        for parser in self.parsers:
+            page = parse_listing_page(html, PAGE_URL, parser)
+
+            self.assertIsNone(page.next_page_url)
+            self.assertIn("Hatem Ben Arfa", page.tables[0].text)
+
+    def test_parse_search_results(self):
+        html = read_fixture("search_results.html")
+        for parser in self.parsers:
+            links = parse_search_results(html, parser)
+
+            self.assertEqual(
+                [(link.text, link["href"]) for link in links],
+                [
+                    (
+                        "Manchester United",
+                        "/manchester-united/startseite/verein/985",
+                    ),
+                    (
+                        "Manchester United U21",
+                        "/manchester-united-u21/startseite/verein/12345",
+                    ),
+                ],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from workspace_utils import (
+    SHM_DIR,
+    Workspace,
+    WorkspaceQuotaError,
+    get_workspace_root,
+)
+
+
+class TestWorkspaceUtils(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_job_directories_are_reused_and_removed(self):
+        with Workspace(self.work_dir) as workspace:
+            with workspace.job() as job_dir:
+                with open(os.path.join(job_dir, "data.dat"), "wb") as f:
+                    f.write(b"decrypted")
+                os.mkdir(os.path.join(job_dir, "nested"))
+
+            with workspace.job() as second_job_dir:
+                self.assertEqual(second_job_dir, job_dir)
+                self.assertEqual(os.listdir(second_job_dir), [])
+
+                # A job running alongside gets a directory of its own
+                with workspace.job() as third_job_dir:
+                    self.assertNotEqual(third_job_dir, job_dir)
+
+            workspace_path = workspace.path
+
+        self.assertFalse(os.path.exists(workspace_path))
+
+    def test_workspace_is_removed_on_failure(self):
+        with self.assertRaises(RuntimeError):
+            with Workspace(self.work_dir) as workspace, workspace.job() as job_dir:
+                with open(os.path.join(job_dir, "data.dat"), "wb") as f:
+                    f.write(b"decrypted")
+                raise RuntimeError("apply failed")
+
+        self.assertEqual(os.listdir(self.work_dir), [])
+
+    def test_quota_blocks_new_jobs(self):
+        with Workspace(self.work_dir, quota=100) as workspace:
+            with workspace.job() as job_dir:
+                with open(os.path.join(job_dir, "data.dat"), "wb") as f:
+                    f.write(b"x" * 100)
+
+                with self.assertRaises(WorkspaceQuotaError):
+                    workspace.acquire()
+
+            # Released jobs no longer count against the quota
+            with workspace.job():
+                pass
+
+    def test_get_workspace_root(self):
+        with patch.dict(os.environ, {"PES_TRANSFER_TOOL_WORKSPACE_DIR": self.work_dir}):
+            self.assertEqual(get_workspace_root(), self.work_dir)
+
+        with patch.dict(os.environ, {"PES_TRANSFER_TOOL_WORKSPACE_DIR": ""}):
+            with patch("workspace_utils.os.path.isdir", return_value=False):
+                self.assertEqual(get_workspace_root(), tempfile.gettempdir())
+
+            if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+                self.assertEqual(get_workspace_root(quota=0), SHM_DIR)
+                self.assertEqual(
+                    get_workspace_root(quota=float("inf")), tempfile.gettempdir()
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()